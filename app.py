@@ -2,21 +2,23 @@
 # app.py
 import os
 import sys
-from dataclasses import dataclass
+import time
 from typing import List
 
-import pythoncom  # ✅ 解决 CoInitialize 报错（线程内初始化 COM）
-
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QSettings
+from PyQt5.QtCore import Qt, QThread, QTimer, pyqtSignal, QSettings, QAbstractListModel, QModelIndex
 from PyQt5.QtGui import QIcon, QPixmap, QFont, QPainter, QPainterPath
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QLabel, QPushButton, QVBoxLayout, QHBoxLayout,
-    QListWidget, QListWidgetItem, QFileDialog, QMessageBox, QGroupBox,
-    QRadioButton, QLineEdit, QCheckBox, QSpinBox, QTextEdit, QProgressBar,
+    QListView, QFileDialog, QMessageBox, QGroupBox,
+    QRadioButton, QLineEdit, QCheckBox, QSpinBox, QPlainTextEdit, QProgressBar,
     QFrame
 )
 
-from word_processor import process_document
+from batch import (
+    BackendStats, BatchReport, JobConfig, ParallelExecutor, analysis_totals, build_output_path, format_phases,
+    is_word_file, scan_word_files, split_patterns
+)
+from journal import BatchJournal
 
 
 # ========= 资源路径（兼容开发环境 & PyInstaller） =========
@@ -38,10 +40,6 @@ DEFAULT_LOGO = resource_path("ing-logo.png")
 DEFAULT_ICON = resource_path("app.ico")
 
 
-def is_word_file(path: str) -> bool:
-    return os.path.splitext(path)[1].lower() in (".doc", ".docx")
-
-
 def neon_stylesheet() -> str:
     """黑科技风 QSS：深色 + 霓虹高亮 + 圆角卡片 + 金色脚注"""
     return r"""
@@ -128,20 +126,20 @@ def neon_stylesheet() -> str:
         padding: 12px 14px;
     }
 
-    QListWidget {
+    QListView {
         background-color: #0B1119;
         border: 1px solid rgba(120, 170, 255, 0.18);
         border-radius: 12px;
         padding: 8px;
     }
-    QListWidget::item {
+    QListView::item {
         padding: 10px 10px;
         margin: 4px;
         border-radius: 10px;
         background-color: rgba(255,255,255,0.03);
         border: 1px solid rgba(255,255,255,0.05);
     }
-    QListWidget::item:selected {
+    QListView::item:selected {
         background-color: rgba(0, 229, 255, 0.12);
         border: 1px solid rgba(0, 229, 255, 0.30);
     }
@@ -151,7 +149,7 @@ def neon_stylesheet() -> str:
         color: rgba(217,226,239,0.92);
     }
 
-    QTextEdit {
+    QPlainTextEdit {
         background-color: #070B10;
         border: 1px solid rgba(120, 170, 255, 0.18);
         border-radius: 12px;
@@ -223,14 +221,121 @@ def rounded_square_pixmap(image_path: str, size: int = 64, radius: int = 16) ->
     return out
 
 
-class DropListWidget(QListWidget):
-    filesDropped = pyqtSignal(list)
+class FileListModel(QAbstractListModel):
+    """
+    待处理文件列表（几万个文件也不卡）：
+    - 只存路径列表 + 路径 → 行号索引，查重 O(1)，不为每个文件建控件
+    - 大小、状态等明细在显示/悬停时才取（文件大小首次悬停时 stat 一次并缓存）
+    - 批量添加一次 beginInsertRows，批量移除按连续区间删除
+    """
 
     def __init__(self):
         super().__init__()
+        self._paths = []
+        self._rows = {}      # 路径 -> 行号
+        self._status = {}    # 路径 -> 状态文字（处理中 / 完成 / 失败 ...）
+        self._sizes = {}     # 路径 -> 字节数（悬停时才取）
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._paths)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        path = self._paths[index.row()]
+        if role == Qt.DisplayRole:
+            status = self._status.get(path)
+            return f"{path}    〔{status}〕" if status else path
+        if role == Qt.ToolTipRole:
+            return "\n".join(filter(None, (path, self._size_text(path), self._status.get(path))))
+        if role == Qt.UserRole:
+            return path
+        return None
+
+    def _size_text(self, path: str) -> str:
+        if path not in self._sizes:
+            try:
+                self._sizes[path] = os.path.getsize(path)
+            except OSError:
+                self._sizes[path] = None
+        size = self._sizes[path]
+        if size is None:
+            return "（文件不存在）"
+        return f"{size / (1 << 20):.2f} MB" if size >= 1 << 20 else f"{size / 1024:.1f} KB"
+
+    def paths(self) -> List[str]:
+        return list(self._paths)
+
+    def add_paths(self, paths) -> int:
+        """追加不在列表里的 Word 文件，返回新增个数"""
+        new = []
+        seen = self._rows
+        for p in paths:
+            if p not in seen and is_word_file(p):
+                seen[p] = len(self._paths) + len(new)
+                new.append(p)
+        if new:
+            first = len(self._paths)
+            self.beginInsertRows(QModelIndex(), first, first + len(new) - 1)
+            self._paths.extend(new)
+            self.endInsertRows()
+        return len(new)
+
+    def remove_rows(self, rows):
+        """移除若干行（任意顺序）：从后往前按连续区间删，删完统一重建行号索引"""
+        rows = sorted(set(rows), reverse=True)
+        if not rows:
+            return
+        ranges = []
+        for r in rows:
+            if ranges and ranges[-1][0] == r + 1:
+                ranges[-1][0] = r
+            else:
+                ranges.append([r, r])
+        for first, last in ranges:
+            self.beginRemoveRows(QModelIndex(), first, last)
+            for p in self._paths[first:last + 1]:
+                self._status.pop(p, None)
+                self._sizes.pop(p, None)
+            del self._paths[first:last + 1]
+            self.endRemoveRows()
+        self._rows = {p: i for i, p in enumerate(self._paths)}
+
+    def clear(self):
+        self.beginResetModel()
+        self._paths = []
+        self._rows = {}
+        self._status = {}
+        self._sizes = {}
+        self.endResetModel()
+
+    def clear_status(self):
+        if self._status and self._paths:
+            self._status = {}
+            self.dataChanged.emit(self.index(0), self.index(len(self._paths) - 1), [Qt.DisplayRole, Qt.ToolTipRole])
+
+    def set_status(self, path: str, status: str):
+        """更新某个文件的状态（不在列表里的忽略）；只通知这一行重绘"""
+        row = self._rows.get(path)
+        if row is None:
+            return
+        self._status[path] = status
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.ToolTipRole])
+
+
+class DropListView(QListView):
+    # 拖进来的原始路径（文件/文件夹），由 MainWindow 交给后台扫描，不在 UI 线程里读目录
+    pathsDropped = pyqtSignal(list)
+
+    def __init__(self, model: FileListModel):
+        super().__init__()
+        self.setModel(model)
+        # 各行同高：滚动/布局只算可见的行，几万行也不卡
+        self.setUniformItemSizes(True)
         self.setAcceptDrops(True)
         self.setSelectionMode(self.ExtendedSelection)
-        self.setToolTip("把 .doc/.docx 文件拖进来（也支持拖文件夹：自动读取文件夹内 doc/docx）")
+        self.setToolTip("把 .doc/.docx 文件拖进来（也支持拖文件夹：后台递归扫描子文件夹内的 doc/docx）")
 
     def dragEnterEvent(self, event):
         if event.mimeData().hasUrls():
@@ -242,95 +347,212 @@ class DropListWidget(QListWidget):
         event.acceptProposedAction()
 
     def dropEvent(self, event):
-        paths = []
-        for url in event.mimeData().urls():
-            p = url.toLocalFile()
-            if os.path.isdir(p):
-                for name in os.listdir(p):
-                    fp = os.path.join(p, name)
-                    if os.path.isfile(fp) and is_word_file(fp):
-                        paths.append(fp)
-            else:
-                if os.path.isfile(p) and is_word_file(p):
-                    paths.append(p)
-
+        paths = [url.toLocalFile() for url in event.mimeData().urls() if url.isLocalFile()]
         if paths:
-            self.filesDropped.emit(paths)
+            self.pathsDropped.emit(paths)
         event.acceptProposedAction()
 
 
-@dataclass
-class JobConfig:
-    naming_mode: str      # "overwrite" | "suffix" | "custom"
-    suffix: str
-    custom_name: str
-    output_dir: str
-    use_same_dir: bool
-    output_ext: str       # ".docx" or ".doc"
-    keep_blank_lines: int
-    tab_to_space: bool
-    compress_spaces: bool
-    process_headers_footers: bool
+class ScanWorker(QThread):
+    """
+    后台递归扫描拖入的文件/文件夹（os.scandir），找到的文件分批回传，列表边扫边填；
+    网络共享、大目录不会卡住界面
+    """
+    found = pyqtSignal(list)
+    finished_scan = pyqtSignal(int, bool)  # (找到的文件数, 是否被取消)
+
+    BATCH_SIZE = 200
+    BATCH_INTERVAL = 0.1  # 秒：文件来得慢时也按时把已找到的送出去
+
+    def __init__(self, paths: List[str], include=(), exclude=()):
+        super().__init__()
+        self.paths = paths
+        self.include = include
+        self.exclude = exclude
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        total = 0
+        batch = []
+        last = time.monotonic()
+
+        def flush():
+            nonlocal total, batch, last
+            if batch:
+                self.found.emit(batch)
+                total += len(batch)
+                batch = []
+            last = time.monotonic()
+
+        def should_stop():
+            # 每进一个文件夹都会调用：一直没有新文件（如大片不含 Word 文档的目录）时也按时送出已找到的
+            if batch and time.monotonic() - last >= self.BATCH_INTERVAL:
+                flush()
+            return self._cancelled
+
+        # 直接拖入的文件由 scan_word_files 按后缀与 include / exclude 通配符过滤
+        for path in scan_word_files(self.paths, include=self.include, exclude=self.exclude,
+                                    should_stop=should_stop):
+            batch.append(path)
+            if len(batch) >= self.BATCH_SIZE or time.monotonic() - last >= self.BATCH_INTERVAL:
+                flush()
+        if not self._cancelled:
+            flush()
+        self.finished_scan.emit(total, self._cancelled)
 
 
 class Worker(QThread):
     log = pyqtSignal(str)
     progress = pyqtSignal(int, int)
-    finished_ok = pyqtSignal()
+    file_status = pyqtSignal(str, str)  # (输入路径, 状态)：文件列表里逐行显示
+    finished_ok = pyqtSignal(int, int, int)  # (成功, 失败, 跳过)
     failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+    # 汇总里最多列出的失败文件数（完整列表见报告 / 日志）
+    MAX_FAILED_LISTED = 20
 
-    def __init__(self, files: List[str], cfg: JobConfig):
+    def __init__(self, files: List[str], cfg: JobConfig, journal: BatchJournal = None):
         super().__init__()
         self.files = files
         self.cfg = cfg
+        # 断点续跑日志（已 begin）：逐文件落盘，续跑时跳过上次已成功的文件
+        self.journal = journal
+        self._finished = 0
+        # ✅ 并行执行器：每个子进程各自持有 Word 会话（进程内 CoInitialize）；workers=1 时在本线程顺序处理
+        self.executor = ParallelExecutor(cfg)
 
     def build_output_path(self, in_path: str) -> str:
-        base_dir = os.path.dirname(in_path)
-        in_name = os.path.splitext(os.path.basename(in_path))[0]
-
-        out_dir = base_dir if self.cfg.use_same_dir or not self.cfg.output_dir else self.cfg.output_dir
-        os.makedirs(out_dir, exist_ok=True)
+        return build_output_path(in_path, self.cfg)
 
-        # ✅ 严格按用户选择
-        if self.cfg.naming_mode == "overwrite":
-            out_name = in_name
-        elif self.cfg.naming_mode == "custom":
-            out_name = self.cfg.custom_name if self.cfg.custom_name else (in_name + "_cleaned")
-        else:
-            suf = self.cfg.suffix if self.cfg.suffix else "_cleaned"
-            out_name = in_name + suf
+    def cancel(self):
+        """UI 线程调用：不再派发新文件，等正在处理的文件完成后退出"""
+        self.executor.cancel()
 
-        return os.path.join(out_dir, out_name + self.cfg.output_ext)
+    def _on_dispatch(self, index: int, in_path: str, out_path: str):
+        self.file_status.emit(in_path, "预检中" if self.cfg.dry_run else "处理中")
+        if self.cfg.dry_run:
+            self.log.emit(f"🔍 开始预检：{in_path}")
+            return
+        self.log.emit(f"🚀 开始处理：{in_path}")
+        self.log.emit(f"📦 输出位置：{out_path}")
+
+    def status_text(self, res) -> str:
+        if not res.ok:
+            return "失败"
+        if res.cached:
+            return "缓存命中"
+        if self.cfg.dry_run:
+            return "会改动" if res.stats.get("changed") else "无需改动"
+        return f"完成 {res.seconds:.1f}s"
+
+    @staticmethod
+    def describe_changes(stats: dict) -> str:
+        """预检结果写成一句话"""
+        if not stats.get("changed"):
+            return "无需改动"
+        return (f"空白 {stats.get('whitespace_changed', 0)} 段，假列表 {stats.get('list_runs', 0)} 处"
+                f"（{stats.get('list_items', 0)} 项），多余空行 {stats.get('blank_removed', 0)} 个")
+
+    def _on_skip(self, in_path: str, out_path: str):
+        self.file_status.emit(in_path, "跳过")
+        self.log.emit(f"⏭ 跳过（上次已完成）：{os.path.basename(in_path)}")
+        self.progress.emit(self._finished + self.journal.skipped, len(self.files))
 
     def run(self):
-        # ✅ 关键：线程内初始化 COM，避免 CoInitialize 报错
-        pythoncom.CoInitialize()
-
         total = len(self.files)
+        ok = 0
+        failed = []
+        cache_hits = 0
+        analyzed = []   # 预检：各文件的改动计数
+        backends = BackendStats()
+        error = None
+        report = BatchReport(self.cfg) if self.cfg.write_report else None
+        journal = self.journal
+
+        files = self.files
+        if journal is not None:
+            files = journal.pending(files, self.build_output_path, on_skip=self._on_skip)
+
+        results = self.executor.run(files, on_dispatch=self._on_dispatch)
         try:
-            for i, f in enumerate(self.files, start=1):
-                outp = self.build_output_path(f)
-                self.log.emit(f"🚀 开始处理：{f}")
-                self.log.emit(f"📦 输出位置：{outp}")
-
-                process_document(
-                    f, outp,
-                    keep_max_blank_lines=self.cfg.keep_blank_lines,
-                    tab_to_space=self.cfg.tab_to_space,
-                    compress_spaces=self.cfg.compress_spaces,
-                    process_headers_footers=self.cfg.process_headers_footers
-                )
-
-                self.log.emit("✅ 完成\n")
-                self.progress.emit(i, total)
-
-            self.finished_ok.emit()
-
+            for res in results:
+                # 单个文件失败只记下来，继续处理后面的文件
+                if report is not None:
+                    report.add(res)
+                if journal is not None:
+                    journal.record(res)
+                self.file_status.emit(res.input_path, self.status_text(res))
+                backends.add(res)
+                if not res.ok:
+                    failed.append(res.input_path)
+                    tries = f"（已尝试 {res.attempts} 次）" if res.attempts > 1 else ""
+                    self.log.emit(f"❌ 失败：{res.input_path}\n   {res.error}{tries}\n")
+                elif res.cached:
+                    ok += 1
+                    cache_hits += 1
+                    self.log.emit(f"♻️ 缓存命中：{os.path.basename(res.input_path)}（未变化，复用上次输出）\n")
+                elif self.cfg.dry_run:
+                    ok += 1
+                    analyzed.append(res.stats)
+                    self.log.emit(f"🔍 {os.path.basename(res.input_path)}：{self.describe_changes(res.stats)}"
+                                  f"（{res.seconds:.1f}s）\n")
+                else:
+                    ok += 1
+                    if res.phases:
+                        self.log.emit(f"⏱ {format_phases(res.phases)}")
+                    tries = f"，第 {res.attempts} 次尝试" if res.attempts > 1 else ""
+                    self.log.emit(f"✅ 完成：{os.path.basename(res.input_path)}（{res.seconds:.1f}s{tries}）\n")
+                self._finished = ok + len(failed)
+                self.progress.emit(self._finished + (journal.skipped if journal else 0), total)
         except Exception as e:
-            self.failed.emit(str(e))
-
+            # 执行器本身出错（不是某个文件处理失败）
+            error = str(e) or type(e).__name__
         finally:
-            pythoncom.CoUninitialize()
+            results.close()
+
+        skipped = journal.skipped if journal is not None else 0
+        summary = f"📊 汇总：成功 {ok}，失败 {len(failed)}，跳过 {skipped}（共 {total}）"
+        if self.cfg.use_cache and not self.cfg.dry_run:
+            summary += f"，缓存命中 {cache_hits}"
+        self.log.emit(summary)
+        if backends.backends:
+            self.log.emit(f"🔀 各后端：{backends.format()}")
+        if self.cfg.dry_run:
+            t = analysis_totals(analyzed)
+            self.log.emit(f"🔍 预检：{t['changed_files']} 个文件会被改动；空白 {t['whitespace_changed']} 段，"
+                          f"假列表 {t['list_runs']} 处（{t['list_items']} 项），多余空行 {t['blank_removed']} 个"
+                          "（未写任何输出）")
+        if failed:
+            listed = "\n".join(f"   {p}" for p in failed[:self.MAX_FAILED_LISTED])
+            more = f"\n   …… 另有 {len(failed) - self.MAX_FAILED_LISTED} 个" if len(failed) > self.MAX_FAILED_LISTED else ""
+            self.log.emit(f"❌ 失败的文件：\n{listed}{more}")
+
+        if report is not None and report.results:
+            try:
+                json_path, csv_path = report.write()
+                self.log.emit(f"🧾 处理报告：{json_path}\n🧾 处理报告：{csv_path}")
+            except OSError as e:
+                self.log.emit(f"⚠️ 报告写入失败：{e}")
+
+        if journal is not None:
+            try:
+                if error is None and not self.executor.cancelled:
+                    journal.finish(ok=ok, failed=len(failed), skipped=skipped)
+                else:
+                    journal.close()
+            except OSError as e:
+                self.log.emit(f"⚠️ 断点日志写入失败：{e}")
+
+        if error is not None:
+            self.failed.emit(error)
+        elif self.executor.cancelled:
+            self.cancelled.emit()
+        else:
+            self.finished_ok.emit(ok, len(failed), skipped)
 
 
 class Card(QFrame):
@@ -340,18 +562,98 @@ class Card(QFrame):
         self.setFrameShape(QFrame.NoFrame)
 
 
+def default_log_dir() -> str:
+    base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "WordCleaner", "logs")
+
+
+class LogView(QPlainTextEdit):
+    """
+    运行日志：几万个文件时每行都直接追加、重绘会拖垮界面，所以
+    - append_line() 只放进缓冲，定时器每 FLUSH_INTERVAL 毫秒把攒下的行一次性追加（一次重绘）
+    - 界面里只保留最近 MAX_LINES 行（环形缓冲，最早的自动丢弃）
+    - 完整日志另写到文件（start_file / close_file），界面里丢掉的行仍可查
+    """
+
+    FLUSH_INTERVAL = 100   # 毫秒
+    MAX_LINES = 5000
+    KEEP_FILES = 50        # 日志目录里最多保留的文件数（按修改时间淘汰最旧的）
+
+    def __init__(self):
+        super().__init__()
+        self.setReadOnly(True)
+        self.setMaximumBlockCount(self.MAX_LINES)
+        self._pending = []
+        self._file = None
+        self.file_path = ""
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self.FLUSH_INTERVAL)
+        self._timer.timeout.connect(self.flush)
+
+    def append_line(self, s: str):
+        self._pending.append(s)
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def flush(self):
+        self._timer.stop()
+        if not self._pending:
+            return
+        text = "\n".join(self._pending)
+        self._pending = []
+        self.appendPlainText(text)
+        if self._file is not None:
+            try:
+                self._file.write(f"[{time.strftime('%H:%M:%S')}] " + text.replace("\n", "\n           ") + "\n")
+                self._file.flush()
+            except OSError:
+                self.close_file()
+
+    def start_file(self, root: str = "") -> str:
+        """开始把日志另写到 <root>/WordCleaner_<时间>.log，返回路径；目录不可写时返回空串（只留界面日志）"""
+        self.close_file()
+        root = root or default_log_dir()
+        try:
+            os.makedirs(root, exist_ok=True)
+            self._prune(root)
+            path = os.path.join(root, time.strftime("WordCleaner_%Y%m%d_%H%M%S.log"))
+            self._file = open(path, "a", encoding="utf-8")
+        except OSError:
+            return ""
+        self.file_path = path
+        return path
+
+    def close_file(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._file = None
+
+    def _prune(self, root: str):
+        try:
+            entries = sorted((e.stat().st_mtime, e.path) for e in os.scandir(root) if e.name.endswith(".log"))
+        except OSError:
+            return
+        # 加上马上要新建的一个，共保留 KEEP_FILES 个
+        for _, path in entries[:max(0, len(entries) - self.KEEP_FILES + 1)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
 class MainWindow(QWidget):
+    PROGRESS_INTERVAL = 200  # 毫秒
+
     def __init__(self):
         super().__init__()
         self.settings = QSettings("MY43DN", "WordCleanerUI_Neon")
 
         self.setWindowTitle(" Word 格式炼化器")
 
-        # ✅ 选择 icon（优先同目录，找不到用绝对路径）
-        icon_path = pick_resource(DEFAULT_ICON, ABS_ICON)
-        if safe_exists(icon_path):
-            self.setWindowIcon(QIcon(icon_path))
-
         self.setFont(QFont("Microsoft YaHei UI", 10))
 
         root = QVBoxLayout(self)
@@ -366,13 +668,8 @@ class MainWindow(QWidget):
 
         self.logo_label = QLabel()
         self.logo_label.setFixedSize(64, 64)
-
-        # ✅ 选择 logo（优先同目录，找不到用绝对路径）
-        logo_path = pick_resource(DEFAULT_LOGO, ABS_LOGO)
-        if safe_exists(logo_path):
-            self.logo_label.setPixmap(rounded_square_pixmap(logo_path, size=64, radius=16))
-        else:
-            self.logo_label.setText("Logo 未找到")
+        # 图标 / Logo 等窗口第一次显示之后再加载（事件循环开始后才执行）
+        QTimer.singleShot(0, self.load_branding)
 
         title_box = QVBoxLayout()
         self.title = QLabel(" Word 格式炼化器")
@@ -397,26 +694,43 @@ class MainWindow(QWidget):
         left_layout.setContentsMargins(14, 14, 14, 14)
         left_layout.setSpacing(10)
 
-        hint = QLabel("📥 将 .doc / .docx 拖到下面；也可点“添加文件”。（支持拖文件夹）")
+        hint = QLabel("📥 将 .doc / .docx 拖到下面；也可点“添加文件”。（支持拖文件夹，自动递归扫描）")
         hint.setStyleSheet("color: rgba(217,226,239,0.72);")
         left_layout.addWidget(hint)
 
-        self.listw = DropListWidget()
-        self.listw.filesDropped.connect(self.add_files)
+        # 拖入文件夹时的过滤（文件名通配符，多个用 ; 分隔）
+        rowp = QHBoxLayout()
+        rowp.addWidget(QLabel("包含："))
+        self.ed_include = QLineEdit(self.settings.value("scan_include", ""))
+        self.ed_include.setPlaceholderText("全部 .doc/.docx，如 合同*;*.docx")
+        rowp.addWidget(self.ed_include, 1)
+        rowp.addWidget(QLabel("排除："))
+        self.ed_exclude = QLineEdit(self.settings.value("scan_exclude", "~$*"))
+        self.ed_exclude.setPlaceholderText("如 ~$*;备份*")
+        rowp.addWidget(self.ed_exclude, 1)
+        left_layout.addLayout(rowp)
+
+        self.files = FileListModel()
+        self.listw = DropListView(self.files)
+        self.listw.pathsDropped.connect(self.scan_paths)
         left_layout.addWidget(self.listw, 1)
 
         btn_row = QHBoxLayout()
         self.btn_add = QPushButton("➕ 添加文件")
         self.btn_remove = QPushButton("🗑️ 移除选中")
         self.btn_clear = QPushButton("🧹 清空列表")
+        self.btn_stop_scan = QPushButton("⏹ 停止扫描")
+        self.btn_stop_scan.setEnabled(False)
         btn_row.addWidget(self.btn_add)
         btn_row.addWidget(self.btn_remove)
         btn_row.addWidget(self.btn_clear)
+        btn_row.addWidget(self.btn_stop_scan)
         left_layout.addLayout(btn_row)
 
         self.btn_add.clicked.connect(self.pick_files)
         self.btn_remove.clicked.connect(self.remove_selected)
-        self.btn_clear.clicked.connect(self.listw.clear)
+        self.btn_clear.clicked.connect(self.clear_files)
+        self.btn_stop_scan.clicked.connect(self.cancel_scan)
 
         mid.addWidget(left_card, 2)
 
@@ -486,6 +800,16 @@ class MainWindow(QWidget):
         self.cb_hf = QCheckBox("处理页眉/页脚")
         self.cb_hf.setChecked(True)
 
+        self.cb_find_replace = QCheckBox("先用 Word 查找替换批量清理空白（大文档更快）")
+        self.cb_find_replace.setChecked(self.settings.value("find_replace", False, type=bool))
+        self.cb_find_replace.setToolTip("Tab/全角空格/连续空格在 Word 内整体替换，逐段只处理列表、首尾空白与空行；结果相同")
+
+        self.cb_cache = QCheckBox("结果缓存（跳过内容与参数都没变的文件）")
+        self.cb_cache.setChecked(self.settings.value("use_cache", False, type=bool))
+
+        self.cb_report = QCheckBox("生成处理报告（JSON/CSV，含各阶段耗时）")
+        self.cb_report.setChecked(self.settings.value("write_report", True, type=bool))
+
         rowb = QHBoxLayout()
         rowb.addWidget(QLabel("连续空行最多保留："))
         self.sp_blank = QSpinBox()
@@ -494,6 +818,24 @@ class MainWindow(QWidget):
         rowb.addWidget(self.sp_blank)
         rowb.addStretch(1)
 
+        roww = QHBoxLayout()
+        roww.addWidget(QLabel("并行进程数："))
+        self.sp_workers = QSpinBox()
+        self.sp_workers.setRange(1, max(1, os.cpu_count() or 1))
+        self.sp_workers.setValue(min(int(self.settings.value("workers", 1)), self.sp_workers.maximum()))
+        self.sp_workers.setToolTip("每个进程各开一个 Word 实例并行处理；1 = 顺序处理")
+        roww.addWidget(self.sp_workers)
+        roww.addSpacing(16)
+        roww.addWidget(QLabel("单文件时限："))
+        self.sp_timeout = QSpinBox()
+        self.sp_timeout.setRange(0, 3600)
+        self.sp_timeout.setSuffix(" 秒")
+        self.sp_timeout.setSpecialValueText("不限")
+        self.sp_timeout.setValue(int(self.settings.value("timeout", 0)))
+        self.sp_timeout.setToolTip("Word 卡死时强制结束并重试一次；大文件按每 MB 加 30 秒放宽。0 = 不限时")
+        roww.addWidget(self.sp_timeout)
+        roww.addStretch(1)
+
         rowe = QHBoxLayout()
         rowe.addWidget(QLabel("输出格式："))
         self.rb_docx = QRadioButton(".docx（推荐）")
@@ -506,7 +848,11 @@ class MainWindow(QWidget):
         v3.addWidget(self.cb_tab2space)
         v3.addWidget(self.cb_compress)
         v3.addWidget(self.cb_hf)
+        v3.addWidget(self.cb_find_replace)
+        v3.addWidget(self.cb_cache)
+        v3.addWidget(self.cb_report)
         v3.addLayout(rowb)
+        v3.addLayout(roww)
         v3.addLayout(rowe)
 
         right_layout.addWidget(g_cfg)
@@ -516,6 +862,14 @@ class MainWindow(QWidget):
         self.btn_run.setObjectName("Primary")
         right_layout.addWidget(self.btn_run)
 
+        self.btn_dry = QPushButton("🔍 预检（只统计会改什么，不保存）")
+        self.btn_dry.setToolTip("逐个文件统计空白、假列表与空行的改动数量，不写输出；.docx 不启动 Word，适合先扫一遍整个归档")
+        right_layout.addWidget(self.btn_dry)
+
+        self.btn_cancel = QPushButton("⏹ 停止（处理完当前文件）")
+        self.btn_cancel.setEnabled(False)
+        right_layout.addWidget(self.btn_cancel)
+
         right_layout.addStretch(1)
 
         mid.addWidget(right_card, 1)
@@ -549,8 +903,7 @@ class MainWindow(QWidget):
         log_title.setStyleSheet("color: rgba(180,210,255,0.90); font-weight: 600;")
         log_layout.addWidget(log_title)
 
-        self.log = QTextEdit()
-        self.log.setReadOnly(True)
+        self.log = LogView()
         self.log.setPlaceholderText("这里会输出处理过程日志…")
         log_layout.addWidget(self.log)
 
@@ -563,16 +916,40 @@ class MainWindow(QWidget):
         root.addWidget(self.footer)
 
         # ===== 绑定 =====
-        self.btn_run.clicked.connect(self.run_job)
+        self.btn_run.clicked.connect(lambda: self.run_job())
+        self.btn_dry.clicked.connect(lambda: self.run_job(dry_run=True))
+        self.btn_cancel.clicked.connect(self.cancel_job)
 
         self.rb_overwrite.toggled.connect(self.sync_mode_ui)
         self.rb_suffix.toggled.connect(self.sync_mode_ui)
         self.rb_custom.toggled.connect(self.sync_mode_ui)
         self.sync_mode_ui()
 
+        # 进度条 / 状态栏：Worker 每个文件都报一次进度，这里最多每 PROGRESS_INTERVAL 毫秒刷新一次
+        self._progress_value = None
+        self._progress_timer = QTimer(self)
+        self._progress_timer.setSingleShot(True)
+        self._progress_timer.setInterval(self.PROGRESS_INTERVAL)
+        self._progress_timer.timeout.connect(self.show_progress)
+
         self.worker = None
+        self.scanners = []
         self.resize(1200, 800)
 
+    def load_branding(self):
+        """窗口图标 + 圆角 Logo（读图、缩放、蒙版都不影响首屏）"""
+        # ✅ 选择 icon（优先同目录，找不到用绝对路径）
+        icon_path = pick_resource(DEFAULT_ICON, ABS_ICON)
+        if safe_exists(icon_path):
+            self.setWindowIcon(QIcon(icon_path))
+
+        # ✅ 选择 logo（优先同目录，找不到用绝对路径）
+        logo_path = pick_resource(DEFAULT_LOGO, ABS_LOGO)
+        if safe_exists(logo_path):
+            self.logo_label.setPixmap(rounded_square_pixmap(logo_path, size=64, radius=16))
+        else:
+            self.logo_label.setText("Logo 未找到")
+
     def sync_mode_ui(self):
         """根据输出策略启用/禁用输入框，避免误用"""
         if self.rb_suffix.isChecked():
@@ -586,19 +963,46 @@ class MainWindow(QWidget):
             self.ed_custom.setEnabled(False)
 
     def append_log(self, s: str):
-        self.log.append(s)
+        self.log.append_line(s)
 
     def add_files(self, files: List[str]):
-        existing = set(self.get_all_files())
-        for f in files:
-            if f not in existing and is_word_file(f):
-                item = QListWidgetItem(f)
-                item.setToolTip(f)
-                self.listw.addItem(item)
-        self.status_label.setText(f"状态：已加载 {self.listw.count()} 个文件")
+        self.files.add_paths(files)
+        self.status_label.setText(f"状态：已加载 {self.files.rowCount()} 个文件")
+
+    def scan_paths(self, paths: List[str]):
+        """拖入的文件/文件夹交给后台线程递归扫描，找到的文件分批加入列表"""
+        include = split_patterns(self.ed_include.text())
+        exclude = split_patterns(self.ed_exclude.text())
+        self.settings.setValue("scan_include", self.ed_include.text().strip())
+        self.settings.setValue("scan_exclude", self.ed_exclude.text().strip())
+
+        scanner = ScanWorker(paths, include, exclude)
+        scanner.found.connect(self.add_files)
+        scanner.finished_scan.connect(lambda total, cancelled, s=scanner: self.on_scan_finished(s, total, cancelled))
+        self.scanners.append(scanner)
+        self.btn_stop_scan.setEnabled(True)
+        self.status_label.setText("状态：正在扫描文件夹…")
+        scanner.start()
+
+    def cancel_scan(self):
+        for scanner in self.scanners:
+            scanner.cancel()
+        self.btn_stop_scan.setEnabled(False)
+
+    def on_scan_finished(self, scanner: "ScanWorker", total: int, cancelled: bool):
+        scanner.wait()
+        self.scanners.remove(scanner)
+        scanner.deleteLater()
+        self.btn_stop_scan.setEnabled(bool(self.scanners))
+        if cancelled:
+            self.append_log(f"⏹ 扫描已停止：已找到 {total} 个文件")
+        else:
+            self.append_log(f"📂 扫描完成：找到 {total} 个 Word 文件")
+        if not self.scanners:
+            self.status_label.setText(f"状态：已加载 {self.files.rowCount()} 个文件")
 
     def get_all_files(self) -> List[str]:
-        return [self.listw.item(i).text() for i in range(self.listw.count())]
+        return self.files.paths()
 
     def pick_files(self):
         last = self.settings.value("last_open_dir", os.path.expanduser("~"))
@@ -616,9 +1020,12 @@ class MainWindow(QWidget):
             self.cb_same_dir.setChecked(False)
 
     def remove_selected(self):
-        for item in self.listw.selectedItems():
-            self.listw.takeItem(self.listw.row(item))
-        self.status_label.setText(f"状态：已加载 {self.listw.count()} 个文件")
+        self.files.remove_rows(index.row() for index in self.listw.selectionModel().selectedRows())
+        self.status_label.setText(f"状态：已加载 {self.files.rowCount()} 个文件")
+
+    def clear_files(self):
+        self.files.clear()
+        self.status_label.setText("状态：已加载 0 个文件")
 
     def build_config(self) -> JobConfig:
         if self.rb_overwrite.isChecked():
@@ -639,67 +1046,187 @@ class MainWindow(QWidget):
             tab_to_space=self.cb_tab2space.isChecked(),
             compress_spaces=self.cb_compress.isChecked(),
             process_headers_footers=self.cb_hf.isChecked(),
+            find_replace=self.cb_find_replace.isChecked(),
+            workers=int(self.sp_workers.value()),
+            timeout=float(self.sp_timeout.value()),
+            use_cache=self.cb_cache.isChecked(),
+            write_report=self.cb_report.isChecked(),
         )
 
         self.settings.setValue("suffix", cfg.suffix)
         self.settings.setValue("custom_name", cfg.custom_name)
         self.settings.setValue("out_dir", cfg.output_dir)
+        self.settings.setValue("workers", cfg.workers)
+        self.settings.setValue("timeout", int(cfg.timeout))
+        self.settings.setValue("use_cache", cfg.use_cache)
+        self.settings.setValue("find_replace", cfg.find_replace)
+        self.settings.setValue("write_report", cfg.write_report)
         return cfg
 
-    def run_job(self):
+    def run_job(self, dry_run: bool = False):
+        if self.scanners:
+            QMessageBox.warning(self, "正在扫描", "文件夹还在扫描中，请等扫描完成或点“停止扫描”后再开始。")
+            return
+
         files = self.get_all_files()
         if not files:
             QMessageBox.warning(self, "未检测到文件", "请先拖入或添加 .doc/.docx 文件。")
             return
 
         cfg = self.build_config()
+        cfg.dry_run = dry_run
 
-        if cfg.naming_mode == "custom" and len(files) != 1:
+        if not dry_run and cfg.naming_mode == "custom" and len(files) != 1:
             QMessageBox.warning(self, "自定义模式限制", "自定义输出名仅支持单文件处理。")
             return
 
-        if (not cfg.use_same_dir) and (not cfg.output_dir):
+        if not dry_run and (not cfg.use_same_dir) and (not cfg.output_dir):
             QMessageBox.warning(self, "输出目录为空", "请选择输出目录，或勾选“输出到原目录”。")
             return
 
+        # 预检不写输出，也不需要断点日志
+        journal = None if dry_run else self.open_journal(files, cfg)
+        if journal is False:
+            return
+
         self.btn_run.setEnabled(False)
+        self.btn_dry.setEnabled(False)
+        self.btn_cancel.setEnabled(True)
         self.progress.setValue(0)
-        self.status_label.setText("状态：炼化启动中…")
+        self.files.clear_status()
+        self.status_label.setText("状态：预检启动中…" if dry_run else "状态：炼化启动中…")
 
-        self.append_log("========== 🚀 任务启动 ==========")
+        log_path = self.log.start_file()
+        self.append_log("========== 🔍 预检启动（不保存） ==========" if dry_run else "========== 🚀 任务启动 ==========")
+        if log_path:
+            self.append_log(f"完整日志：{log_path}")
         self.append_log(f"文件数量：{len(files)}")
         self.append_log(f"输出策略：{cfg.naming_mode}")
         self.append_log(f"输出格式：{cfg.output_ext}")
+        self.append_log(f"并行进程：{cfg.workers}")
+        if cfg.backend == "auto":
+            self.append_log("处理后端：自动（.docx 用 XML 引擎、不启动 Word；.doc 或输出 .doc 用 Word）")
+        if cfg.timeout > 0:
+            self.append_log(f"单文件时限：{cfg.timeout:g} 秒（每 MB 另加 {cfg.timeout_per_mb:g} 秒，超时重试 {cfg.max_retries} 次）")
         self.append_log("================================\n")
 
-        self.worker = Worker(files, cfg)
+        self.worker = Worker(files, cfg, journal)
         self.worker.log.connect(self.append_log)
         self.worker.progress.connect(self.on_progress)
+        self.worker.file_status.connect(self.files.set_status)
         self.worker.finished_ok.connect(self.on_done)
         self.worker.failed.connect(self.on_fail)
+        self.worker.cancelled.connect(self.on_cancelled)
         self.worker.start()
 
+    def open_journal(self, files: List[str], cfg: JobConfig):
+        """
+        找到这批文件的断点日志：上次没跑完就问是否续跑。
+        返回已 begin 的 BatchJournal；日志不可用时返回 None（照常处理）；用户取消返回 False
+        """
+        try:
+            journal = BatchJournal.for_job(files, cfg).load()
+        except OSError as e:
+            self.append_log(f"⚠️ 断点日志不可用：{e}")
+            return None
+
+        resume = False
+        if journal.done and not journal.completed:
+            ans = QMessageBox.question(
+                self, "继续上次的任务？",
+                f"这批文件上次处理到一半就中断了（已成功 {len(journal.done)} 个）。\n\n"
+                "是：跳过已完成的文件，接着处理\n否：全部重新处理",
+                QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel, QMessageBox.Yes
+            )
+            if ans == QMessageBox.Cancel:
+                return False
+            resume = ans == QMessageBox.Yes
+
+        try:
+            journal.begin(resume, files=len(files), backend=cfg.backend)
+        except OSError as e:
+            self.append_log(f"⚠️ 断点日志不可用：{e}")
+            return None
+        if resume:
+            self.append_log(f"⏭ 续跑：跳过上次已完成的文件（日志：{journal.path}）")
+        return journal
+
+    def cancel_job(self):
+        if self.worker is not None and self.worker.isRunning():
+            self.worker.cancel()
+            self.btn_cancel.setEnabled(False)
+            self.status_label.setText("状态：正在停止（等待当前文件完成）…")
+
     def on_progress(self, done: int, total: int):
+        # 只记下最新进度，定时器到点再刷新界面
+        self._progress_value = (done, total)
+        if not self._progress_timer.isActive():
+            self._progress_timer.start()
+
+    def show_progress(self):
+        if self._progress_value is None:
+            return
+        done, total = self._progress_value
+        self._progress_value = None
         pct = int(done * 100 / total)
         self.progress.setValue(pct)
         self.status_label.setText(f"状态：处理中 {done}/{total}（{pct}%）")
 
-    def on_done(self):
-        self.append_log("========== ✅ 全部完成 ==========")
-        self.status_label.setText("状态：完成 ✅")
-        self.progress.setValue(100)
+    def end_job(self):
+        """任务结束（完成 / 停止 / 出错）：丢掉还没刷新的进度，日志全部刷出并关闭日志文件"""
+        self._progress_timer.stop()
+        self._progress_value = None
+        self.log.flush()
+        self.log.close_file()
         self.btn_run.setEnabled(True)
-        QMessageBox.information(self, "完成", "所有文件处理完成！")
+        self.btn_dry.setEnabled(True)
+        self.btn_cancel.setEnabled(False)
+
+    def on_done(self, ok: int, failed: int, skipped: int):
+        self.progress.setValue(100)
+        note = f"（跳过上次已完成的 {skipped} 个）" if skipped else ""
+        if failed:
+            self.append_log("========== ⚠️ 完成（有失败） ==========")
+            self.end_job()
+            self.status_label.setText(f"状态：完成，{failed} 个失败 ⚠️")
+            QMessageBox.warning(self, "完成（有失败）",
+                                f"成功 {ok} 个，失败 {failed} 个{note}。\n失败的文件与原因见日志。")
+        elif self.worker.cfg.dry_run:
+            self.append_log("========== 🔍 预检完成 ==========")
+            self.end_job()
+            self.status_label.setText("状态：预检完成 ✅")
+            QMessageBox.information(self, "预检完成", f"已统计 {ok} 个文件的改动（未写任何输出），明细见日志。")
+        else:
+            self.append_log("========== ✅ 全部完成 ==========")
+            self.end_job()
+            self.status_label.setText("状态：完成 ✅")
+            QMessageBox.information(self, "完成", f"所有文件处理完成！{note}")
+
+    def on_cancelled(self):
+        self.append_log("========== ⏹ 已停止 ==========")
+        self.end_job()
+        self.status_label.setText("状态：已停止 ⏹")
 
     def on_fail(self, err: str):
         self.append_log("========== ❌ 发生错误 ==========")
         self.append_log(err)
+        self.end_job()
         self.status_label.setText("状态：失败 ❌")
-        self.btn_run.setEnabled(True)
         QMessageBox.critical(self, "错误", f"处理失败：\n{err}")
 
+    def closeEvent(self, event):
+        # 扫描线程还在跑时先停下，避免 QThread 在运行中被销毁
+        for scanner in list(self.scanners):
+            scanner.cancel()
+            scanner.wait()
+        self.log.flush()
+        self.log.close_file()
+        super().closeEvent(event)
+
 
 def main():
+    import multiprocessing
+    multiprocessing.freeze_support()  # PyInstaller 打包后子进程入口
     app = QApplication(sys.argv)
     app.setStyleSheet(neon_stylesheet())
     w = MainWindow()
@@ -0,0 +1,755 @@
+# batch.py
+"""
+批处理核心（不依赖 PyQt）：任务配置、输出路径规则、按文件处理的后端，
+以及多进程并行执行器（每个子进程各自持有一个 Word 会话 / OOXML 后端）
+"""
+import os
+import csv
+import json
+import time
+import signal
+import fnmatch
+import importlib
+import threading
+from dataclasses import dataclass, asdict, field
+from typing import Callable, Iterable, Iterator, Optional, Sequence
+
+from word_processor import COM_UNAVAILABLE, PhaseTimer, WordSession, com_available, process_document, route_backend
+
+
+@dataclass
+class JobConfig:
+    naming_mode: str      # "overwrite" | "suffix" | "custom"
+    suffix: str
+    custom_name: str
+    output_dir: str
+    use_same_dir: bool
+    output_ext: str       # ".docx" or ".doc"
+    keep_blank_lines: int
+    tab_to_space: bool
+    compress_spaces: bool
+    process_headers_footers: bool
+    workers: int = 1      # 并行进程数；1 = 在当前线程顺序处理
+    backend: str = "auto"  # "auto"（.docx 走 ooxml，.doc 走 com）| "com" | "ooxml" | "模块:函数"（自定义后端，签名同 process_document）
+    compress_level: int = 6   # OOXML：改写过的 XML 部件的压缩级别（0~9），其余成员原样拷贝
+    find_replace: bool = False  # COM：先用 Word 查找替换整体清理空白，逐段读写的段落更少（结果相同）
+    use_cache: bool = False   # 结果缓存：输入与选项都没变时直接复用上次输出
+    cache_dir: str = ""       # 空 = 默认目录（%LOCALAPPDATA%/WordCleaner/cache）
+    cache_max_mb: int = 2048
+    cache_link: bool = False  # 命中时硬链接而非复制（同盘时更快，注意输出与缓存共用同一份数据）
+    write_report: bool = True  # 批处理结束后在输出目录写 JSON/CSV 报告（逐文件、分阶段耗时）
+    timeout: float = 0.0      # 单个文档的处理时限（秒）；0 = 不限时。超时强制结束子进程及其 Word 进程
+    timeout_per_mb: float = 30.0  # 时限按输入文件大小追加（秒/MB），大文档给更多时间
+    max_retries: int = 1      # 超时 / 子进程崩溃后换新进程重试的次数（普通处理错误不重试）
+    dry_run: bool = False     # 预检：只统计会改动什么（空白、假列表、空行），不写任何输出；.docx 不需要 Word
+
+
+def is_word_file(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in (".doc", ".docx")
+
+
+# 默认排除：Word 打开文档时生成的 ~$ 锁文件
+DEFAULT_EXCLUDE = ("~$*",)
+
+
+def split_patterns(text: str) -> tuple:
+    """界面/命令行里的通配符列表："*.docx; 合同*" → ("*.docx", "合同*")"""
+    return tuple(p.strip() for p in text.replace(",", ";").split(";") if p.strip())
+
+
+def match_any(name: str, patterns: Sequence[str]) -> bool:
+    name = name.lower()
+    return any(fnmatch.fnmatchcase(name, p.lower()) for p in patterns)
+
+
+def scan_word_files(
+    paths: Iterable[str],
+    recursive: bool = True,
+    include: Sequence[str] = (),
+    exclude: Sequence[str] = DEFAULT_EXCLUDE,
+    should_stop: Optional[Callable[[], bool]] = None
+) -> Iterator[str]:
+    """
+    展开输入（os.scandir，惰性产出）：文件夹按名称顺序产出其中的 .doc/.docx，
+    同一层先文件后子文件夹（与 os.walk 一致），不跟随符号链接，无权限的子文件夹跳过。
+    直接给出的文件（含标准输入清单）同样按后缀与 include / exclude 过滤；
+    不存在的路径只要文件名符合条件仍会产出，由 run_one 记为“文件不存在”的失败结果，而不是悄悄丢掉。
+    - include：文件名通配符，非空时只要匹配其一的文件（不区分大小写）
+    - exclude：文件名 / 文件夹名通配符，匹配的跳过（默认跳过 ~$ 锁文件）
+    - should_stop：返回 True 时尽快结束（后台扫描取消用）
+    """
+    for p in paths:
+        if should_stop is not None and should_stop():
+            return
+        if not os.path.isdir(p):
+            name = os.path.basename(p)
+            if is_word_file(name) and not match_any(name, exclude) and (not include or match_any(name, include)):
+                yield p
+            continue
+
+        stack = [p]
+        while stack:
+            if should_stop is not None and should_stop():
+                return
+            folder = stack.pop()
+            try:
+                with os.scandir(folder) as it:
+                    entries = sorted(it, key=lambda e: e.name)
+            except OSError:
+                continue
+
+            subdirs = []
+            for entry in entries:
+                if match_any(entry.name, exclude):
+                    continue
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif entry.is_file() and is_word_file(entry.name):
+                        if not include or match_any(entry.name, include):
+                            yield entry.path
+                except OSError:
+                    continue
+            if recursive:
+                stack.extend(reversed(subdirs))
+
+
+def iter_word_files(paths: Iterable[str], recursive: bool = True) -> Iterator[str]:
+    """
+    展开输入：文件与文件夹（默认递归）中的 .doc/.docx 按名称顺序产出；
+    跳过 Word 打开文档时生成的 ~$ 临时文件。惰性产出，适合很大的目录 / 标准输入清单
+    """
+    return scan_word_files(paths, recursive)
+
+
+def build_output_path(in_path: str, cfg: JobConfig) -> str:
+    base_dir = os.path.dirname(in_path)
+    in_name = os.path.splitext(os.path.basename(in_path))[0]
+
+    out_dir = base_dir if cfg.use_same_dir or not cfg.output_dir else cfg.output_dir
+    os.makedirs(out_dir, exist_ok=True)
+
+    # ✅ 严格按用户选择
+    if cfg.naming_mode == "overwrite":
+        out_name = in_name
+    elif cfg.naming_mode == "custom":
+        out_name = cfg.custom_name if cfg.custom_name else (in_name + "_cleaned")
+    else:
+        suf = cfg.suffix if cfg.suffix else "_cleaned"
+        out_name = in_name + suf
+
+    return os.path.join(out_dir, out_name + cfg.output_ext)
+
+
+def time_limit(in_path: str, cfg: JobConfig) -> float:
+    """单个文档的处理时限（秒）= timeout + timeout_per_mb × 文件大小（MB）；0 表示不限时"""
+    if cfg.timeout <= 0:
+        return 0.0
+    try:
+        size = os.path.getsize(in_path)
+    except OSError:
+        size = 0
+    return cfg.timeout + cfg.timeout_per_mb * size / (1 << 20)
+
+
+@dataclass
+class FileResult:
+    """单个文件的处理结果（可跨进程传递）"""
+    index: int
+    input_path: str
+    output_path: str
+    ok: bool
+    error: str = ""
+    seconds: float = 0.0
+    stats: dict = field(default_factory=dict)
+    cached: bool = False
+    phases: dict = field(default_factory=dict)  # PhaseTimer.to_dict()
+    attempts: int = 1     # 第几次尝试得到的结果（超时 / 崩溃后会重试）
+    backend: str = ""     # 实际处理它的后端（"com" / "ooxml" / 自定义；缓存命中为 "cache"）
+
+
+def backend_for(in_path: str, out_path: str, cfg: JobConfig) -> str:
+    """
+    这个文件由哪个后端处理：backend="auto" 时按文件路由（见 route_backend）；预检时 .docx 一律直接读 XML。
+    需要 Word 但没装 pywin32 时抛 RuntimeError（run_one 记为该文件的失败原因）
+    """
+    if cfg.dry_run:
+        if in_path.lower().endswith(".docx"):
+            return "ooxml"
+        if not com_available():
+            raise RuntimeError(f"{os.path.basename(in_path)} 需要 Word 预检：{COM_UNAVAILABLE}")
+        return "com"
+    return route_backend(in_path, out_path, cfg.backend)
+
+
+# 工作子进程里：当前后端进程（如 WINWORD.EXE）的 PID，与父进程共享；不在工作子进程中时为 None
+_backend_pid = None
+
+
+def report_backend_pid(pid: int):
+    """后端启动外部进程后调用（退出后传 0）：处理超时时执行器会连同这个进程一起强制结束"""
+    if _backend_pid is not None:
+        _backend_pid.value = pid
+
+
+def _kill_pid(pid: int):
+    try:
+        # Windows 上 os.kill 即 TerminateProcess
+        os.kill(pid, signal.SIGTERM if os.name == "nt" else signal.SIGKILL)
+    except OSError:
+        pass
+
+
+def _load_backend(spec: str):
+    """"模块:函数" → 函数"""
+    module, _, name = spec.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+
+class DocumentProcessor:
+    """
+    一个线程/进程内的处理后端：
+    - COM：首次使用时 CoInitialize 并启动 WordSession，之后整批复用
+    - OOXML：直接改写 XML，无需 Word
+    - "模块:函数"：自定义后端（如测试用的 benchmarks.fake_backend:process）
+    必须在创建它的线程里使用和关闭
+    """
+
+    def __init__(self, cfg: JobConfig):
+        self.cfg = cfg
+        self.session = None
+        self._com_initialized = False
+        self.cache = None
+        if cfg.use_cache:
+            from result_cache import ResultCache
+            self.cache = ResultCache(cfg.cache_dir, max_bytes=cfg.cache_max_mb << 20, link=cfg.cache_link)
+
+    def _word_session(self) -> WordSession:
+        if self.session is None:
+            # ✅ 关键：在使用 COM 的线程内初始化，避免 CoInitialize 报错
+            try:
+                import pythoncom
+            except ImportError:  # 非 Windows / 没装 pywin32：给出可操作的提示，而不是裸的 ModuleNotFoundError
+                raise RuntimeError(COM_UNAVAILABLE) from None
+            pythoncom.CoInitialize()
+            self._com_initialized = True
+            self.session = WordSession(on_backend=report_backend_pid)
+        return self.session
+
+    def process(self, in_path: str, out_path: str, timer: PhaseTimer = None) -> dict:
+        cfg = self.cfg
+        backend = backend_for(in_path, out_path, cfg)
+        options = dict(
+            keep_max_blank_lines=cfg.keep_blank_lines,
+            tab_to_space=cfg.tab_to_space,
+            compress_spaces=cfg.compress_spaces,
+            process_headers_footers=cfg.process_headers_footers,
+            find_replace=cfg.find_replace,
+            timer=timer
+        )
+        if backend == "com":
+            return self._word_session().process(in_path, out_path, **options) or {}
+        if ":" in backend:
+            return _load_backend(backend)(in_path, out_path, **options) or {}
+        return process_document(in_path, out_path, backend=backend, compress_level=cfg.compress_level,
+                                **options) or {}
+
+    def analyze(self, in_path: str, timer: PhaseTimer = None) -> dict:
+        """预检：.docx 一律直接读 XML（不启动 Word），.doc 只能用 Word 只读打开"""
+        cfg = self.cfg
+        options = dict(
+            keep_max_blank_lines=cfg.keep_blank_lines,
+            tab_to_space=cfg.tab_to_space,
+            compress_spaces=cfg.compress_spaces,
+            process_headers_footers=cfg.process_headers_footers,
+            timer=timer
+        )
+        if in_path.lower().endswith(".docx"):
+            from docx_engine import analyze_docx
+            return analyze_docx(in_path, **options)
+        if cfg.backend not in ("auto", "com"):
+            raise RuntimeError(".doc 预检需要 Word（backend='auto' 或 'com'）")
+        return self._word_session().analyze(in_path, **options)
+
+    def run_one(self, index: int, in_path: str, out_path: str) -> FileResult:
+        t0 = time.perf_counter()
+        timer = PhaseTimer()
+        backend = ""
+        if not os.path.isfile(in_path):
+            return FileResult(index, in_path, out_path, False, f"文件不存在：{in_path}", time.perf_counter() - t0)
+        try:
+            key = None
+            if self.cache is not None and not self.cfg.dry_run:
+                with timer.phase("cache"):
+                    key = self.cache.make_key(in_path, self.cfg)
+                    hit = self.cache.fetch(key, out_path)
+                if hit:
+                    return FileResult(index, in_path, out_path, True, "", time.perf_counter() - t0,
+                                      cached=True, phases=timer.to_dict(), backend="cache")
+            backend = backend_for(in_path, out_path, self.cfg)
+            if self.cfg.dry_run:
+                stats = self.analyze(in_path, timer)
+            else:
+                stats = self.process(in_path, out_path, timer)
+            if key is not None:
+                with timer.phase("cache"):
+                    self.cache.store(key, out_path)
+        except Exception as e:
+            return FileResult(index, in_path, out_path, False, str(e) or type(e).__name__,
+                              time.perf_counter() - t0, phases=timer.to_dict(), backend=backend)
+        return FileResult(index, in_path, out_path, True, "", time.perf_counter() - t0, stats,
+                          phases=timer.to_dict(), backend=backend)
+
+    def close(self):
+        if self.session is not None:
+            self.session.close()
+            self.session = None
+        if self._com_initialized:
+            import pythoncom
+            pythoncom.CoUninitialize()
+            self._com_initialized = False
+
+
+def _worker_main(conn, cfg_dict: dict, backend_pid=None):
+    """
+    子进程入口：收任务 (index, in, out)，回结果 FileResult；收到 None 退出
+    backend_pid：与父进程共享的整数，记录后端进程 PID（见 report_backend_pid）
+    """
+    global _backend_pid
+    _backend_pid = backend_pid
+    processor = DocumentProcessor(JobConfig(**cfg_dict))
+    try:
+        while True:
+            try:
+                task = conn.recv()
+            except EOFError:
+                break
+            if task is None:
+                break
+            conn.send(processor.run_one(*task))
+    finally:
+        processor.close()
+        conn.close()
+
+
+_EXHAUSTED = object()
+
+
+class ParallelExecutor:
+    """
+    按文件并行处理：
+    - workers 个子进程，每个进程一个后端实例（Word 会话在进程内复用）
+    - 每个子进程同一时间只派一个任务：在途任务数 <= workers，文件列表按需惰性读取（有界队列）
+    - run() 逐个产出 FileResult（完成顺序），便于实时刷新进度/日志
+    - cancel() 可从其他线程调用：停止派发，等在途文件完成后关闭子进程
+    - cfg.timeout > 0 时每个文档有处理时限（按文件大小放宽，见 time_limit）：超时强制结束子进程
+      及其 Word 进程、补一个新进程，该文件隔 RETRY_DELAY × 次数 秒后重试，最多 cfg.max_retries 次；
+      子进程崩溃同样重试。普通处理错误（文档损坏等）不重试
+    workers <= 1 且不限时时不启动子进程，直接在调用线程里顺序处理（限时需要能强制结束，总是用子进程）
+    """
+
+    RETRY_DELAY = 1.0   # 第 n 次重试前等待 n × RETRY_DELAY 秒
+
+    def __init__(self, cfg: JobConfig, workers: Optional[int] = None, *, shutdown_timeout: float = 30.0):
+        self.cfg = cfg
+        self.workers = max(1, int(workers if workers is not None else cfg.workers))
+        self.shutdown_timeout = shutdown_timeout
+        self._cancel = threading.Event()
+        self._procs = {}
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def run(self, files: Iterable[Optional[str]], on_dispatch=None) -> Iterator[FileResult]:
+        """
+        files：输入路径（可为生成器）；产出 None 表示“暂时没有新文件”（监视模式），执行器借机收结果后再来取
+        on_dispatch(index, in_path, out_path)：派发时回调（在调用线程中执行）
+        """
+        tasks = self._tasks(files)
+        if self.workers <= 1 and self.cfg.timeout <= 0:
+            yield from self._run_inline(tasks, on_dispatch)
+        else:
+            yield from self._run_pool(tasks, on_dispatch)
+
+    def _tasks(self, files):
+        i = 0
+        for f in files:
+            if f is None:
+                yield None
+                continue
+            i += 1
+            # 预检不写输出、输入不存在：不算输出路径（build_output_path 会建目录）
+            yield i, f, "" if self.cfg.dry_run or not os.path.isfile(f) else build_output_path(f, self.cfg)
+
+    def _run_inline(self, tasks, on_dispatch):
+        processor = DocumentProcessor(self.cfg)
+        try:
+            for task in tasks:
+                if self.cancelled:
+                    break
+                if task is None:
+                    continue
+                if on_dispatch:
+                    on_dispatch(*task)
+                yield processor.run_one(*task)
+        finally:
+            processor.close()
+
+    def _spawn(self, ctx, cfg_dict):
+        parent_conn, child_conn = ctx.Pipe()
+        backend_pid = ctx.Value("q", 0, lock=False)
+        p = ctx.Process(target=_worker_main, args=(child_conn, cfg_dict, backend_pid), daemon=True)
+        p.start()
+        child_conn.close()
+        self._procs[parent_conn] = (p, backend_pid)
+        return parent_conn
+
+    def _kill(self, conn):
+        """强制结束子进程及其后端进程（卡在 Documents.Open / SaveAs 里的 Word）"""
+        p, backend_pid = self._procs.pop(conn)
+        pid = backend_pid.value
+        if p.is_alive():
+            p.kill()
+        p.join()
+        if pid:
+            _kill_pid(pid)
+        conn.close()
+
+    def _retry_or_fail(self, retry: list, task, attempt: int, result: FileResult):
+        """超时 / 崩溃：还能重试就排进重试队列（返回 None），否则返回最终的失败结果"""
+        result.attempts = attempt
+        if attempt > self.cfg.max_retries or self.cancelled:
+            return result
+        retry.append((time.monotonic() + self.RETRY_DELAY * attempt, attempt + 1, task, result))
+        return None
+
+    def _run_pool(self, tasks, on_dispatch):
+        # 只有并行时才需要 multiprocessing（顺序处理 / 只用 JobConfig 时不付这份导入开销）
+        import multiprocessing
+        from multiprocessing.connection import wait
+
+        ctx = multiprocessing.get_context("spawn")
+        cfg_dict = asdict(self.cfg)
+        self._procs = {}
+        idle = []
+        busy = {}     # conn -> (task, 第几次尝试, 派发时间, 时限)
+        retry = []    # 待重试：(最早派发时间, 第几次尝试, task, 上次的失败结果)
+
+        try:
+            for _ in range(self.workers):
+                idle.append(self._spawn(ctx, cfg_dict))
+
+            exhausted = False
+            while True:
+                # 派发：空闲子进程各领一个任务，到期的重试优先
+                while idle and not self.cancelled:
+                    now = time.monotonic()
+                    due = next((r for r in retry if r[0] <= now), None)
+                    if due is not None:
+                        retry.remove(due)
+                        _, attempt, task, _ = due
+                    else:
+                        if exhausted:
+                            break
+                        task = next(tasks, _EXHAUSTED)
+                        if task is _EXHAUSTED:
+                            exhausted = True
+                            break
+                        if task is None:
+                            # 输入暂时没有新文件：先去收结果
+                            break
+                        attempt = 1
+                        if on_dispatch:
+                            on_dispatch(*task)
+                    limit = time_limit(task[1], self.cfg)
+                    conn = idle.pop()
+                    conn.send(task)
+                    busy[conn] = (task, attempt, now, limit)
+
+                if self.cancelled and retry:
+                    # 停止后不再重试：按最后一次的失败结果上报
+                    for *_, result in retry:
+                        yield result
+                    retry.clear()
+
+                if not busy:
+                    if not retry and (exhausted or self.cancelled):
+                        break
+                    if exhausted:
+                        # 只剩没到时间的重试
+                        time.sleep(max(0.0, min(r[0] for r in retry) - time.monotonic()))
+                    continue
+
+                timeout = 0.5
+                for _, _, started, limit in busy.values():
+                    if limit:
+                        timeout = min(timeout, started + limit - time.monotonic())
+                if retry:
+                    timeout = min(timeout, min(r[0] for r in retry) - time.monotonic())
+
+                for conn in wait(list(busy), timeout=max(0.0, timeout)):
+                    task, attempt, started, _ = busy.pop(conn)
+                    try:
+                        result = conn.recv()
+                    except (EOFError, OSError):
+                        # 子进程意外退出（如 Word 崩溃拖垮进程）：补一个新进程，该文件重试
+                        self._kill(conn)
+                        if not self.cancelled:
+                            idle.append(self._spawn(ctx, cfg_dict))
+                        result = self._retry_or_fail(retry, task, attempt, FileResult(
+                            task[0], task[1], task[2], False, "子进程意外退出", time.monotonic() - started,
+                            backend=backend_for(task[1], task[2], self.cfg)))
+                        if result is None:
+                            continue
+                    else:
+                        idle.append(conn)
+                        result.attempts = attempt
+                    yield result
+
+                # 超时：强制结束子进程（连同 Word），补一个新进程，该文件重试
+                now = time.monotonic()
+                for conn, (task, attempt, started, limit) in list(busy.items()):
+                    if not limit or now < started + limit:
+                        continue
+                    del busy[conn]
+                    self._kill(conn)
+                    if not self.cancelled:
+                        idle.append(self._spawn(ctx, cfg_dict))
+                    result = self._retry_or_fail(retry, task, attempt, FileResult(
+                        task[0], task[1], task[2], False, f"处理超时（超过 {round(limit, 1):g} 秒），已强制结束",
+                        now - started, backend=backend_for(task[1], task[2], self.cfg)))
+                    if result is not None:
+                        yield result
+        finally:
+            self._shutdown()
+
+    def _shutdown(self):
+        procs = list(self._procs.items())
+        self._procs = {}
+        for conn, _ in procs:
+            try:
+                conn.send(None)
+            except (OSError, ValueError):
+                pass
+        deadline = time.monotonic() + self.shutdown_timeout
+        for conn, (p, _) in procs:
+            p.join(max(0.0, deadline - time.monotonic()))
+            if p.is_alive():
+                p.terminate()
+                p.join()
+            conn.close()
+
+
+# ========= 分阶段耗时 / 批处理报告 =========
+PHASE_LABELS = {
+    "cache": "缓存",
+    "word_start": "启动Word",
+    "open": "打开",
+    "body": "正文",
+    "headers_footers": "页眉页脚",
+    "find_replace": "查找替换",
+    "blank_lines": "空行",
+    "save": "保存",
+    "close": "关闭",
+    "word_quit": "回收Word",
+}
+
+
+BACKEND_LABELS = {
+    "ooxml": "XML 引擎",
+    "com": "Word",
+    "cache": "缓存",
+}
+
+
+class BackendStats:
+    """
+    按后端汇总一批结果：文件数、失败数，以及成功文件的累计耗时、平均耗时与单进程吞吐（个/分钟）。
+    backend="auto" 时可看出多少文件绕开了 Word、各后端各快多少
+    """
+
+    def __init__(self, results: Iterable[FileResult] = ()):
+        self.backends = {}
+        for r in results:
+            self.add(r)
+
+    def add(self, result: FileResult):
+        b = self.backends.setdefault(result.backend or "unknown", {"files": 0, "failed": 0, "seconds": 0.0})
+        b["files"] += 1
+        if result.ok:
+            b["seconds"] += result.seconds
+        else:
+            b["failed"] += 1
+
+    def to_dict(self) -> dict:
+        out = {}
+        for name, b in sorted(self.backends.items(), key=lambda kv: -kv[1]["files"]):
+            ok = b["files"] - b["failed"]
+            out[name] = {
+                "files": b["files"],
+                "failed": b["failed"],
+                "seconds": round(b["seconds"], 4),
+                "avg_seconds": round(b["seconds"] / ok, 4) if ok else 0.0,
+                "files_per_min": round(ok * 60 / b["seconds"], 1) if b["seconds"] > 0 else 0.0,
+            }
+        return out
+
+    def format(self) -> str:
+        """日志用的一行摘要，如：XML 引擎 120 个（平均 0.30s，200.0 个/分钟）｜Word 5 个（平均 2.10s，28.6 个/分钟，失败 1）"""
+        parts = []
+        for name, b in self.to_dict().items():
+            extra = []
+            if b["files"] > b["failed"]:
+                extra.append(f"平均 {b['avg_seconds']:.2f}s，{b['files_per_min']:g} 个/分钟")
+            if b["failed"]:
+                extra.append(f"失败 {b['failed']}")
+            parts.append(f"{BACKEND_LABELS.get(name, name)} {b['files']} 个（{'，'.join(extra)}）")
+        return "｜".join(parts)
+
+
+def format_phases(phases: dict) -> str:
+    """日志用的一行摘要，如：打开 0.35s｜正文 0.80s（段落 120，COM 450）｜保存 0.40s"""
+    parts = []
+    for name, info in phases.items():
+        text = f"{PHASE_LABELS.get(name, name)} {info.get('seconds', 0.0):.2f}s"
+        extra = []
+        if info.get("paragraphs"):
+            extra.append(f"段落 {info['paragraphs']}")
+        if info.get("removed"):
+            extra.append(f"删除 {info['removed']}")
+        if info.get("com_calls"):
+            extra.append(f"COM {info['com_calls']}")
+        if info.get("linked_skipped"):
+            extra.append(f"链接跳过 {info['linked_skipped']}")
+        if info.get("raw_copied"):
+            extra.append(f"原样拷贝 {info['raw_copied']}")
+        if extra:
+            text += "（" + "，".join(extra) + "）"
+        parts.append(text)
+    return "｜".join(parts)
+
+
+STATS_FIELDS = ("paragraphs", "written", "blank_removed", "com_calls", "com_calls_saved",
+                "hf_stories", "hf_linked_skipped")
+REPORT_FIELDS = ("index", "input_path", "output_path", "ok", "cached", "error", "seconds", "attempts",
+                 "backend") + STATS_FIELDS
+# 预检（dry_run）报告另有的列：空白会变的段落数、要转换的假列表个数/项数、是否会有改动
+ANALYSIS_FIELDS = ("whitespace_changed", "list_runs", "list_items", "changed")
+
+
+def analysis_totals(stats: Iterable[dict]) -> dict:
+    """预检结果汇总：会改动的文件数，以及各项改动的合计"""
+    totals = {"changed_files": 0, "whitespace_changed": 0, "list_runs": 0, "list_items": 0, "blank_removed": 0}
+    for s in stats:
+        totals["changed_files"] += bool(s.get("changed"))
+        for k in ("whitespace_changed", "list_runs", "list_items", "blank_removed"):
+            totals[k] += s.get(k, 0)
+    return totals
+
+
+class BatchReport:
+    """
+    一批文件的处理报告：逐文件的总耗时、各阶段耗时、段落数与 COM 调用数，
+    写成 JSON（完整结构）+ CSV（每个文件一行，阶段展开成 <阶段>_s / <阶段>_com_calls 列，便于 Excel 筛选）
+    """
+
+    def __init__(self, cfg: JobConfig):
+        self.cfg = cfg
+        self.results = []
+        self.started = time.time()
+
+    def add(self, result: FileResult):
+        self.results.append(result)
+
+    def report_dir(self) -> str:
+        """有统一输出目录就写那里，否则（与原文件同目录）写在第一个输出文件旁边"""
+        cfg = self.cfg
+        if not cfg.use_same_dir and cfg.output_dir:
+            return cfg.output_dir
+        if self.results:
+            first = self.results[0]
+            return os.path.dirname(os.path.abspath(first.output_path or first.input_path))
+        return ""
+
+    @staticmethod
+    def _paragraphs(r: FileResult) -> int:
+        """COM 后端有 stats；OOXML 后端只有分阶段计数"""
+        if "paragraphs" in r.stats:
+            return r.stats["paragraphs"]
+        return sum(info.get("paragraphs", 0) for name, info in r.phases.items() if name != "blank_lines")
+
+    def rows(self) -> list:
+        # 阶段列：<阶段>_s 以及出现过的计数（<阶段>_paragraphs / <阶段>_com_calls ...）
+        columns = {}
+        for r in self.results:
+            for name, info in r.phases.items():
+                keys = columns.setdefault(name, {})
+                keys.update(dict.fromkeys(info))
+        rows = []
+        for r in sorted(self.results, key=lambda r: r.index):
+            row = {
+                "index": r.index, "input_path": r.input_path, "output_path": r.output_path,
+                "ok": r.ok, "cached": r.cached, "error": r.error, "seconds": round(r.seconds, 4),
+                "attempts": r.attempts, "backend": r.backend,
+            }
+            for k in STATS_FIELDS + (ANALYSIS_FIELDS if self.cfg.dry_run else ()):
+                row[k] = r.stats.get(k, "")
+            row["paragraphs"] = self._paragraphs(r)
+            for name, keys in columns.items():
+                info = r.phases.get(name, {})
+                for k in keys:
+                    row[name + ("_s" if k == "seconds" else "_" + k)] = info.get(k, "")
+            rows.append(row)
+        return rows
+
+    def summary(self) -> dict:
+        ok = [r for r in self.results if r.ok]
+        phases = {}
+        for r in self.results:
+            for name, info in r.phases.items():
+                total = phases.setdefault(name, {})
+                for k, v in info.items():
+                    total[k] = round(total.get(k, 0) + v, 4)
+        summary = {
+            "files": len(self.results),
+            "ok": len(ok),
+            "failed": len(self.results) - len(ok),
+            "cached": sum(1 for r in self.results if r.cached),
+            "seconds": round(sum(r.seconds for r in self.results), 4),
+            "wall_seconds": round(time.time() - self.started, 4),
+            "paragraphs": sum(self._paragraphs(r) for r in ok),
+            "com_calls": sum(r.stats.get("com_calls", 0) for r in ok),
+            "backends": BackendStats(self.results).to_dict(),
+            "phases": phases,
+        }
+        if self.cfg.dry_run:
+            summary.update(analysis_totals(r.stats for r in ok))
+        return summary
+
+    def write(self, out_dir: str = "") -> tuple:
+        """写 WordCleaner_report_<时间>.json / .csv，返回 (json 路径, csv 路径)"""
+        out_dir = out_dir or self.report_dir()
+        os.makedirs(out_dir, exist_ok=True)
+        base = os.path.join(out_dir, time.strftime("WordCleaner_report_%Y%m%d_%H%M%S", time.localtime(self.started)))
+
+        json_path = base + ".json"
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "config": asdict(self.cfg),
+                "summary": self.summary(),
+                "files": [asdict(r) for r in sorted(self.results, key=lambda r: r.index)],
+            }, f, ensure_ascii=False, indent=2)
+
+        rows = self.rows()
+        csv_path = base + ".csv"
+        # utf-8-sig：Excel 直接打开不乱码
+        with open(csv_path, "w", encoding="utf-8-sig", newline="") as f:
+            fields = list(REPORT_FIELDS) + [k for k in (rows[0] if rows else {}) if k not in REPORT_FIELDS]
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(rows)
+        return json_path, csv_path
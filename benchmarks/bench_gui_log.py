@@ -0,0 +1,155 @@
+# benchmarks/bench_gui_log.py
+"""
+大批量时的界面日志/进度压力测试（无显示器时用 offscreen 平台）：
+后台线程按 Worker 的信号模拟 N 个文件（每个文件几行日志 + 一次进度，默认每秒 200 个），测
+- 界面线程花掉的 CPU 时间（追加日志、重绘）
+- 界面事件循环的最长卡顿（20 ms 心跳定时器两次触发之间的最大间隔）
+- 界面里保留的行数（不超过 LogView.MAX_LINES）与日志文件里的完整行数
+
+    python benchmarks/bench_gui_log.py --files 20000 --rate 500 [--legacy]
+
+--legacy：同样的信号直接逐行追加到 QTextEdit（旧做法）作对照。最长卡顿超过 --max-stall-ms 时退出码 1
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtCore import QThread, QTimer, pyqtSignal  # noqa: E402
+from PyQt5.QtWidgets import QApplication, QTextEdit  # noqa: E402
+
+import app as A  # noqa: E402
+
+
+class FakeWorker(QThread):
+    """与 Worker 相同的信号：每个文件 开始/输出位置/耗时/完成 四行日志 + 一次进度"""
+    log = pyqtSignal(str)
+    progress = pyqtSignal(int, int)
+
+    def __init__(self, files: int, rate: float):
+        super().__init__()
+        self.files = files
+        self.rate = rate
+
+    def run(self):
+        t0 = time.perf_counter()
+        for i in range(1, self.files + 1):
+            # 按 rate 个/秒的节奏发（0 = 不限速）
+            delay = t0 + i / self.rate - time.perf_counter() if self.rate > 0 else 0
+            if delay > 0:
+                time.sleep(delay)
+            path = f"D:\\archive\\部门{i % 37}\\合同_{i:06d}.docx"
+            self.log.emit(f"🚀 开始处理：{path}")
+            self.log.emit(f"📦 输出位置：{path[:-5]}_cleaned.docx")
+            self.log.emit("⏱ 打开 0.12s｜正文 0.40s（段落 812，COM 41）｜保存 0.20s")
+            self.log.emit(f"✅ 完成：合同_{i:06d}.docx（0.8s）\n")
+            self.progress.emit(i, self.files)
+
+
+def run(files: int, rate: float, legacy: bool) -> dict:
+    qa = QApplication.instance() or QApplication(sys.argv)
+    qa.setStyleSheet(A.neon_stylesheet())
+    w = A.MainWindow()
+    w.show()
+    log_dir = tempfile.mkdtemp(prefix="wordcleaner_log_")
+    if legacy:
+        view = QTextEdit()
+        view.setReadOnly(True)
+        w.layout().replaceWidget(w.log, view)
+        w.log.hide()
+        append = view.append
+
+        def show(done, total):
+            pct = int(done * 100 / total)
+            w.progress.setValue(pct)
+            w.status_label.setText(f"状态：处理中 {done}/{total}（{pct}%）")
+    else:
+        w.log.start_file(log_dir)
+        append = w.append_log
+        show = w.on_progress
+
+    received = [0]
+
+    def on_progress(done, total):
+        received[0] = done
+        show(done, total)
+
+    worker = FakeWorker(files, rate)
+    worker.log.connect(append)
+    worker.progress.connect(on_progress)
+
+    stall = {"last": 0.0, "max": 0.0}
+
+    def beat():
+        now = time.perf_counter()
+        if stall["last"]:
+            stall["max"] = max(stall["max"], now - stall["last"])
+        stall["last"] = now
+
+    heart = QTimer()
+    heart.setInterval(20)
+    heart.timeout.connect(beat)
+
+    def check():
+        # 界面收到了全部信号、且日志缓冲也刷空了才算结束
+        if received[0] < files or (not legacy and w.log._pending):
+            return
+        qa.quit()
+
+    poll = QTimer()
+    poll.setInterval(50)
+    poll.timeout.connect(check)
+
+    t0 = time.perf_counter()
+    cpu0 = time.thread_time()
+    heart.start()
+    poll.start()
+    worker.start()
+    qa.exec_()
+    elapsed = time.perf_counter() - t0
+    cpu = time.thread_time() - cpu0
+    worker.wait()
+
+    if legacy:
+        visible = view.document().blockCount()
+        file_lines = 0
+    else:
+        w.end_job()
+        visible = w.log.blockCount()
+        with open(w.log.file_path, encoding="utf-8") as f:
+            file_lines = sum(1 for _ in f)
+    w.close()
+    shutil.rmtree(log_dir, ignore_errors=True)
+    return {"mode": "legacy" if legacy else "coalesced", "files": files, "seconds": round(elapsed, 2),
+            "ui_cpu_seconds": round(cpu, 2),
+            "max_stall_ms": round(stall["max"] * 1000, 1), "visible_lines": visible, "file_lines": file_lines}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="界面日志/进度压力测试")
+    ap.add_argument("--files", type=int, default=20000)
+    ap.add_argument("--rate", type=float, default=200.0, help="每秒模拟完成的文件数（0 = 不限速）")
+    ap.add_argument("--legacy", action="store_true", help="同时测旧做法（逐行追加到 QTextEdit）作对照")
+    ap.add_argument("--max-stall-ms", type=float, default=500.0)
+    args = ap.parse_args()
+
+    results = [run(args.files, args.rate, False)]
+    if args.legacy:
+        results.append(run(args.files, args.rate, True))
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+    r = results[0]
+    if r["max_stall_ms"] > args.max_stall_ms or r["visible_lines"] > A.LogView.MAX_LINES:
+        print(f"✗ 最长卡顿 {r['max_stall_ms']} ms / 界面保留 {r['visible_lines']} 行", file=sys.stderr)
+        sys.exit(1)
+    print("✓ 日志合并刷新，界面保持响应", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# benchmarks/bench_normalize.py
+"""
+normalize_text 微基准：中英混排段落（含 Tab、全角空格、nbsp、连续空格、少量 HTML 实体），
+对比旧版五遍实现、当前 normalize_text 逐段调用、normalize_many 整篇传入
+
+    python benchmarks/bench_normalize.py [--paragraphs 20000] [--json]
+"""
+import os
+import re
+import sys
+import html
+import json
+import argparse
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from word_processor import normalize_text, normalize_many  # noqa: E402
+from benchmarks.docgen import make_paragraphs  # noqa: E402
+
+_RE_MULTI_SPACE = re.compile(r"[ \u00A0\u2002\u2003\u2009\u3000]{2,}")
+
+
+def legacy_normalize_text(s, tab_to_space=True, compress_spaces=True):
+    """改造前的实现（unescape + 三次 replace + regex + strip），作为对照"""
+    if s is None:
+        return ""
+    s = html.unescape(s)
+    if tab_to_space:
+        s = s.replace("\t", " ")
+    s = s.replace("\u3000", " ").replace("\u00A0", " ")
+    if compress_spaces:
+        s = _RE_MULTI_SPACE.sub(" ", s)
+    return s.strip()
+
+
+def bench(fn, number: int = 3, repeat: int = 5) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number
+
+
+def run(paragraphs: int = 20000) -> dict:
+    texts = make_paragraphs(paragraphs)
+    expected = [legacy_normalize_text(t) for t in texts]
+    assert [normalize_text(t) for t in texts] == expected
+    assert normalize_many(texts) == expected
+
+    legacy = bench(lambda: [legacy_normalize_text(t) for t in texts])
+    single = bench(lambda: [normalize_text(t) for t in texts])
+    batch = bench(lambda: normalize_many(texts))
+    return {
+        "paragraphs": paragraphs,
+        "legacy_s": legacy,
+        "normalize_text_s": single,
+        "normalize_many_s": batch,
+        "legacy_paras_per_s": paragraphs / legacy,
+        "normalize_text_paras_per_s": paragraphs / single,
+        "normalize_many_paras_per_s": paragraphs / batch,
+        "speedup_normalize_text": legacy / single,
+        "speedup_normalize_many": legacy / batch,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--paragraphs", type=int, default=20000)
+    ap.add_argument("--json", action="store_true", help="输出 JSON")
+    args = ap.parse_args()
+
+    r = run(args.paragraphs)
+    if args.json:
+        print(json.dumps(r, ensure_ascii=False, indent=2))
+        return
+    print(f"段落数：{r['paragraphs']}")
+    print(f"旧版逐段      ：{r['legacy_s'] * 1000:8.1f} ms  {r['legacy_paras_per_s']:>12,.0f} 段/秒")
+    print(f"normalize_text：{r['normalize_text_s'] * 1000:8.1f} ms  "
+          f"{r['normalize_text_paras_per_s']:>12,.0f} 段/秒  x{r['speedup_normalize_text']:.2f}")
+    print(f"normalize_many：{r['normalize_many_s'] * 1000:8.1f} ms  "
+          f"{r['normalize_many_paras_per_s']:>12,.0f} 段/秒  x{r['speedup_normalize_many']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# benchmarks/bench_startup.py
+"""
+启动耗时基准：每项都在全新的子进程里测（避免模块缓存），取中位数
+- 导入各模块的耗时，以及导入后是否顺带加载了重量级依赖（win32com / pythoncom / PyQt5 / multiprocessing ...）
+- GUI：导入 app → 窗口首次显示 → 延后加载（图标/Logo）完成的时间点（无显示器时用 offscreen 平台）
+
+    python benchmarks/bench_startup.py [--repeat 5] [--json] [--check]
+
+--check：纯文本核心（word_processor）导入时拉进了 win32com / pythoncom / PyQt5 则退出码 1
+"""
+import os
+import sys
+import json
+import argparse
+import importlib.util
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = ("word_processor", "docx_engine", "result_cache", "batch", "cli", "app")
+HEAVY = ("win32com", "pythoncom", "pywintypes", "PyQt5", "multiprocessing", "docx_engine", "result_cache")
+# 文本核心不允许带上的依赖
+CORE_FORBIDDEN = ("win32com", "pythoncom", "pywintypes", "PyQt5")
+
+IMPORT_PROBE = r"""
+import sys, time, json
+t0 = time.perf_counter()
+import {module}
+ms = (time.perf_counter() - t0) * 1000
+heavy = [m for m in {heavy!r} if m in sys.modules and m != "{module}"]
+print(json.dumps({{"ms": ms, "heavy": heavy}}))
+"""
+
+GUI_PROBE = r"""
+import sys, time, json
+t0 = time.perf_counter()
+import app as A
+from PyQt5.QtWidgets import QApplication
+t_import = time.perf_counter()
+marks = {}
+orig = A.MainWindow.load_branding
+def load_branding(self):
+    orig(self)
+    marks["branding"] = time.perf_counter()
+    QApplication.instance().quit()
+A.MainWindow.load_branding = load_branding
+qa = QApplication(sys.argv)
+qa.setStyleSheet(A.neon_stylesheet())
+w = A.MainWindow()
+w.show()
+t_shown = time.perf_counter()
+qa.exec_()
+ms = lambda t: (t - t0) * 1000
+print(json.dumps({"import_ms": ms(t_import), "shown_ms": ms(t_shown), "branding_ms": ms(marks["branding"])}))
+"""
+
+
+def _run_probe(code: str, env=None) -> dict:
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env,
+                         capture_output=True, text=True, timeout=120)
+    if out.returncode != 0:
+        raise RuntimeError(out.stderr.strip().splitlines()[-1] if out.stderr.strip() else "probe failed")
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def bench_imports(repeat: int) -> list:
+    results = []
+    for module in MODULES:
+        samples = []
+        heavy = []
+        error = ""
+        for _ in range(repeat):
+            try:
+                r = _run_probe(IMPORT_PROBE.format(module=module, heavy=HEAVY))
+            except RuntimeError as e:
+                error = str(e)
+                break
+            samples.append(r["ms"])
+            heavy = r["heavy"]
+        rec = {"module": module, "import_ms": round(statistics.median(samples), 2) if samples else None,
+               "heavy_loaded": heavy}
+        if error:
+            rec["error"] = error
+        results.append(rec)
+    return results
+
+
+def bench_gui(repeat: int):
+    if importlib.util.find_spec("PyQt5") is None:
+        return {"skipped": "未安装 PyQt5"}
+    env = dict(os.environ)
+    if sys.platform != "win32" and not env.get("DISPLAY") and not env.get("WAYLAND_DISPLAY"):
+        env["QT_QPA_PLATFORM"] = "offscreen"
+    samples = []
+    for _ in range(repeat):
+        try:
+            samples.append(_run_probe(GUI_PROBE, env))
+        except RuntimeError as e:
+            return {"error": str(e)}
+    return {k: round(statistics.median(s[k] for s in samples), 2) for k in samples[0]}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="启动耗时基准")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--json", action="store_true", help="输出 JSON")
+    ap.add_argument("--check", action="store_true", help="文本核心带上了 win32com/PyQt5 等依赖时退出码 1")
+    args = ap.parse_args()
+
+    report = {"python": sys.version.split()[0], "imports": bench_imports(args.repeat), "gui": bench_gui(args.repeat)}
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        for r in report["imports"]:
+            ms = "  失败" if r["import_ms"] is None else f"{r['import_ms']:8.1f} ms"
+            print(f"import {r['module']:<16}{ms}  附带加载：{', '.join(r['heavy_loaded']) or '-'}"
+                  + (f"  （{r['error']}）" if r.get("error") else ""))
+        gui = report["gui"]
+        if "shown_ms" in gui:
+            print(f"GUI：导入 {gui['import_ms']:.1f} ms → 窗口显示 {gui['shown_ms']:.1f} ms → "
+                  f"图标/Logo 加载完 {gui['branding_ms']:.1f} ms")
+        else:
+            print(f"GUI：{gui.get('skipped') or gui.get('error')}")
+
+    if args.check:
+        core = next(r for r in report["imports"] if r["module"] == "word_processor")
+        bad = [m for m in core["heavy_loaded"] if m in CORE_FORBIDDEN]
+        if bad or core["import_ms"] is None:
+            print(f"✗ word_processor 导入时加载了：{', '.join(bad) or core.get('error')}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
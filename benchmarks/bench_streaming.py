@@ -0,0 +1,110 @@
+# benchmarks/bench_streaming.py
+"""
+流式处理的内存上限检查：生成不同大小的合成文档，用 tracemalloc 记录 process_docx 期间的 Python 内存峰值。
+流式模式的峰值应与文档大小无关；加 --dom 同时测整树模式作对照。
+每个输出都用 ZipFile.testzip() 校验；最小的文档另按 zipfile 内部状态不可用时的退路（writestr）再写一遍，
+成员内容应与原样拷贝的结果相同
+
+    python benchmarks/bench_streaming.py --paragraphs 10000 100000 --max-mb 16
+
+任一尺寸的流式峰值超过 --max-mb、最大文档的峰值超过最小文档的 --max-growth 倍（另加 1 MB 余量），
+或输出 zip 校验不通过，退出码 1
+"""
+import os
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import docx_engine  # noqa: E402
+from docx_engine import process_docx  # noqa: E402
+from benchmarks.docgen import generate_docx  # noqa: E402
+
+
+def measure(path: str, out: str, streaming: bool) -> float:
+    """返回 process_docx 期间的内存峰值（MB）"""
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        process_docx(path, out, streaming=streaming)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / (1 << 20)
+
+
+def zip_ok(path: str) -> bool:
+    """输出能被 zipfile 完整读出（每个成员的 CRC 都对）"""
+    with zipfile.ZipFile(path) as z:
+        return z.testzip() is None
+
+
+def fallback_matches(path: str, workdir: str) -> bool:
+    """zipfile 内部状态不可用时（退回 writestr）的输出：能通过校验，且各成员内容与原样拷贝的输出相同"""
+    raw, fallback = os.path.join(workdir, "raw.docx"), os.path.join(workdir, "fallback.docx")
+    process_docx(path, raw, streaming=True)
+    check = docx_engine._zip_private_state
+    docx_engine._zip_private_state = lambda zout, info: False
+    try:
+        process_docx(path, fallback, streaming=True)
+    finally:
+        docx_engine._zip_private_state = check
+    if not zip_ok(fallback):
+        return False
+    with zipfile.ZipFile(raw) as a, zipfile.ZipFile(fallback) as b:
+        return a.namelist() == b.namelist() and all(a.read(n) == b.read(n) for n in a.namelist())
+
+
+def main():
+    ap = argparse.ArgumentParser(description="流式处理内存上限检查")
+    ap.add_argument("--paragraphs", type=int, nargs="+", default=[10000, 100000])
+    ap.add_argument("--max-mb", type=float, default=16.0, help="流式模式允许的内存峰值（MB）")
+    ap.add_argument("--max-growth", type=float, default=1.5, help="最大/最小文档峰值之比的上限")
+    ap.add_argument("--dom", action="store_true", help="同时测整树模式作对照（大文档很慢且很占内存）")
+    ap.add_argument("--seed", type=int, default=42)
+    args = ap.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="wordcleaner_stream_")
+    results = []
+    try:
+        for n in sorted(args.paragraphs):
+            path = generate_docx(os.path.join(workdir, "doc_%d.docx" % n), paragraphs=n, seed=args.seed)
+            with zipfile.ZipFile(path) as z:
+                xml_mb = z.getinfo("word/document.xml").file_size / (1 << 20)
+            out = os.path.join(workdir, "out.docx")
+            rec = {"paragraphs": n, "document_xml_mb": round(xml_mb, 2),
+                   "streaming_peak_mb": round(measure(path, out, True), 2), "zip_ok": zip_ok(out)}
+            if args.dom:
+                rec["dom_peak_mb"] = round(measure(path, out, False), 2)
+                rec["zip_ok"] = rec["zip_ok"] and zip_ok(out)
+            if not results:
+                rec["fallback_ok"] = fallback_matches(path, workdir)
+            results.append(rec)
+            os.remove(path)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+    peaks = [r["streaming_peak_mb"] for r in results]
+    failures = [f"{r['paragraphs']} 段：峰值 {r['streaming_peak_mb']} MB > {args.max_mb} MB"
+                for r in results if r["streaming_peak_mb"] > args.max_mb]
+    if len(peaks) > 1 and peaks[-1] > peaks[0] * args.max_growth + 1:
+        failures.append(f"峰值随文档增大：{peaks[0]} MB → {peaks[-1]} MB")
+    failures += [f"{r['paragraphs']} 段：输出 zip 校验不通过" for r in results if not r["zip_ok"]]
+    failures += [f"{r['paragraphs']} 段：退回 writestr 的输出与原样拷贝不一致"
+                 for r in results if r.get("fallback_ok") is False]
+    if failures:
+        for msg in failures:
+            print("✗ " + msg, file=sys.stderr)
+        sys.exit(1)
+    print("✓ 流式处理内存峰值与文档大小无关", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
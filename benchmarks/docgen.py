@@ -0,0 +1,231 @@
+# benchmarks/docgen.py
+"""
+合成测试文档：按段落数、假列表比例、脏空白比例、空行比例、中文比例生成段落文本，
+并写成最小可用的 .docx（正文 + 可选页眉/页脚，可分多节），供基准测试使用
+
+    python benchmarks/docgen.py out.docx --paragraphs 5000 --list-ratio 0.2
+    python benchmarks/docgen.py out.docx --sections 5 --first-page-header   # 后面各节的页眉/页脚链接到第一节
+"""
+import random
+import zipfile
+import argparse
+from xml.sax.saxutils import escape
+
+CJK = "这是一个测试文档含全角空格连续空格假列表表格模拟乱换行第一条这里有很多空格还夹杂中英混排合同条款甲方乙方"
+LATIN = "the quick brown fox jumps over lazy dog contract party agreement clause section Hello World".split()
+SEPARATORS = [" "] * 12 + ["", "  ", "    ", "\t", "\u3000", "\u00A0", " \u3000 ", "\u2002\u2002"]
+NUM_FORMATS = ["{n}. ", "{n}) ", "{n}、 ", "（{n}） ", "({n}) "]
+BULLETS = ["- ", "• ", "* ", "● ", "· "]
+
+
+def make_paragraphs(n: int, *, cjk_ratio: float = 0.6, dirty_ratio: float = 0.3, seed: int = 42):
+    """dirty_ratio：带多余空白/实体的段落比例，其余是已经干净的正文"""
+    rnd = random.Random(seed)
+    out = []
+    for _ in range(n):
+        dirty = rnd.random() < dirty_ratio
+        words = []
+        for _ in range(rnd.randint(4, 40)):
+            if rnd.random() < cjk_ratio:
+                words.append("".join(rnd.choice(CJK) for _ in range(rnd.randint(1, 8))))
+            else:
+                words.append(rnd.choice(LATIN))
+            words.append(rnd.choice(SEPARATORS) if dirty else rnd.choice(["", " "]))
+        text = "".join(words)
+        if dirty and rnd.random() < 0.05:
+            text += " R&amp;D"
+        if dirty and rnd.random() < 0.3:
+            text = "  " + text + "\t "
+        out.append(text)
+    return out
+
+
+def make_document_texts(
+    n: int,
+    *,
+    list_ratio: float = 0.2,
+    dirty_ratio: float = 0.3,
+    blank_ratio: float = 0.1,
+    cjk_ratio: float = 0.6,
+    seed: int = 42
+):
+    """
+    整篇文档的段落文本：在正文段落里穿插假列表（连续 2~8 项，编号/符号随机）与连续空行，
+    list_ratio / blank_ratio 为大致占比
+    """
+    rnd = random.Random(seed)
+    body = iter(make_paragraphs(n + 8, cjk_ratio=cjk_ratio, dirty_ratio=dirty_ratio, seed=seed))
+    out = []
+    while len(out) < n:
+        r = rnd.random()
+        if r < list_ratio / 5:
+            # 平均每个列表 5 项
+            if rnd.random() < 0.5:
+                fmt = rnd.choice(NUM_FORMATS)
+                prefixes = [fmt.format(n=k) for k in range(1, 9)]
+            else:
+                prefixes = [rnd.choice(BULLETS)] * 8
+            for prefix in prefixes[:rnd.randint(2, 8)]:
+                out.append(prefix + next(body).strip())
+        elif r < (list_ratio / 5) + blank_ratio / 2:
+            out.extend(rnd.choice(["", " ", "\t", "\u3000"]) for _ in range(rnd.randint(1, 3)))
+        else:
+            out.append(next(body))
+    return out[:n]
+
+
+# ========= 写 .docx =========
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+R_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+XML_DECL = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\r\n'
+
+CONTENT_TYPES = XML_DECL + (
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '{overrides}'
+    '</Types>'
+)
+HF_OVERRIDE = ('<Override PartName="/word/{name}.xml" '
+               'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.{name_type}+xml"/>')
+PACKAGE_RELS = XML_DECL + (
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="%s/officeDocument" Target="word/document.xml"/>'
+    '</Relationships>' % R_NS
+)
+
+
+def _run(text: str) -> str:
+    """一个 w:r：Tab 写成 w:tab，其余写 w:t（保留首尾空格）"""
+    parts = []
+    for k, chunk in enumerate(text.split("\t")):
+        if k:
+            parts.append("<w:tab/>")
+        if chunk:
+            parts.append('<w:t xml:space="preserve">%s</w:t>' % escape(chunk))
+    return "<w:r>%s</w:r>" % "".join(parts)
+
+
+def paragraph_xml(text: str, rnd: random.Random) -> str:
+    """段落文本随机切成 1~3 个 run（模拟 Word 里格式变化造成的分段）"""
+    if not text:
+        return "<w:p/>"
+    cuts = sorted(rnd.sample(range(1, len(text)), min(rnd.randint(0, 2), len(text) - 1))) if len(text) > 1 else []
+    bounds = [0] + cuts + [len(text)]
+    runs = "".join(_run(text[a:b]) for a, b in zip(bounds, bounds[1:]))
+    return "<w:p>%s</w:p>" % runs
+
+
+def _with_sect_pr(p_xml: str, sect: str) -> str:
+    """把分节符（段落级 w:sectPr）放进段落的 w:pPr"""
+    if p_xml == "<w:p/>":
+        return "<w:p><w:pPr>%s</w:pPr></w:p>" % sect
+    return "<w:p><w:pPr>%s</w:pPr>%s" % (sect, p_xml[len("<w:p>"):])
+
+
+def _story_xml(root: str, texts, rnd, tail: str = "", breaks=None) -> str:
+    """breaks：{段落序号: 该段结束的那一节的 w:sectPr}"""
+    paras = [paragraph_xml(t, rnd) for t in texts]
+    for i, sect in (breaks or {}).items():
+        paras[i] = _with_sect_pr(paras[i], sect)
+    body = "".join(paras)
+    if root == "document":
+        return XML_DECL + '<w:document xmlns:w="%s" xmlns:r="%s"><w:body>%s%s</w:body></w:document>' % (
+            W_NS, R_NS, body, tail)
+    return XML_DECL + '<w:%s xmlns:w="%s" xmlns:r="%s">%s</w:%s>' % (root, W_NS, R_NS, body, root)
+
+
+def write_docx(path: str, body_texts, header_texts=None, footer_texts=None, *, sections: int = 1,
+               first_page_header=None, seed: int = 42) -> str:
+    """
+    sections：把正文平均分成几节；页眉/页脚只挂在第一节上，后面各节链接到前一节（与 Word 新插入分节符时一致）
+    first_page_header：首页页眉的段落文本；给出时各节都设“首页不同”
+    """
+    rnd = random.Random(seed)
+    rels = []
+    overrides = []
+    refs = []
+    parts = {}
+    numbers = {}
+    stories = (("header", "default", header_texts), ("footer", "default", footer_texts),
+               ("header", "first", first_page_header))
+    for kind, typ, texts in stories:
+        if not texts:
+            continue
+        numbers[kind] = numbers.get(kind, 0) + 1
+        name = kind + str(numbers[kind])
+        rid = "rId%d" % (len(rels) + 10)
+        rels.append('<Relationship Id="%s" Type="%s/%s" Target="%s.xml"/>' % (rid, R_NS, kind, name))
+        overrides.append(HF_OVERRIDE.format(name=name, name_type=kind))
+        refs.append('<w:%sReference w:type="%s" r:id="%s"/>' % (kind, typ, rid))
+        parts["word/%s.xml" % name] = _story_xml("hdr" if kind == "header" else "ftr", texts, rnd)
+
+    title_pg = "<w:titlePg/>" if first_page_header else ""
+    sections = max(1, min(sections, len(body_texts)))
+    size = -(-len(body_texts) // sections)
+    # 第一节带页眉/页脚引用，其余各节不带（= 链接到前一节）；最后一节的 sectPr 在 w:body 末尾
+    sects = ["<w:sectPr>%s%s</w:sectPr>" % ("".join(refs) if k == 0 else "", title_pg) for k in range(sections)]
+    breaks = {min((k + 1) * size, len(body_texts)) - 1: sects[k] for k in range(sections - 1)}
+    parts["word/document.xml"] = _story_xml("document", body_texts, rnd, sects[-1], breaks)
+    parts["word/_rels/document.xml.rels"] = XML_DECL + (
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">%s</Relationships>'
+        % "".join(rels))
+
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr("[Content_Types].xml", CONTENT_TYPES.format(overrides="".join(overrides)))
+        z.writestr("_rels/.rels", PACKAGE_RELS)
+        for name, xml in parts.items():
+            z.writestr(name, xml.encode("utf-8"))
+    return path
+
+
+def generate_docx(
+    path: str,
+    *,
+    paragraphs: int = 1000,
+    list_ratio: float = 0.2,
+    dirty_ratio: float = 0.3,
+    blank_ratio: float = 0.1,
+    cjk_ratio: float = 0.6,
+    headers_footers: bool = True,
+    sections: int = 1,
+    first_page_header: bool = False,
+    seed: int = 42
+) -> str:
+    opts = dict(list_ratio=list_ratio, dirty_ratio=dirty_ratio, blank_ratio=blank_ratio, cjk_ratio=cjk_ratio)
+    body = make_document_texts(paragraphs, seed=seed, **opts)
+    header = footer = first = None
+    if headers_footers:
+        header = make_document_texts(3, seed=seed + 1, **opts)
+        footer = make_document_texts(2, seed=seed + 2, **opts)
+        if first_page_header:
+            first = make_document_texts(2, seed=seed + 3, **opts)
+    return write_docx(path, body, header, footer, sections=sections, first_page_header=first, seed=seed)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="生成合成 .docx 测试文档")
+    ap.add_argument("output")
+    ap.add_argument("--paragraphs", type=int, default=1000)
+    ap.add_argument("--list-ratio", type=float, default=0.2)
+    ap.add_argument("--dirty-ratio", type=float, default=0.3)
+    ap.add_argument("--blank-ratio", type=float, default=0.1)
+    ap.add_argument("--cjk-ratio", type=float, default=0.6)
+    ap.add_argument("--no-headers-footers", action="store_true")
+    ap.add_argument("--sections", type=int, default=1, help="分几节（后面各节的页眉/页脚链接到第一节）")
+    ap.add_argument("--first-page-header", action="store_true", help="另加首页页眉（各节首页不同）")
+    ap.add_argument("--seed", type=int, default=42)
+    args = ap.parse_args()
+    generate_docx(
+        args.output, paragraphs=args.paragraphs, list_ratio=args.list_ratio, dirty_ratio=args.dirty_ratio,
+        blank_ratio=args.blank_ratio, cjk_ratio=args.cjk_ratio,
+        headers_footers=not args.no_headers_footers, sections=args.sections,
+        first_page_header=args.first_page_header, seed=args.seed
+    )
+    print(args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+# benchmarks/fake_backend.py
+"""
+测试用的假后端：按输入文件第一行的“指令”表现得正常、慢、卡死或崩溃，用于验证 ParallelExecutor 的
+处理时限、强制结束、补进程与重试，不需要 Word：
+
+    ok            复制输入到输出
+    sleep 秒数    先睡一会儿再完成
+    hang          启动一个永远睡眠的“后端进程”（模拟卡死的 WINWORD.EXE），上报其 PID 后一直等它
+    word-hang     同上，但经 WordSession 启动假 Word（假 pywin32，见 fake_com.install_fake_pywin32），
+                  PID 由 _word_pid 找出并经 on_backend 上报，在 Documents.Open 里卡住
+    crash         直接结束当前（子）进程
+    fail          抛出异常（普通处理错误）
+    flaky 次数    前几次尝试像 hang 一样卡住，之后正常（尝试次数记在 <输入>.attempts）
+
+    cfg = JobConfig(..., backend="benchmarks.fake_backend:process", timeout=1.0)
+
+直接运行时做一遍自检：各种指令的结果、重试次数、卡死的后端进程已被结束、WordSession 上报的 PID，
+与预期不符退出码 1
+
+    python benchmarks/fake_backend.py [--workers 2]
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch import JobConfig, ParallelExecutor, _kill_pid, report_backend_pid  # noqa: E402
+from word_processor import WordSession  # noqa: E402
+from benchmarks.fake_com import FakeWord, install_fake_pywin32  # noqa: E402
+
+BACKEND = "benchmarks.fake_backend:process"
+
+
+def _hang(input_path: str):
+    proc = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(3600)"])
+    with open(input_path + ".pid", "w") as f:
+        f.write(str(proc.pid))
+    report_backend_pid(proc.pid)
+    proc.wait()
+
+
+def _hang_word(input_path: str, output_path: str):
+    proc = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(3600)"])
+    with open(input_path + ".pid", "w") as f:
+        f.write(str(proc.pid))
+
+    def make_word():
+        word = FakeWord()
+        word.Documents.Open = lambda *args, **kwargs: proc.wait()
+        return word, proc.pid
+
+    # 子进程里装假 pywin32：PID 只能靠 WordSession → _word_pid → report_backend_pid 传给执行器
+    install_fake_pywin32(make_word)
+    WordSession(on_backend=report_backend_pid).process(input_path, output_path)
+
+
+def _attempt(input_path: str) -> int:
+    path = input_path + ".attempts"
+    try:
+        with open(path) as f:
+            n = int(f.read() or 0) + 1
+    except FileNotFoundError:
+        n = 1
+    with open(path, "w") as f:
+        f.write(str(n))
+    return n
+
+
+def process(input_path: str, output_path: str, **options) -> dict:
+    with open(input_path, encoding="utf-8") as f:
+        cmd, *args = (f.readline().split() or ["ok"])
+
+    if cmd == "sleep":
+        time.sleep(float(args[0]))
+    elif cmd == "hang":
+        _hang(input_path)
+    elif cmd == "word-hang":
+        _hang_word(input_path, output_path)
+    elif cmd == "crash":
+        os._exit(3)
+    elif cmd == "fail":
+        raise RuntimeError("假后端：处理失败")
+    elif cmd == "flaky":
+        if _attempt(input_path) <= int(args[0]):
+            _hang(input_path)
+    elif cmd != "ok":
+        raise ValueError(f"未知指令：{cmd}")
+
+    shutil.copyfile(input_path, output_path)
+    return {"command": cmd}
+
+
+# 自检：文件名、指令、预期（是否成功、尝试次数）
+SCENARIOS = [
+    ("a_ok", "ok", True, 1),
+    ("b_slow", "sleep 0.3", True, 1),
+    ("c_hang", "hang", False, 2),
+    ("d_crash", "crash", False, 2),
+    ("e_fail", "fail", False, 1),
+    ("f_flaky", "flaky 1", True, 2),
+    ("g_ok", "ok", True, 1),
+    ("h_word_hang", "word-hang", False, 2),
+]
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except OSError:
+        return False
+    if os.name != "nt":
+        # 已被结束但还没被回收（僵尸）也算结束
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                return f.read().split(")")[-1].split()[0] != "Z"
+        except OSError:
+            pass
+    return True
+
+
+def _check_word_pid() -> list:
+    """WordSession(on_backend=...) 启动 / 回收 Word 时上报的 PID：假 Word 所在进程的 PID，退出后 0"""
+    reported = []
+    install_fake_pywin32(lambda: (FakeWord(), 4242))
+    session = WordSession(on_backend=reported.append)
+    session._ensure_word()
+    session.close()
+    if reported != [4242, 0]:
+        return [f"WordSession 上报的 PID 为 {reported}，预期 [4242, 0]"]
+    return []
+
+
+def self_check(workers: int, timeout: float) -> int:
+    workdir = tempfile.mkdtemp(prefix="wordcleaner_fake_")
+    try:
+        files = []
+        for name, cmd, _, _ in SCENARIOS:
+            path = os.path.join(workdir, name + ".docx")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(cmd + "\n")
+            files.append(path)
+
+        cfg = JobConfig(
+            naming_mode="suffix", suffix="_out", custom_name="", output_dir="", use_same_dir=True,
+            output_ext=".docx", keep_blank_lines=1, tab_to_space=True, compress_spaces=True,
+            process_headers_footers=True, workers=workers, backend=BACKEND, write_report=False,
+            timeout=timeout, timeout_per_mb=0.0, max_retries=1,
+        )
+        t0 = time.perf_counter()
+        results = {os.path.basename(r.input_path)[:-5]: r for r in ParallelExecutor(cfg).run(files)}
+        elapsed = time.perf_counter() - t0
+
+        failures = []
+        rows = []
+        for name, cmd, ok, attempts in SCENARIOS:
+            r = results.get(name)
+            if r is None:
+                failures.append(f"{name}：没有结果")
+                continue
+            rows.append({"file": name, "command": cmd, "ok": r.ok, "attempts": r.attempts,
+                         "seconds": round(r.seconds, 2), "error": r.error})
+            if (r.ok, r.attempts) != (ok, attempts):
+                failures.append(f"{name}：ok={r.ok} attempts={r.attempts}，预期 ok={ok} attempts={attempts}")
+        # 卡死的“后端进程”必须随子进程一起被结束
+        time.sleep(0.2)
+        for name in ("c_hang", "f_flaky", "h_word_hang"):
+            try:
+                with open(os.path.join(workdir, name + ".docx.pid")) as f:
+                    pid = int(f.read())
+            except (OSError, ValueError):
+                failures.append(f"{name}：没有记录后端 PID")
+                continue
+            if _pid_alive(pid):
+                failures.append(f"{name}：后端进程 {pid} 仍在运行")
+                _kill_pid(pid)
+        failures += _check_word_pid()
+        # 卡住的文件各等满两次时限，其余并行；给足进程启动的余量
+        if elapsed > timeout * 4 + 15:
+            failures.append(f"总耗时 {elapsed:.1f}s 过长")
+
+        print(json.dumps({"workers": workers, "timeout": timeout, "seconds": round(elapsed, 2), "files": rows},
+                         ensure_ascii=False, indent=2))
+        for msg in failures:
+            print("✗ " + msg, file=sys.stderr)
+        if not failures:
+            print("✓ 超时强制结束、补进程与重试符合预期", file=sys.stderr)
+        return 1 if failures else 0
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="假后端自检：处理时限 / 强制结束 / 重试")
+    ap.add_argument("--workers", type=int, default=2)
+    ap.add_argument("--timeout", type=float, default=1.5, help="每个文档的时限（秒）")
+    args = ap.parse_args()
+    sys.exit(self_check(args.workers, args.timeout))
+
+
+if __name__ == "__main__":
+    main()
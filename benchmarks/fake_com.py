@@ -0,0 +1,624 @@
+# benchmarks/fake_com.py
+"""
+进程内的 Word COM 对象模型替身：只实现 word_processor 用到的部分（Range / Paragraphs / ListFormat /
+Find（查找替换）/ Documents.Open / Sections / Headers / Footers（含首页、偶数页与链接到前一节）/ SaveAs），
+每次属性访问或方法调用都记一次 COM 调用，用于在没有 Word 的机器上跑 process_range / WordSession 并统计 COM 往返次数
+
+    word = FakeWord()
+    with WordSession(dispatch=lambda prog_id: word) as session:
+        session.process("in.docx", "out.docx")
+    print(word.counter.calls)
+
+install_fake_pywin32 另装一套最小的假 pywin32，让 WordSession 走真实的 _dispatch_word / _word_pid
+"""
+import re
+import sys
+import types
+import zipfile
+import xml.etree.ElementTree as ET
+
+from docx_engine import R_NS, W_P, REL_HEADER, REL_FOOTER, _collect_segments, _find_main_part, _read_rels, _w
+
+
+class CallCounter:
+    def __init__(self):
+        self.calls = 0
+
+
+class _Fenwick:
+    """段落长度的前缀和（树状数组）：改一段长度、按位置找段都是 O(log n)"""
+
+    def __init__(self, sizes):
+        n = len(sizes)
+        tree = [0] * (n + 1)
+        for i, v in enumerate(sizes, start=1):
+            tree[i] += v
+            j = i + (i & -i)
+            if j <= n:
+                tree[j] += tree[i]
+        self.tree = tree
+        self.n = n
+
+    def add(self, i: int, delta: int):
+        i += 1
+        while i <= self.n:
+            self.tree[i] += delta
+            i += i & -i
+
+    def prefix(self, i: int) -> int:
+        """前 i 段的总长度"""
+        total = 0
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def search(self, pos: int) -> int:
+        """满足 prefix(k) <= pos 的最大 k（即位置 pos 所在段的序号）"""
+        k = 0
+        step = 1 << self.n.bit_length()
+        while step:
+            nk = k + step
+            if nk <= self.n and self.tree[nk] <= pos:
+                k = nk
+                pos -= self.tree[nk]
+            step >>= 1
+        return k
+
+
+class FakeStory:
+    """
+    一个 story（正文/页眉/页脚）：按段落保存文本（含段落符 \r）+ 每段的列表属性。
+    段内改字只动一段，定位用前缀和，单次调用的开销与文档大小基本无关（否则大文档的耗时全花在替身上）
+    """
+
+    def __init__(self, paragraphs, counter: CallCounter):
+        self.counter = counter
+        self.lists = [None] * len(paragraphs)
+        self._next_list = 1
+        self._set_paras([p + "\r" for p in paragraphs])
+
+    def _set_paras(self, paras):
+        self._paras = paras
+        self._fw = _Fenwick([len(p) for p in paras])
+        self.length = sum(len(p) for p in paras)
+        self._text = None
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = "".join(self._paras)
+        return self._text
+
+    def paragraphs(self):
+        return self.text.split("\r")[:-1]
+
+    def para_bounds(self):
+        """[(start, end)]，end 含段落符"""
+        out = []
+        start = 0
+        for p in self._paras:
+            out.append((start, start + len(p)))
+            start += len(p)
+        return out
+
+    def bounds_of(self, index: int):
+        start = self._fw.prefix(index)
+        return start, start + len(self._paras[index])
+
+    def index_of(self, pos: int) -> int:
+        """位置 pos 所在段落的序号（从 0 开始；pos 在末尾时为段落数）"""
+        return self._fw.search(pos)
+
+    def index_at(self, pos: int) -> int:
+        """起点 >= pos 的第一个段落序号"""
+        k = self._fw.search(pos)
+        return k if k >= len(self._paras) or self._fw.prefix(k) == pos else k + 1
+
+    def count_ending_by(self, pos: int) -> int:
+        """终点 <= pos 的段落个数"""
+        return self._fw.search(pos)
+
+    def slice(self, s: int, e: int) -> str:
+        i = self.index_of(s)
+        if i < len(self._paras):
+            start, end = self.bounds_of(i)
+            if e <= end:
+                return self._paras[i][s - start:e - start]
+        return self.text[s:e]
+
+    def replace(self, s: int, e: int, new: str):
+        paras = self._paras
+        n = len(paras)
+        if n == 0:
+            self._set_paras([new] if new else [])
+            self.lists[0:0] = [None] * new.count("\r")
+            return
+        i = min(self.index_of(s), n - 1)
+        j = i if e <= s else min(self.index_of(e - 1), n - 1)
+        off = self._fw.prefix(i)
+        old = "".join(paras[i:j + 1])
+        removed = old[s - off:e - off].count("\r")
+        merged = old[:s - off] + new + old[e - off:]
+        # 删掉了段落符：与下一段合并（同 Word）
+        while not merged.endswith("\r") and j + 1 < n:
+            j += 1
+            merged += paras[j]
+
+        parts = merged.split("\r")
+        new_paras = [x + "\r" for x in parts[:-1]] + ([parts[-1]] if parts[-1] else [])
+        if len(new_paras) == j - i + 1:
+            for k, text in enumerate(new_paras, start=i):
+                delta = len(text) - len(paras[k])
+                if delta:
+                    self._fw.add(k, delta)
+                paras[k] = text
+            self.length += len(new) - (e - s)
+            self._text = None
+        else:
+            paras[i:j + 1] = new_paras
+            self._set_paras(paras)
+
+        first = i
+        del self.lists[first:first + removed]
+        self.lists[first:first] = [None] * new.count("\r")
+
+
+class FakeListTemplate:
+    def __init__(self, list_id, kind):
+        self.list_id = list_id
+        self.kind = kind
+
+
+class FakeListFormat:
+    def __init__(self, rng):
+        self.rng = rng
+
+    def _paras(self):
+        rng = self.rng
+        story = rng.story
+        end = max(rng._end, rng._start + 1)
+        i = story.index_of(rng._start)
+        idx = []
+        while i < len(story.lists) and story.bounds_of(i)[0] < end:
+            idx.append(i)
+            i += 1
+        return idx
+
+    def _apply(self, kind, list_id):
+        self.rng.story.counter.calls += 1
+        for i in self._paras():
+            self.rng.story.lists[i] = (kind, list_id)
+
+    def ApplyNumberDefault(self):
+        story = self.rng.story
+        story._next_list += 1
+        self._apply("number", story._next_list)
+
+    def ApplyBulletDefault(self):
+        story = self.rng.story
+        story._next_list += 1
+        self._apply("bullet", story._next_list)
+
+    def ApplyListTemplate(self, template, continue_previous=False):
+        self._apply(template.kind, template.list_id)
+
+    @property
+    def ListTemplate(self):
+        self.rng.story.counter.calls += 1
+        i = self._paras()[0]
+        kind, list_id = self.rng.story.lists[i]
+        return FakeListTemplate(list_id, kind)
+
+
+class _FakeReplacement:
+    def __init__(self, counter: CallCounter):
+        self.counter = counter
+
+    def ClearFormatting(self):
+        self.counter.calls += 1
+
+
+class FakeFind:
+    """
+    Range.Find：只实现 Execute(..., Replace=wdReplaceAll)。查找内容支持 ^t / ^s / ^p，
+    通配符模式按 Python 正则解释（[...] 与 {n,} 与 Word 相同）；模式不跨段落，按段替换，段落符与列表属性不动
+    """
+
+    SPECIAL = {"^t": "\t", "^s": "\u00A0", "^p": "\r"}
+
+    def __init__(self, rng):
+        self.rng = rng
+
+    def ClearFormatting(self):
+        self.rng.story.counter.calls += 1
+
+    @property
+    def Replacement(self):
+        self.rng.story.counter.calls += 1
+        return _FakeReplacement(self.rng.story.counter)
+
+    def Execute(self, FindText="", MatchWildcards=False, ReplaceWith="", Replace=0, **_):
+        story = self.rng.story
+        story.counter.calls += 1
+        if Replace != 2:
+            raise NotImplementedError("FakeFind 只支持 Replace=wdReplaceAll")
+        for k, v in self.SPECIAL.items():
+            FindText = FindText.replace(k, v)
+        pattern = re.compile(FindText if MatchWildcards else re.escape(FindText))
+
+        rng = self.rng
+        found = False
+        i = story.index_of(rng._start)
+        while i < len(story.lists) and story.bounds_of(i)[0] < rng._end:
+            start, end = story.bounds_of(i)
+            content = story.slice(start, end).rstrip("\r")
+            new = pattern.sub(ReplaceWith, content)
+            if new != content:
+                found = True
+                story.replace(start, start + len(content), new)
+                if rng._end_fixed is not None:
+                    rng._end += len(new) - len(content)
+            i += 1
+        return found
+
+
+class FakeRange:
+    """end=None 表示整个 story（如 doc.Content），长度随编辑变化"""
+
+    def __init__(self, story: FakeStory, start: int, end):
+        self.story = story
+        self._start = start
+        self._end_fixed = end
+
+    @property
+    def _end(self):
+        return self.story.length if self._end_fixed is None else self._end_fixed
+
+    @_end.setter
+    def _end(self, v):
+        self._end_fixed = v
+
+    def _tick(self):
+        self.story.counter.calls += 1
+
+    @property
+    def Start(self):
+        self._tick()
+        return self._start
+
+    @Start.setter
+    def Start(self, v):
+        self._tick()
+        self._start = v
+
+    @property
+    def End(self):
+        self._tick()
+        return self._end
+
+    @End.setter
+    def End(self, v):
+        self._tick()
+        self._end = v
+
+    @property
+    def Text(self):
+        self._tick()
+        return self.story.slice(self._start, self._end)
+
+    @Text.setter
+    def Text(self, v):
+        self._tick()
+        self.story.replace(self._start, self._end, v)
+        if self._end_fixed is not None:
+            self._end = self._start + len(v)
+
+    @property
+    def Duplicate(self):
+        self._tick()
+        return FakeRange(self.story, self._start, self._end_fixed)
+
+    @property
+    def Paragraphs(self):
+        self._tick()
+        return FakeParagraphs(self)
+
+    @property
+    def ListFormat(self):
+        self._tick()
+        return FakeListFormat(self)
+
+    @property
+    def Find(self):
+        self._tick()
+        return FakeFind(self)
+
+    def SetRange(self, s, e):
+        self._tick()
+        self._start, self._end = s, e
+
+    def Delete(self):
+        self._tick()
+        self.story.replace(self._start, self._end, "")
+        if self._end_fixed is not None:
+            self._end = self._start
+
+
+class FakeParagraph:
+    """按段序号定位（Word 的 Paragraph 对象随文本编辑自动跟随）"""
+
+    def __init__(self, story: FakeStory, index: int):
+        self.story = story
+        self.index = index
+
+    @property
+    def Range(self):
+        self.story.counter.calls += 1
+        s, e = self.story.bounds_of(self.index)
+        return FakeRange(self.story, s, e)
+
+
+class FakeParagraphs:
+    """与 Word 一样是“活”集合：每次访问都按当前文本重新定位"""
+
+    def __init__(self, rng: FakeRange):
+        self.rng = rng
+
+    def _span(self):
+        """Range 内完整段落的序号区间 [first, last)"""
+        rng = self.rng
+        first = rng.story.index_at(rng._start)
+        return first, max(first, rng.story.count_ending_by(rng._end))
+
+    @property
+    def Count(self):
+        self.rng.story.counter.calls += 1
+        first, last = self._span()
+        return last - first
+
+    def Item(self, i):
+        self.rng.story.counter.calls += 1
+        first, last = self._span()
+        if not 1 <= i <= last - first:
+            raise IndexError(i)
+        return FakeParagraph(self.rng.story, first + i - 1)
+
+
+def make_range(paragraphs, counter: CallCounter = None):
+    """一个独立 story 的整体 Range（相当于 doc.Content），返回 (range, story)"""
+    story = FakeStory(paragraphs, counter or CallCounter())
+    return FakeRange(story, 0, None), story
+
+
+# ========= 文档级：Documents.Open / Sections / SaveAs =========
+REL_SETTINGS = R_NS + "/settings"
+W_SECTPR = _w("sectPr")
+W_TITLEPG = _w("titlePg")
+W_TYPE = _w("type")
+R_ID = "{%s}id" % R_NS
+# w:headerReference/@w:type → Headers(i) 的序号（wdHeaderFooterPrimary / FirstPage / EvenPages）
+HF_TYPES = {"default": 1, "first": 2, "even": 3}
+
+
+def read_docx_document(path: str) -> dict:
+    """
+    从 .docx 读出假文档的内容：
+    body（正文段落文本，w:tab 还原为 \\t）、stories（页眉/页脚部件 → 段落文本）、
+    sections（每节 {"Headers": {序号: 部件}, "Footers": {...}, "title_page": 首页不同}，没有引用的类型即链接到前一节）、
+    even_and_odd（奇偶页不同）
+    """
+    def texts(root):
+        return ["".join(t for _, t in _collect_segments(p)[0]) for p in root.iter(W_P)]
+
+    with zipfile.ZipFile(path) as z:
+        main = _find_main_part(z)
+        rels = _read_rels(z, main)[0]
+        targets = {rid: target for rid, _, target in rels}
+        root = ET.fromstring(z.read(main))
+        stories = {t: texts(ET.fromstring(z.read(t))) for _, typ, t in rels if typ in (REL_HEADER, REL_FOOTER)}
+        settings = next((t for _, typ, t in rels if typ == REL_SETTINGS), None)
+        even_and_odd = settings is not None and ET.fromstring(z.read(settings)).find(_w("evenAndOddHeaders")) is not None
+
+    sections = []
+    for sect in root.iter(W_SECTPR):
+        info = {"Headers": {}, "Footers": {}, "title_page": sect.find(W_TITLEPG) is not None}
+        for attr, tag in (("Headers", _w("headerReference")), ("Footers", _w("footerReference"))):
+            for ref in sect.iter(tag):
+                target = targets.get(ref.get(R_ID))
+                if target in stories:
+                    info[attr][HF_TYPES.get(ref.get(W_TYPE), 1)] = target
+        sections.append(info)
+    return {"body": texts(root), "stories": stories, "sections": sections or [{"Headers": {}, "Footers": {}}],
+            "even_and_odd": even_and_odd}
+
+
+class _HeaderFooter:
+    """某一节的某类页眉/页脚；没有自己的引用时链接到前一节（一直没有则是空页眉）"""
+
+    def __init__(self, doc, index: int, attr: str, kind: int):
+        self.doc = doc
+        self.index = index
+        self.attr = attr
+        self.kind = kind
+
+    @property
+    def Exists(self):
+        self.doc.counter.calls += 1
+        if self.kind == 2:
+            return self.doc.section_info[self.index].get("title_page", False)
+        if self.kind == 3:
+            return self.doc.even_and_odd
+        return True
+
+    @property
+    def LinkToPrevious(self):
+        self.doc.counter.calls += 1
+        return self.index > 0 and self.kind not in self.doc.section_info[self.index][self.attr]
+
+    @property
+    def Range(self):
+        self.doc.counter.calls += 1
+        story = self.doc.story_for(self.index, self.attr, self.kind)
+        story.passes += 1
+        return FakeRange(story, 0, None)
+
+
+class _HeadersFooters:
+    """Headers / Footers 集合：1 = 主，2 = 首页，3 = 偶数页"""
+
+    def __init__(self, doc, index: int, attr: str):
+        self.doc = doc
+        self.index = index
+        self.attr = attr
+
+    def __call__(self, kind: int):
+        self.doc.counter.calls += 1
+        if kind not in (1, 2, 3):
+            raise IndexError(kind)
+        return _HeaderFooter(self.doc, self.index, self.attr, kind)
+
+
+class FakeSection:
+    def __init__(self, doc, index: int):
+        self.doc = doc
+        self.index = index
+
+    @property
+    def Headers(self):
+        self.doc.counter.calls += 1
+        return _HeadersFooters(self.doc, self.index, "Headers")
+
+    @property
+    def Footers(self):
+        self.doc.counter.calls += 1
+        return _HeadersFooters(self.doc, self.index, "Footers")
+
+
+class _Sections:
+    def __init__(self, doc):
+        self.doc = doc
+
+    @property
+    def Count(self):
+        self.doc.counter.calls += 1
+        return len(self.doc.section_info)
+
+    def __call__(self, index: int):
+        self.doc.counter.calls += 1
+        if not 1 <= index <= len(self.doc.section_info):
+            raise IndexError(index)
+        return FakeSection(self.doc, index - 1)
+
+
+class FakeDocument:
+    """
+    stories：页眉/页脚部件 → FakeStory；每个 story 的 passes 记被取了几次 Range（重复处理的次数）
+    """
+
+    def __init__(self, path: str, counter: CallCounter):
+        self.path = path
+        self.counter = counter
+        content = read_docx_document(path)
+        self.body = FakeStory(content["body"], counter)
+        self.stories = {part: FakeStory(texts, counter) for part, texts in content["stories"].items()}
+        for story in self.stories.values():
+            story.passes = 0
+        self.section_info = content["sections"]
+        self.even_and_odd = content["even_and_odd"]
+        self._blank = {}
+        self.saved_as = None
+        self.closed = False
+
+    def story_for(self, index: int, attr: str, kind: int) -> FakeStory:
+        """第 index 节（从 0 开始）实际显示的 story：沿链接往前找第一个有引用的节"""
+        for info in reversed(self.section_info[:index + 1]):
+            part = info[attr].get(kind)
+            if part is not None:
+                return self.stories[part]
+        story = self._blank.get((attr, kind))
+        if story is None:
+            story = self._blank[attr, kind] = FakeStory([""], self.counter)
+            story.passes = 0
+        return story
+
+    @property
+    def Content(self):
+        self.counter.calls += 1
+        return FakeRange(self.body, 0, None)
+
+    @property
+    def Sections(self):
+        self.counter.calls += 1
+        return _Sections(self)
+
+    def SaveAs(self, path: str, FileFormat: int = 12):
+        """不生成真正的 Word 文件：正文与各页眉/页脚（按部件名）的文本写成 UTF-8 文本，以换页符分隔，便于核对结果"""
+        self.counter.calls += 1
+        self.saved_as = path
+        with open(path, "w", encoding="utf-8") as f:
+            for story in [self.body] + [self.stories[k] for k in sorted(self.stories)]:
+                f.write("\n".join(story.paragraphs()))
+                f.write("\n\f\n")
+
+    def Close(self, SaveChanges=False):
+        self.counter.calls += 1
+        self.closed = True
+
+
+class _Documents:
+    def __init__(self, word):
+        self.word = word
+
+    def Open(self, path: str, ReadOnly: bool = False, AddToRecentFiles: bool = True):
+        self.word.counter.calls += 1
+        doc = FakeDocument(path, self.word.counter)
+        self.word.opened.append(doc)
+        return doc
+
+
+class FakeWord:
+    """Word.Application 替身；counter.calls 累计所有文档的 COM 调用"""
+
+    def __init__(self):
+        self.counter = CallCounter()
+        self.Caption = "Microsoft Word"
+        self.Visible = True
+        self.DisplayAlerts = -1
+        self.Documents = _Documents(self)
+        self.opened = []
+        self.quit = False
+
+    def Quit(self):
+        self.counter.calls += 1
+        self.quit = True
+
+
+def install_fake_pywin32(make_word):
+    """
+    在 sys.modules 里装一套最小的假 pywin32（win32com.client / win32gui / win32process）：
+    make_word() 返回 (Word 替身, 它所在进程的 PID)；FindWindow("OpusApp", 标题) 按替身当前的 Caption 找窗口
+    """
+    windows = []  # 窗口句柄 - 1 → (Word 替身, PID)
+
+    def dispatch_ex(prog_id):
+        word, pid = make_word()
+        windows.append((word, pid))
+        return word
+
+    def find_window(class_name, caption):
+        for hwnd, (word, _) in enumerate(windows, start=1):
+            if class_name == "OpusApp" and word.Caption == caption:
+                return hwnd
+        return 0
+
+    client = types.ModuleType("win32com.client")
+    client.DispatchEx = dispatch_ex
+    win32com = types.ModuleType("win32com")
+    win32com.client = client
+    win32gui = types.ModuleType("win32gui")
+    win32gui.FindWindow = find_window
+    win32process = types.ModuleType("win32process")
+    win32process.GetWindowThreadProcessId = lambda hwnd: (0, windows[hwnd - 1][1])
+    sys.modules.update({"win32com": win32com, "win32com.client": client,
+                        "win32gui": win32gui, "win32process": win32process})
@@ -0,0 +1,176 @@
+# benchmarks/run_benchmarks.py
+"""
+基准测试套件：生成合成文档，分别测 normalize_text / detect_fake_list / plan_list_runs /
+process_range（假 COM，快照与逐段两种模式）/ 整个文档（假 COM 的 WordSession 与 OOXML 后端），
+输出墙钟时间、段落/秒与 COM 调用数；结果写 JSON，可与上一版本的结果对比
+
+    python benchmarks/run_benchmarks.py --paragraphs 1000 10000 --out bench.json
+    python benchmarks/run_benchmarks.py --compare bench_old.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from word_processor import (  # noqa: E402
+    WordSession, normalize_text, detect_fake_list, plan_list_runs, process_range, process_document
+)
+from benchmarks.docgen import make_document_texts, generate_docx  # noqa: E402
+from benchmarks.fake_com import FakeWord, make_range  # noqa: E402
+
+
+def _timed(fn, repeat: int):
+    """运行 repeat 次取最快一次，返回 (秒, 最后一次的返回值)"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return best, result
+
+
+def _record(name: str, paragraphs: int, seconds: float, **extra) -> dict:
+    rec = {
+        "name": name,
+        "paragraphs": paragraphs,
+        "seconds": round(seconds, 6),
+        "paras_per_s": round(paragraphs / seconds, 1) if seconds > 0 else None,
+    }
+    rec.update(extra)
+    return rec
+
+
+def bench_text(texts, repeat: int):
+    n = len(texts)
+    sec, normalized = _timed(lambda: [normalize_text(t) for t in texts], repeat)
+    yield _record("normalize_text", n, sec)
+    sec, _ = _timed(lambda: [detect_fake_list(t) for t in normalized], repeat)
+    yield _record("detect_fake_list", n, sec)
+    sec, runs = _timed(lambda: plan_list_runs(normalized), repeat)
+    yield _record("plan_list_runs", n, sec, list_runs=len(runs))
+
+
+def bench_process_range(texts, repeat: int, keep_blank_lines: int):
+    for snapshot in (True, False):
+        def run():
+            rng, story = make_range(texts)
+            stats = process_range(rng, keep_max_blank_lines=keep_blank_lines, snapshot=snapshot)
+            return stats, story.counter.calls
+
+        sec, (stats, calls) = _timed(run, repeat)
+        yield _record("process_range[%s]" % ("snapshot" if snapshot else "per_paragraph"),
+                      len(texts), sec, com_calls=calls, stats=stats)
+
+
+def bench_documents(path: str, paragraphs: int, repeat: int, keep_blank_lines: int, workdir: str):
+    options = dict(keep_max_blank_lines=keep_blank_lines, tab_to_space=True,
+                   compress_spaces=True, process_headers_footers=True)
+
+    def com():
+        word = FakeWord()
+        with WordSession(dispatch=lambda prog_id: word) as session:
+            stats = session.process(path, os.path.join(workdir, "out_com.docx"), **options)
+        return stats, word.counter.calls
+
+    sec, (stats, calls) = _timed(com, repeat)
+    yield _record("process_document[com_fake]", paragraphs, sec, com_calls=calls, stats=stats)
+
+    out = os.path.join(workdir, "out_ooxml.docx")
+    sec, _ = _timed(lambda: process_document(path, out, backend="ooxml", **options), repeat)
+    yield _record("process_document[ooxml]", paragraphs, sec,
+                  input_bytes=os.path.getsize(path), output_bytes=os.path.getsize(out))
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=10,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def run_suite(sizes, *, list_ratio: float, dirty_ratio: float, blank_ratio: float, cjk_ratio: float,
+              keep_blank_lines: int = 1, repeat: int = 3, seed: int = 42) -> dict:
+    doc_opts = dict(list_ratio=list_ratio, dirty_ratio=dirty_ratio, blank_ratio=blank_ratio, cjk_ratio=cjk_ratio)
+    results = []
+    workdir = tempfile.mkdtemp(prefix="wordcleaner_bench_")
+    try:
+        for n in sizes:
+            texts = make_document_texts(n, seed=seed, **doc_opts)
+            results.extend(bench_text(texts, repeat))
+            results.extend(bench_process_range(texts, repeat, keep_blank_lines))
+            path = generate_docx(os.path.join(workdir, "bench_%d.docx" % n), paragraphs=n, seed=seed, **doc_opts)
+            results.extend(bench_documents(path, n, repeat, keep_blank_lines, workdir))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "meta": {
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "params": dict(sizes=list(sizes), keep_blank_lines=keep_blank_lines, repeat=repeat, seed=seed, **doc_opts),
+        "results": results,
+    }
+
+
+def compare(old: dict, new: dict):
+    """按 (name, paragraphs) 对齐两次结果，打印耗时比（>1 表示变慢）"""
+    old_map = {(r["name"], r["paragraphs"]): r for r in old.get("results", [])}
+    print("%-32s %8s %12s %12s %8s" % ("name", "paras", "old(ms)", "new(ms)", "ratio"))
+    for r in new["results"]:
+        o = old_map.get((r["name"], r["paragraphs"]))
+        if o is None:
+            continue
+        ratio = r["seconds"] / o["seconds"] if o["seconds"] else float("nan")
+        flag = "  ⚠" if ratio > 1.1 else ""
+        print("%-32s %8d %12.2f %12.2f %8.2f%s" % (
+            r["name"], r["paragraphs"], o["seconds"] * 1000, r["seconds"] * 1000, ratio, flag))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="WordCleaner 基准测试")
+    ap.add_argument("--paragraphs", type=int, nargs="+", default=[1000, 10000], help="每份合成文档的段落数，可给多个")
+    ap.add_argument("--list-ratio", type=float, default=0.2)
+    ap.add_argument("--dirty-ratio", type=float, default=0.3)
+    ap.add_argument("--blank-ratio", type=float, default=0.1)
+    ap.add_argument("--cjk-ratio", type=float, default=0.6)
+    ap.add_argument("--keep-blank-lines", type=int, default=1)
+    ap.add_argument("--repeat", type=int, default=3, help="每项重复次数，取最快一次")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--out", default="", help="结果 JSON 路径（默认打印到标准输出）")
+    ap.add_argument("--compare", default="", help="与之前保存的结果 JSON 对比")
+    args = ap.parse_args()
+
+    report = run_suite(
+        args.paragraphs, list_ratio=args.list_ratio, dirty_ratio=args.dirty_ratio,
+        blank_ratio=args.blank_ratio, cjk_ratio=args.cjk_ratio,
+        keep_blank_lines=args.keep_blank_lines, repeat=args.repeat, seed=args.seed
+    )
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    elif not args.compare:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
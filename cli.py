@@ -0,0 +1,252 @@
+# cli.py
+"""
+命令行入口（无界面，适合构建机 / 计划任务）：
+
+    python cli.py D:\\docs --recursive --workers 4 --suffix _cleaned
+    dir /b /s *.docx | python cli.py - --backend ooxml --output-dir D:\\out
+    python cli.py --watch D:\\inbox --output-dir D:\\out --workers 2
+    python cli.py D:\\archive --dry-run --workers 4 > plan.jsonl
+
+输入可以是文件、文件夹（默认递归）或 "-"（从标准输入逐行读取路径，边读边处理）；
+--watch 时输入为要监视的文件夹，持续处理新放进来的文件，直到 Ctrl+C。
+每处理完一个文件向标准输出写一行 JSON（event=file），最后一行为汇总（event=summary）；
+--journal 逐文件记录结果（崩溃也不丢），--resume 续跑时跳过日志里已成功且没变过的文件（event=skip）。
+--dry-run 只统计每个文件会改动什么（stats 里的 whitespace_changed / list_runs / list_items / blank_removed / changed），
+不写任何输出；.docx 直接读 XML、不启动 Word，汇总里另有会改动的文件数与各项合计。
+退出码：0 全部成功，1 有文件失败，2 参数错误，130 被中断
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+from batch import (
+    DEFAULT_EXCLUDE, BackendStats, BatchReport, JobConfig, ParallelExecutor, analysis_totals, build_output_path,
+    scan_word_files, split_patterns
+)
+from journal import BatchJournal
+from watcher import HotFolder
+
+
+def _stdin_paths():
+    for line in sys.stdin:
+        line = line.strip().strip('"')
+        if line:
+            yield line
+
+
+def build_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(
+        prog="wordcleaner",
+        description="批量清理 Word 文档：Tab/连续空格/全角空格、假列表转真列表、压缩空行",
+    )
+    ap.add_argument("inputs", nargs="+", help="文件、文件夹，或 - 表示从标准输入逐行读取路径")
+    ap.add_argument("--no-recursive", dest="recursive", action="store_false", help="文件夹只取第一层")
+    ap.add_argument("--include", default="", help="文件夹内只要匹配的文件名，通配符，多个用 ; 分隔（如 合同*;*.docx）")
+    ap.add_argument("--exclude", default=";".join(DEFAULT_EXCLUDE),
+                    help="文件夹内跳过匹配的文件/子文件夹名（默认 ~$*，即 Word 锁文件）")
+
+    g = ap.add_argument_group("输出命名（同界面）")
+    g.add_argument("--mode", choices=("suffix", "overwrite", "custom"), default="suffix",
+                   help="suffix=原名+后缀（默认）；overwrite=原名；custom=自定义名（仅单文件）")
+    g.add_argument("--suffix", default="_cleaned")
+    g.add_argument("--name", default="", help="custom 模式的输出文件名（不含扩展名）")
+    g.add_argument("--output-dir", default="", help="输出目录；不填则输出到原文件所在目录")
+    g.add_argument("--ext", choices=(".docx", ".doc"), default=".docx", help="输出格式")
+    g.add_argument("--compress-level", type=int, choices=range(10), default=6, metavar="0-9",
+                   help="ooxml：改写部件的压缩级别（0 不压缩，默认 6）；图片等未改动成员原样拷贝")
+
+    g = ap.add_argument_group("清理选项")
+    g.add_argument("--keep-blank-lines", type=int, default=1, help="连续空行最多保留几个（默认 1）")
+    g.add_argument("--no-tab-to-space", dest="tab_to_space", action="store_false")
+    g.add_argument("--no-compress-spaces", dest="compress_spaces", action="store_false")
+    g.add_argument("--no-headers-footers", dest="headers_footers", action="store_false")
+    g.add_argument("--find-replace", action="store_true",
+                   help="com：先用 Word 查找替换整体清理 Tab/全角空格/连续空格，再逐段处理列表与空行（结果相同）")
+
+    g = ap.add_argument_group("执行")
+    g.add_argument("--backend", choices=("auto", "com", "ooxml"), default="auto",
+                   help="auto=.docx 用 ooxml、.doc 或输出 .doc 用 Word（默认）；com=全部用 Word（仅 Windows）；"
+                        "ooxml=全部用纯 Python 改写（仅 .docx）")
+    g.add_argument("--workers", type=int, default=1, help="并行进程数（默认 1）")
+    g.add_argument("--fail-fast", action="store_true", help="遇到第一个失败就停止派发")
+    g.add_argument("--timeout", type=float, default=0.0,
+                   help="单个文档的处理时限（秒），超时强制结束子进程及其 Word 后重试；0 = 不限时（默认）")
+    g.add_argument("--timeout-per-mb", type=float, default=30.0, help="时限按文件大小追加的秒数/MB（默认 30）")
+    g.add_argument("--retries", type=int, default=1, help="超时或子进程崩溃后的重试次数（默认 1）")
+    g.add_argument("--dry-run", action="store_true",
+                   help="预检：只统计每个文件会改动的段落、假列表与空行，不写输出（.docx 不需要 Word）")
+    g.add_argument("--cache", action="store_true", help="启用结果缓存")
+    g.add_argument("--cache-dir", default="")
+    g.add_argument("--cache-max-mb", type=int, default=2048)
+    g.add_argument("--report", action="store_true", help="结束后在输出目录写 JSON/CSV 处理报告")
+    g.add_argument("--journal", default="", help="断点日志路径（JSON Lines，每完成一个文件追加一行并落盘）")
+    g.add_argument("--resume", action="store_true", help="按 --journal 续跑：跳过上次已成功且输入没变的文件")
+
+    g = ap.add_argument_group("监视模式（热文件夹）")
+    g.add_argument("--watch", action="store_true", help="持续监视输入文件夹，新文件写完后自动处理，Ctrl+C 结束")
+    g.add_argument("--watch-mode", choices=("auto", "events", "poll"), default="auto",
+                   help="auto=装了 watchdog 用系统通知，否则轮询（默认）")
+    g.add_argument("--settle", type=float, default=2.0, help="文件多少秒不变才算写完（默认 2）")
+    g.add_argument("--poll-interval", type=float, default=1.0, help="轮询间隔秒数（默认 1）")
+    g.add_argument("--process-existing", action="store_true", help="启动时文件夹里已有的文件也处理")
+    return ap
+
+
+def config_from_args(args) -> JobConfig:
+    return JobConfig(
+        naming_mode=args.mode,
+        suffix=args.suffix,
+        custom_name=args.name,
+        output_dir=args.output_dir,
+        use_same_dir=not args.output_dir,
+        output_ext=args.ext,
+        keep_blank_lines=args.keep_blank_lines,
+        tab_to_space=args.tab_to_space,
+        compress_spaces=args.compress_spaces,
+        process_headers_footers=args.headers_footers,
+        workers=max(1, args.workers),
+        backend=args.backend,
+        timeout=max(0.0, args.timeout),
+        timeout_per_mb=max(0.0, args.timeout_per_mb),
+        max_retries=max(0, args.retries),
+        compress_level=args.compress_level,
+        find_replace=args.find_replace,
+        dry_run=args.dry_run,
+        use_cache=args.cache,
+        cache_dir=args.cache_dir,
+        cache_max_mb=args.cache_max_mb,
+        write_report=args.report,
+    )
+
+
+def _emit(obj: dict):
+    sys.stdout.write(json.dumps(obj, ensure_ascii=False) + "\n")
+    sys.stdout.flush()
+
+
+def main(argv=None) -> int:
+    ap = build_parser()
+    args = ap.parse_args(argv)
+
+    if args.mode == "custom":
+        if not args.name:
+            ap.error("--mode custom 需要 --name")
+        if len(args.inputs) != 1 or args.inputs[0] == "-" or os.path.isdir(args.inputs[0]):
+            ap.error("自定义输出名仅支持单文件处理")
+    if args.inputs.count("-") > 1:
+        ap.error("- 只能出现一次")
+    if args.resume and not args.journal:
+        ap.error("--resume 需要 --journal")
+    if args.dry_run and (args.journal or args.watch):
+        ap.error("--dry-run 不能与 --journal / --watch 同时使用")
+    if args.watch:
+        if args.resume:
+            ap.error("监视模式不支持 --resume（已处理的文件本来就不会重复处理）")
+        if args.mode == "custom":
+            ap.error("监视模式不支持自定义输出名")
+        missing = [p for p in args.inputs if not os.path.isdir(p)]
+        if missing:
+            ap.error("监视模式的输入必须是已存在的文件夹：" + "，".join(missing))
+
+    try:
+        sys.stdout.reconfigure(encoding="utf-8")
+    except (AttributeError, ValueError):
+        pass
+
+    cfg = config_from_args(args)
+    journal = None
+    if args.journal:
+        journal = BatchJournal(args.journal)
+        try:
+            if args.resume:
+                journal.load()
+            journal.begin(args.resume, inputs=args.inputs, backend=cfg.backend)
+        except OSError as e:
+            ap.error(f"无法写断点日志：{e}")
+
+    include = split_patterns(args.include)
+    exclude = split_patterns(args.exclude)
+    if args.watch:
+        hot = HotFolder(cfg, args.inputs, recursive=args.recursive, include=include, exclude=exclude,
+                        settle=args.settle, poll_interval=args.poll_interval,
+                        process_existing=args.process_existing, mode=args.watch_mode)
+        results = hot.run()
+        stop = hot.stop
+    else:
+        sources = (p for item in args.inputs for p in (_stdin_paths() if item == "-" else (item,)))
+        files = scan_word_files(sources, recursive=args.recursive, include=include, exclude=exclude)
+        if journal is not None and journal.done:
+            files = journal.pending(files, lambda f: build_output_path(f, cfg),
+                                    on_skip=lambda f, out: _emit({"event": "skip", "input": f, "output": out}))
+        executor = ParallelExecutor(cfg)
+        results = executor.run(files)
+        stop = executor.cancel
+
+    report = BatchReport(cfg) if cfg.write_report else None
+    counts = {"files": 0, "ok": 0, "failed": 0, "cached": 0, "skipped": 0}
+    analyzed = []
+    backends = BackendStats()
+    t0 = time.perf_counter()
+    interrupted = False
+
+    try:
+        for res in results:
+            counts["files"] += 1
+            counts["ok" if res.ok else "failed"] += 1
+            counts["cached"] += res.cached
+            backends.add(res)
+            if cfg.dry_run and res.ok:
+                analyzed.append(res.stats)
+            if report is not None:
+                report.add(res)
+            if journal is not None:
+                journal.record(res)
+            _emit({
+                "event": "file",
+                "index": res.index,
+                "input": res.input_path,
+                "output": res.output_path,
+                "ok": res.ok,
+                "cached": res.cached,
+                "error": res.error,
+                "seconds": round(res.seconds, 4),
+                "attempts": res.attempts,
+                "backend": res.backend,
+                "stats": res.stats,
+                "phases": res.phases,
+            })
+            if not res.ok and args.fail_fast:
+                stop()
+    except KeyboardInterrupt:
+        interrupted = True
+        stop()
+    finally:
+        results.close()
+
+    if journal is not None:
+        counts["skipped"] = journal.skipped
+        if interrupted:
+            journal.close()
+        else:
+            journal.finish(**counts)
+
+    summary = {"event": "summary", **counts, "seconds": round(time.perf_counter() - t0, 4),
+               "interrupted": interrupted, "backends": backends.to_dict()}
+    if cfg.dry_run:
+        summary["dry_run"] = analysis_totals(analyzed)
+    if report is not None and report.results:
+        try:
+            summary["report"] = list(report.write())
+        except OSError as e:
+            summary["report_error"] = str(e)
+    _emit(summary)
+
+    if interrupted:
+        return 130
+    return 1 if counts["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
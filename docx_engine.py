@@ -0,0 +1,893 @@
+# docx_engine.py
+"""
+纯 Python OOXML 引擎：把 .docx 当 zip 打开，直接在 XML 上执行
+normalize_text / detect_fake_list / 空行压缩，不需要启动 Word（Linux 可用）
+"""
+import os
+import re
+import copy
+import shutil
+import struct
+import posixpath
+import tempfile
+import zipfile
+import xml.etree.ElementTree as ET
+
+from collections import deque
+
+from word_processor import (
+    ListRunPlanner, PhaseTimer, count_changes, new_change_counts, normalize_many, plan_list_runs, planned_texts,
+    timer_phase
+)
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+R_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+XML_SPACE = "{http://www.w3.org/XML/1998/namespace}space"
+
+REL_OFFICE_DOCUMENT = R_NS + "/officeDocument"
+REL_HEADER = R_NS + "/header"
+REL_FOOTER = R_NS + "/footer"
+REL_NUMBERING = R_NS + "/numbering"
+CT_NUMBERING = "application/vnd.openxmlformats-officedocument.wordprocessingml.numbering+xml"
+
+XML_DECL = b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\r\n'
+
+# 正文 document.xml（解压后）超过这个大小时改用流式处理，内存占用与文档大小无关
+STREAMING_THRESHOLD = 64 << 20
+
+# 改写过的 XML 部件的压缩级别（0 = 不压缩，1 最快 ~ 9 最小）；未改动的成员原样拷贝，不受影响
+DEFAULT_COMPRESS_LEVEL = 6
+
+ET.register_namespace("w", W_NS)
+ET.register_namespace("r", R_NS)
+
+
+def _w(tag: str) -> str:
+    return "{%s}%s" % (W_NS, tag)
+
+
+W_P = _w("p")
+W_R = _w("r")
+W_T = _w("t")
+W_TAB = _w("tab")
+W_PPR = _w("pPr")
+W_NUMPR = _w("numPr")
+W_SECTPR = _w("sectPr")
+W_BODY = _w("body")
+W_VAL = _w("val")
+
+# run 内这些元素在 Word 的 Range.Text 里会占位，段落不算“空行”
+W_OPAQUE = frozenset(_w(t) for t in (
+    "drawing", "pict", "object", "sym", "fldChar",
+    "footnoteReference", "endnoteReference", "commentReference",
+))
+W_OPAQUE_MC = "{http://schemas.openxmlformats.org/markup-compatibility/2006}AlternateContent"
+
+# pPr 中必须排在 numPr 之前的子元素（OOXML schema 顺序）
+W_PPR_BEFORE_NUMPR = frozenset(_w(t) for t in (
+    "pStyle", "keepNext", "keepLines", "pageBreakBefore", "framePr", "widowControl",
+))
+
+# normalize_text 会把这些字符变成普通空格，对齐时视为同一个字符
+_SPACE_LIKE = frozenset(" \t\u00A0\u2002\u2003\u2009\u3000")
+
+RE_ROOT_TAG = re.compile(rb"<(?![?!])[^>]*>")
+RE_XMLNS = re.compile(rb'xmlns:([A-Za-z_][\w.-]*)="([^"]*)"')
+RE_XMLNS_DECL = re.compile(rb'\s+xmlns:([A-Za-z_][\w.-]*)="([^"]*)"')
+RE_TAG_NAME = re.compile(rb"<([^\s/>]+)")
+
+_registered_ns = set()
+
+
+# ========= XML 读写（保留原命名空间前缀） =========
+def _register_root_ns(root_tag: bytes):
+    for pair in RE_XMLNS.findall(root_tag):
+        if pair in _registered_ns:
+            continue
+        _registered_ns.add(pair)
+        try:
+            ET.register_namespace(pair[0].decode(), pair[1].decode())
+        except ValueError:
+            pass
+
+
+def _parse_part(data: bytes):
+    """解析 XML part，并登记根节点上的命名空间前缀，保证回写时前缀不变"""
+    m = RE_ROOT_TAG.search(data)
+    root_tag = m.group(0) if m else b""
+    _register_root_ns(root_tag)
+    return ET.fromstring(data), root_tag
+
+
+def _serialize_part(root, root_tag: bytes = b"") -> bytes:
+    """
+    序列化 XML part；用原始根标签替换 ElementTree 生成的根标签，
+    这样 mc:Ignorable 引用但未使用的前缀声明不会丢（否则 Word 会报文件损坏）
+    """
+    body = ET.tostring(root, encoding="utf-8", xml_declaration=False)
+    if root_tag:
+        m = RE_ROOT_TAG.search(body)
+        new_tag = m.group(0)
+        known = {p for p, _ in RE_XMLNS.findall(root_tag)}
+        extra = b"".join(
+            b' xmlns:%s="%s"' % (p, u) for p, u in RE_XMLNS.findall(new_tag) if p not in known
+        )
+        tag = root_tag
+        if extra:
+            cut = len(tag) - (2 if tag.endswith(b"/>") else 1)
+            tag = tag[:cut] + extra + tag[cut:]
+        body = body[:m.start()] + tag + body[m.end():]
+    return XML_DECL + body
+
+
+def _rels_path(part_name: str) -> str:
+    d, f = posixpath.split(part_name)
+    return posixpath.join(d, "_rels", f + ".rels")
+
+
+def _resolve_target(source_part: str, target: str) -> str:
+    if target.startswith("/"):
+        return target.lstrip("/")
+    return posixpath.normpath(posixpath.join(posixpath.dirname(source_part), target))
+
+
+# ========= 段落文本：收集 / 回写 =========
+def _collect_segments(p):
+    """
+    收集段落自身的文本片段 [(elem, text)]（w:t 与 run 内的 w:tab），
+    跳过 pPr 与嵌套段落（文本框），并返回是否含图片/域等占位内容
+    """
+    segs = []
+    opaque = False
+    stack = [iter(p)]
+    while stack:
+        child = next(stack[-1], None)
+        if child is None:
+            stack.pop()
+            continue
+        tag = child.tag
+        if tag == W_P or tag == W_PPR:
+            continue
+        if tag == W_R:
+            for rc in child:
+                rt = rc.tag
+                if rt == W_T:
+                    segs.append((rc, rc.text or ""))
+                elif rt == W_TAB:
+                    segs.append((rc, "\t"))
+                elif rt in W_OPAQUE or rt == W_OPAQUE_MC:
+                    opaque = True
+            continue
+        stack.append(iter(child))
+    return segs, opaque
+
+
+def _distribute(pieces, new_text: str):
+    """
+    把 new_text 按原片段的字符归属重新切分，尽量让每个字符留在原来的 run 里（保留格式）。
+    对齐不上（例如 HTML 实体展开）时整体放进第一个片段。
+    """
+    out = [[] for _ in pieces]
+    j, n = 0, len(new_text)
+    for k, piece in enumerate(pieces):
+        for ch in piece:
+            if j >= n:
+                break
+            c = new_text[j]
+            if ch == c or (c == " " and ch in _SPACE_LIKE):
+                out[k].append(c)
+                j += 1
+    if j < n:
+        return [new_text] + [""] * (len(pieces) - 1)
+    return ["".join(x) for x in out]
+
+
+def _rewrite_segments(segs, new_text: str) -> bool:
+    """只改有变化的片段；w:tab 变空格/删除时改写为 w:t。返回是否有改动"""
+    pieces = [t for _, t in segs]
+    if "".join(pieces) == new_text:
+        return False
+    for (elem, old), new in zip(segs, _distribute(pieces, new_text)):
+        if new == old:
+            continue
+        if elem.tag == W_TAB:
+            elem.tag = W_T
+            elem.attrib.clear()
+        elem.text = new
+        if new[:1].isspace() or new[-1:].isspace():
+            elem.set(XML_SPACE, "preserve")
+        else:
+            elem.attrib.pop(XML_SPACE, None)
+    return True
+
+
+def _set_num_pr(p, num_id: int):
+    """给段落挂上真列表：<w:numPr><w:ilvl w:val="0"/><w:numId w:val="N"/></w:numPr>"""
+    ppr = p.find(W_PPR)
+    if ppr is None:
+        ppr = ET.Element(W_PPR)
+        p.insert(0, ppr)
+    old = ppr.find(W_NUMPR)
+    if old is not None:
+        ppr.remove(old)
+
+    idx = 0
+    for i, c in enumerate(ppr):
+        if c.tag in W_PPR_BEFORE_NUMPR:
+            idx = i + 1
+
+    num_pr = ET.Element(W_NUMPR)
+    ET.SubElement(num_pr, _w("ilvl"), {W_VAL: "0"})
+    ET.SubElement(num_pr, _w("numId"), {W_VAL: str(num_id)})
+    ppr.insert(idx, num_pr)
+
+
+# ========= numbering.xml =========
+class _Numbering:
+    """
+    维护 numbering.xml：
+    - number / bullet 各建一个 abstractNum（首次用到时）
+    - 每段连续列表新建一个 w:num；编号列表用 startOverride 从 1 重新开始，
+      与 COM 路径里 ApplyNumberDefault 开新列表的效果一致
+    新建的 w:num 只记 (numId, abstractNumId, 类型)，to_bytes 时直接拼成 XML 文本插入（流式处理超大文档时省内存）
+    """
+
+    def __init__(self, data: bytes = None):
+        if data is None:
+            self.root = ET.Element(_w("numbering"))
+            self.root_tag = b""
+        else:
+            self.root, self.root_tag = _parse_part(data)
+        self.modified = False
+        self._abstract = {}
+        self._new_nums = []
+        self._next_abstract = 1 + max(
+            (int(a.get(_w("abstractNumId"), 0)) for a in self.root.iter(_w("abstractNum"))), default=-1
+        )
+        self._next_num = 1 + max(
+            (int(n.get(_w("numId"), 0)) for n in self.root.iter(_w("num"))), default=0
+        )
+
+    def _abstract_id(self, list_type: str) -> int:
+        if list_type in self._abstract:
+            return self._abstract[list_type]
+
+        aid = self._next_abstract
+        self._next_abstract += 1
+        a = ET.Element(_w("abstractNum"), {_w("abstractNumId"): str(aid)})
+        ET.SubElement(a, _w("multiLevelType"), {W_VAL: "singleLevel"})
+        lvl = ET.SubElement(a, _w("lvl"), {_w("ilvl"): "0"})
+        ET.SubElement(lvl, _w("start"), {W_VAL: "1"})
+        if list_type == "number":
+            ET.SubElement(lvl, _w("numFmt"), {W_VAL: "decimal"})
+            ET.SubElement(lvl, _w("lvlText"), {W_VAL: "%1."})
+        else:
+            ET.SubElement(lvl, _w("numFmt"), {W_VAL: "bullet"})
+            ET.SubElement(lvl, _w("lvlText"), {W_VAL: "•"})
+        ET.SubElement(lvl, _w("lvlJc"), {W_VAL: "left"})
+        ppr = ET.SubElement(lvl, W_PPR)
+        ET.SubElement(ppr, _w("ind"), {_w("left"): "420", _w("hanging"): "420"})
+
+        # schema 顺序：abstractNum 必须在所有 num 之前
+        idx = 0
+        for i, c in enumerate(self.root):
+            if c.tag in (_w("numPicBullet"), _w("abstractNum")):
+                idx = i + 1
+        self.root.insert(idx, a)
+        self._abstract[list_type] = aid
+        return aid
+
+    def new_list(self, list_type: str) -> int:
+        aid = self._abstract_id(list_type)
+        nid = self._next_num
+        self._next_num += 1
+        self._new_nums.append((nid, aid, list_type))
+        self.modified = True
+        return nid
+
+    def _num_fragments(self, w: bytes) -> bytes:
+        out = []
+        for nid, aid, list_type in self._new_nums:
+            override = b""
+            if list_type == "number":
+                override = b'<%s:lvlOverride %s:ilvl="0"><%s:startOverride %s:val="1" /></%s:lvlOverride>' % (
+                    w, w, w, w, w)
+            out.append(b'<%s:num %s:numId="%d"><%s:abstractNumId %s:val="%d" />%s</%s:num>' % (
+                w, w, nid, w, w, aid, override, w))
+        return b"".join(out)
+
+    def to_bytes(self) -> bytes:
+        data = _serialize_part(self.root, self.root_tag)
+        if not self._new_nums:
+            return data
+        w = next((p for p, u in RE_XMLNS.findall(RE_ROOT_TAG.search(data).group(0)) if u == W_NS.encode()), b"w")
+        idx = data.find(b"<%s:numIdMacAtCleanup" % w)
+        if idx < 0:
+            idx = data.rfind(b"</%s:numbering>" % w)
+        return data[:idx] + self._num_fragments(w) + data[idx:]
+
+
+# ========= 单个 story（正文 / 页眉 / 页脚） =========
+def _parent_map(root):
+    return {c: p for p in root.iter() for c in p}
+
+
+def _compress_blank_paragraphs(root, paras, blank_flags, keep_max_blank_lines: int) -> int:
+    """
+    连续空行最多保留 keep_max_blank_lines 个（与 COM 倒序删除一致：保留每段空行里靠后的几个）；
+    带 sectPr 的段落、容器里最后一个段落（如表格单元格）不删。返回删除的段落数
+    """
+    if keep_max_blank_lines < 0:
+        return 0
+
+    doomed = []
+    run = []
+    for p, blank in zip(paras + [None], blank_flags + [False]):
+        if blank:
+            run.append(p)
+            continue
+        if len(run) > keep_max_blank_lines:
+            doomed.extend(run[:len(run) - keep_max_blank_lines])
+        run = []
+
+    if not doomed:
+        return 0
+
+    removed = 0
+    parents = _parent_map(root)
+    for p in doomed:
+        ppr = p.find(W_PPR)
+        if ppr is not None and ppr.find(W_SECTPR) is not None:
+            continue
+        parent = parents.get(p)
+        if parent is None or len(parent.findall(W_P)) <= 1:
+            continue
+        parent.remove(p)
+        removed += 1
+    return removed
+
+
+def process_story(
+    root,
+    numbering: _Numbering,
+    *,
+    keep_max_blank_lines: int = 1,
+    tab_to_space: bool = True,
+    compress_spaces: bool = True,
+    counts: dict = None,
+    timer: PhaseTimer = None
+) -> bool:
+    """
+    XML 版 process_range：空格/tab + 假列表转真列表（w:numPr）+ 压缩空行。返回 XML 是否有改动
+    counts：传入时累计改动计数（new_change_counts，预检用）
+    timer：段落数计入当前阶段，空行删除记在 "blank_lines" 阶段
+    """
+    modified = False
+
+    paras = list(root.iter(W_P))
+    collected = [_collect_segments(p) for p in paras]
+    raws = ["".join(t for _, t in segs) for segs, _ in collected]
+    contents = normalize_many(raws, tab_to_space=tab_to_space, compress_spaces=compress_spaces)
+    runs = plan_list_runs(contents)
+    blank_flags = [content == "" and not opaque for (_, opaque), content in zip(collected, contents)]
+
+    for (segs, _), new_text in zip(collected, planned_texts(contents, runs)):
+        modified |= _rewrite_segments(segs, new_text)
+
+    for run in runs:
+        num_id = numbering.new_list(run.list_type)
+        for p in paras[run.start:run.end]:
+            _set_num_pr(p, num_id)
+        modified = True
+
+    if timer is not None:
+        timer.add(paragraphs=len(paras))
+    with timer_phase(timer, "blank_lines"):
+        removed = _compress_blank_paragraphs(root, paras, blank_flags, keep_max_blank_lines)
+    if counts is not None:
+        count_changes(counts, raws, contents, runs, removed)
+    return modified or removed > 0
+
+
+# ========= 流式处理超大 document.xml =========
+class _HeadRecorder:
+    """包一层输入流，记下开头的若干字节（用来取原始根标签）"""
+
+    def __init__(self, f, limit: int = 1 << 16):
+        self.f = f
+        self.limit = limit
+        self.head = b""
+
+    def read(self, n: int = -1) -> bytes:
+        b = self.f.read(n)
+        if len(self.head) < self.limit:
+            self.head += b[:self.limit - len(self.head)]
+        return b
+
+
+class _StreamBlock:
+    """w:body 下的一个顶层元素（段落 / 表格 / sectPr ...）；undecided = 还没决定去留的空段落数"""
+    __slots__ = ("elem", "undecided", "dropped")
+
+    def __init__(self, elem):
+        self.elem = elem
+        self.undecided = 0
+        self.dropped = False
+
+
+class _StoryStreamer:
+    """
+    流式版 process_story：iterparse 逐个读入 w:body 的顶层元素，处理完立即写出并从树上摘掉。
+    规则与 DOM 版完全一致（段落顺序、列表规划、空行保留靠后的几个、sectPr/容器最后一段不删），
+    只需暂存“去留未定”的空段落所在的几个顶层元素：
+    - 列表只看前一段（ListRunPlanner）
+    - 连续空段落超过 keep 个时，最早的那个必然要删，当场决定；遇到非空段落时缓冲里的全部保留
+    内存上限取决于最大的单个顶层元素（例如一张大表格），与文档总大小无关
+    """
+
+    def __init__(self, out, numbering: _Numbering, *, keep_max_blank_lines: int,
+                 tab_to_space: bool, compress_spaces: bool, counts: dict = None):
+        self.out = out
+        self.numbering = numbering
+        self.keep = keep_max_blank_lines
+        self.norm = dict(tab_to_space=tab_to_space, compress_spaces=compress_spaces)
+        self.planner = ListRunPlanner()
+        self.blocks = deque()      # 尚未写出的顶层元素
+        self.blanks = deque()      # 去留未定的空段落 (block, p, parent)
+        self.deferred = None       # 要删但 w:body 里暂时只有它一个段落，等下一个正文段落再定
+        self.body = None
+        self._body_name = b""
+        self._body_done = False
+        self._num_id = None
+        self.body_paras = 0        # w:body 下当前存活的段落数
+        self.paragraphs = 0
+        self.modified = False
+        self.known_ns = set()
+        self.counts = new_change_counts() if counts is None else counts
+
+    # ---------- 写出 ----------
+    def _write_block(self, elem):
+        data = ET.tostring(elem, encoding="utf-8", xml_declaration=False)
+        # 去掉根标签上已声明过的命名空间，避免每个段落都重复一遍
+        m = RE_ROOT_TAG.search(data)
+        tag = RE_XMLNS_DECL.sub(
+            lambda d: b"" if (d.group(1), d.group(2)) in self.known_ns else d.group(0), m.group(0))
+        self.out.write(data[:m.start()] + tag + data[m.end():])
+
+    def _release(self):
+        while self.blocks and self.blocks[0].undecided == 0:
+            block = self.blocks.popleft()
+            if not block.dropped:
+                self._write_block(block.elem)
+            self.body.remove(block.elem)
+
+    # ---------- 空段落去留 ----------
+    def _decide(self, rec, drop: bool):
+        block, p, parent = rec
+        if drop and self._droppable(p, parent):
+            if parent is self.body:
+                if self.body_paras <= 1:
+                    self.deferred = rec
+                    return
+                block.dropped = True
+                self.body_paras -= 1
+            else:
+                parent.remove(p)
+            self.modified = True
+            self.counts["blank_removed"] += 1
+        block.undecided -= 1
+
+    def _droppable(self, p, parent) -> bool:
+        ppr = p.find(W_PPR)
+        if ppr is not None and ppr.find(W_SECTPR) is not None:
+            return False
+        if parent is self.body:
+            return True
+        return len(parent.findall(W_P)) > 1
+
+    def _mark(self, rec, blank: bool):
+        if self.keep < 0:
+            return
+        if not blank:
+            while self.blanks:
+                self._decide(self.blanks.popleft(), False)
+            return
+        rec[0].undecided += 1
+        self.blanks.append(rec)
+        if len(self.blanks) > self.keep:
+            self._decide(self.blanks.popleft(), True)
+
+    # ---------- 段落处理 ----------
+    def _process_block(self, elem):
+        block = _StreamBlock(elem)
+        self.blocks.append(block)
+        paras = list(elem.iter(W_P))
+        if not paras:
+            return
+        parents = {c: par for par in elem.iter() for c in par}
+        parents[elem] = self.body
+        if elem.tag == W_P:
+            self.body_paras += 1
+            if self.deferred is not None:
+                # 正文里又有了别的段落：之前暂缓的那个空段落可以删了
+                rec, self.deferred = self.deferred, None
+                self._decide(rec, True)
+
+        collected = [_collect_segments(p) for p in paras]
+        raws = ["".join(t for _, t in segs) for segs, _ in collected]
+        contents = normalize_many(raws, **self.norm)
+        counts = self.counts
+        for p, (segs, opaque), raw, content in zip(paras, collected, raws, contents):
+            list_type, new_text, new_run = self.planner.feed(content)
+            self.modified |= _rewrite_segments(segs, new_text)
+            if raw != content:
+                counts["whitespace_changed"] += 1
+            if list_type is not None:
+                if new_run:
+                    self._num_id = self.numbering.new_list(list_type)
+                    counts["list_runs"] += 1
+                counts["list_items"] += 1
+                _set_num_pr(p, self._num_id)
+                self.modified = True
+            self._mark((block, p, parents[p]), content == "" and not opaque)
+        self.paragraphs += len(paras)
+        counts["paragraphs"] += len(paras)
+
+    def run(self, source) -> bool:
+        head = _HeadRecorder(source)
+        root = None
+        depth = 0
+        for event, elem in ET.iterparse(head, events=("start", "end")):
+            if event == "start":
+                depth += 1
+                if depth == 1:
+                    root = elem
+                    m = RE_ROOT_TAG.search(head.head)
+                    root_tag = m.group(0)
+                    _register_root_ns(root_tag)
+                    self.known_ns = set(RE_XMLNS.findall(root_tag))
+                    self.out.write(XML_DECL + root_tag)
+                elif depth == 2 and elem.tag == W_BODY:
+                    self.body = elem
+                    prefix = next((p for p, u in self.known_ns if u == W_NS.encode()), None)
+                    if prefix is None:
+                        raise ValueError("根节点未声明 w 命名空间，无法流式处理")
+                    self._body_name = prefix + b":body"
+                    self.out.write(b"<%s>" % self._body_name)
+                continue
+
+            depth -= 1
+            if depth == 2 and self.body is not None and self._body_name and not self._body_done:
+                self._process_block(elem)
+                self._release()
+            elif depth == 1:
+                if elem is self.body:
+                    # 文档结束：缓冲里剩下的空段落都保留
+                    while self.blanks:
+                        self._decide(self.blanks.popleft(), False)
+                    if self.deferred is not None:
+                        self.deferred[0].undecided -= 1
+                        self.deferred = None
+                    self._release()
+                    self.out.write(b"</%s>" % self._body_name)
+                    self._body_done = True
+                else:
+                    self._write_block(elem)
+                root.remove(elem)
+            elif depth == 0:
+                self.out.write(b"</%s>" % RE_TAG_NAME.match(root_tag).group(1))
+        return self.modified
+
+
+def stream_story(source, out, numbering: _Numbering, *, keep_max_blank_lines: int = 1,
+                 tab_to_space: bool = True, compress_spaces: bool = True, counts: dict = None,
+                 timer: PhaseTimer = None) -> bool:
+    """
+    流式处理 document.xml：从 source（二进制流）读，结果写到 out，返回是否有改动。
+    与 process_story 输出一致，但不建整棵树，适合几百 MB 的正文；counts 同 process_story
+    """
+    streamer = _StoryStreamer(
+        out, numbering, keep_max_blank_lines=keep_max_blank_lines,
+        tab_to_space=tab_to_space, compress_spaces=compress_spaces, counts=counts
+    )
+    modified = streamer.run(source)
+    if timer is not None:
+        timer.add(paragraphs=streamer.paragraphs)
+    return modified
+
+
+# ========= 整个 .docx =========
+def _read_rels(zin, part_name: str):
+    """返回 [(Id, Type, 解析后的 part 路径)]，忽略外部链接"""
+    path = _rels_path(part_name)
+    try:
+        root = ET.fromstring(zin.read(path))
+    except KeyError:
+        return [], None
+    out = []
+    for rel in root.iter("{%s}Relationship" % PKG_REL_NS):
+        if rel.get("TargetMode") == "External":
+            continue
+        out.append((rel.get("Id"), rel.get("Type"), _resolve_target(part_name, rel.get("Target", ""))))
+    return out, root
+
+
+def _find_main_part(zin) -> str:
+    rels, _ = _read_rels(zin, "")
+    for _, typ, target in rels:
+        if typ == REL_OFFICE_DOCUMENT:
+            return target
+    return "word/document.xml"
+
+
+def process_docx(
+    input_path: str,
+    output_path: str,
+    *,
+    keep_max_blank_lines: int = 1,
+    tab_to_space: bool = True,
+    compress_spaces: bool = True,
+    process_headers_footers: bool = True,
+    compress_level: int = DEFAULT_COMPRESS_LEVEL,
+    streaming: bool = None,
+    timer: PhaseTimer = None
+) -> dict:
+    """
+    直接改写 .docx 的 XML 并导出到 output_path（仅支持 .docx 输入/输出）。
+    返回统计：new_change_counts（段落数、空白改动段落数、假列表个数/项数、删除空行数），另加 hf_stories（处理的页眉/页脚部件数）
+    compress_level：改写过的部件的压缩级别；图片/字体/嵌入对象等未改动的成员按原始压缩字节拷贝
+    streaming：正文是否流式处理（None = 正文解压后超过 STREAMING_THRESHOLD 时自动启用）
+    timer：分阶段计时 open / body / headers_footers / blank_lines / save
+    """
+    if not 0 <= compress_level <= 9:
+        raise ValueError(f"压缩级别应为 0~9：{compress_level}")
+    input_path = os.path.abspath(input_path)
+    output_path = os.path.abspath(output_path)
+
+    ext = os.path.splitext(output_path)[1].lower()
+    if ext == ".doc":
+        raise ValueError("OOXML 后端只能输出 .docx，.doc 请使用 Word（backend='com'）")
+    if ext != ".docx":
+        output_path = output_path + ".docx"
+
+    opts = dict(
+        keep_max_blank_lines=keep_max_blank_lines,
+        tab_to_space=tab_to_space,
+        compress_spaces=compress_spaces,
+        timer=timer
+    )
+
+    with zipfile.ZipFile(input_path) as zin:
+        with timer_phase(timer, "open"):
+            main_part = _find_main_part(zin)
+            doc_rels, doc_rels_root = _read_rels(zin, main_part)
+
+            stories = [main_part]
+            if process_headers_footers:
+                stories += [t for _, typ, t in doc_rels if typ in (REL_HEADER, REL_FOOTER)]
+
+            numbering_part = next((t for _, typ, t in doc_rels if typ == REL_NUMBERING), None)
+            numbering = _Numbering(zin.read(numbering_part) if numbering_part else None)
+
+        if streaming is None:
+            streaming = zin.getinfo(main_part).file_size > STREAMING_THRESHOLD
+
+        counts = new_change_counts()
+        counts["hf_stories"] = len(dict.fromkeys(stories)) - 1
+        opts["counts"] = counts
+        changed = {}
+        try:
+            for part in dict.fromkeys(stories):
+                with timer_phase(timer, "body" if part == main_part else "headers_footers"):
+                    if streaming and part == main_part:
+                        # 结果先落到临时文件，写 zip 时再按块拷进去
+                        spool = tempfile.TemporaryFile()
+                        with zin.open(part) as src:
+                            if stream_story(src, spool, numbering, **opts):
+                                spool.seek(0)
+                                changed[part] = spool
+                            else:
+                                spool.close()
+                        continue
+                    root, root_tag = _parse_part(zin.read(part))
+                    if process_story(root, numbering, **opts):
+                        changed[part] = _serialize_part(root, root_tag)
+
+            with timer_phase(timer, "save"):
+                if numbering.modified:
+                    if numbering_part is None:
+                        numbering_part = posixpath.join(posixpath.dirname(main_part), "numbering.xml")
+                        changed.update(_register_numbering_part(zin, main_part, numbering_part, doc_rels_root))
+                    changed[numbering_part] = numbering.to_bytes()
+
+                copied, rewritten = _write_zip(zin, output_path, changed, compress_level)
+                if timer is not None:
+                    timer.add(raw_copied=copied, recompressed=rewritten)
+        finally:
+            for data in changed.values():
+                if hasattr(data, "close"):
+                    data.close()
+
+    return counts
+
+
+class _NullSink:
+    """预检时流式处理的输出：直接丢弃"""
+
+    def write(self, data: bytes) -> int:
+        return len(data)
+
+
+def analyze_docx(
+    input_path: str,
+    *,
+    keep_max_blank_lines: int = 1,
+    tab_to_space: bool = True,
+    compress_spaces: bool = True,
+    process_headers_footers: bool = True,
+    streaming: bool = None,
+    timer: PhaseTimer = None
+) -> dict:
+    """
+    预检（只读）：按与 process_docx 完全相同的规则在内存里处理一遍，不写任何文件，不需要 Word。
+    返回 new_change_counts 计数，另加 changed（处理后会不会有改动）；大正文同样流式处理，内存有上界
+    timer：分阶段计时 open / body / headers_footers / blank_lines
+    """
+    opts = dict(
+        keep_max_blank_lines=keep_max_blank_lines,
+        tab_to_space=tab_to_space,
+        compress_spaces=compress_spaces,
+        timer=timer
+    )
+    counts = new_change_counts()
+    changed = False
+
+    with zipfile.ZipFile(input_path) as zin:
+        with timer_phase(timer, "open"):
+            main_part = _find_main_part(zin)
+            doc_rels, _ = _read_rels(zin, main_part)
+            stories = [main_part]
+            if process_headers_footers:
+                stories += [t for _, typ, t in doc_rels if typ in (REL_HEADER, REL_FOOTER)]
+            numbering_part = next((t for _, typ, t in doc_rels if typ == REL_NUMBERING), None)
+            numbering = _Numbering(zin.read(numbering_part) if numbering_part else None)
+
+        if streaming is None:
+            streaming = zin.getinfo(main_part).file_size > STREAMING_THRESHOLD
+
+        for part in dict.fromkeys(stories):
+            with timer_phase(timer, "body" if part == main_part else "headers_footers"):
+                if streaming and part == main_part:
+                    with zin.open(part) as src:
+                        changed |= stream_story(src, _NullSink(), numbering, counts=counts, **opts)
+                    continue
+                root, _ = _parse_part(zin.read(part))
+                changed |= process_story(root, numbering, counts=counts, **opts)
+
+    counts["changed"] = changed
+    return counts
+
+
+def _insert_before_close(data: bytes, close_tag: bytes, fragment: bytes) -> bytes:
+    idx = data.rfind(close_tag)
+    if idx < 0:
+        raise ValueError("无法定位 %s" % close_tag.decode())
+    return data[:idx] + fragment + data[idx:]
+
+
+def _register_numbering_part(zin, main_part: str, numbering_part: str, doc_rels_root) -> dict:
+    """文档原本没有 numbering.xml：补 [Content_Types].xml Override 与 document.xml.rels 关系（按文本插入，原内容不动）"""
+    out = {}
+
+    out["[Content_Types].xml"] = _insert_before_close(
+        zin.read("[Content_Types].xml"), b"</Types>",
+        b'<Override PartName="/%s" ContentType="%s"/>' % (numbering_part.encode(), CT_NUMBERING.encode())
+    )
+
+    rels_path = _rels_path(main_part)
+    used = set() if doc_rels_root is None else {rel.get("Id") for rel in doc_rels_root}
+    n = 1
+    while "rId%d" % n in used:
+        n += 1
+    target = posixpath.relpath(numbering_part, posixpath.dirname(main_part) or ".")
+    rel = b'<Relationship Id="rId%d" Type="%s" Target="%s"/>' % (n, REL_NUMBERING.encode(), target.encode())
+    if doc_rels_root is None:
+        out[rels_path] = XML_DECL + b'<Relationships xmlns="%s">%s</Relationships>' % (PKG_REL_NS.encode(), rel)
+    else:
+        out[rels_path] = _insert_before_close(zin.read(rels_path), b"</Relationships>", rel)
+    return out
+
+
+# 原样拷贝成员（登记到中央目录）、流式写入时指定压缩级别都没有公开接口，要动 CPython zipfile 的内部状态
+_ZIPFILE_STATE = ("NameToInfo", "start_dir", "_didModify")
+
+
+def _zip_private_state(zout, info) -> bool:
+    """zout / info 上是否有上面这些内部属性（其他 Python 实现或以后的版本可能没有）；没有时调用方退回公开接口"""
+    return all(hasattr(zout, a) for a in _ZIPFILE_STATE) and hasattr(info, "_compresslevel")
+
+
+def _copy_member_raw(zin, zout, info):
+    """
+    把一个未改动的成员按原始压缩字节拷进 zout：不解压、不重新压缩，CRC/大小沿用原值。
+    zipfile 没有公开接口，这里自己写本地文件头 + 原样数据，再登记到 zout 的中央目录；
+    zipfile 内部状态不可用时退回 writestr（解压后按原压缩方式重新压缩）
+    """
+    if not _zip_private_state(zout, info):
+        zout.writestr(info, zin.read(info))
+        return
+    fp = zin.fp
+    fp.seek(info.header_offset)
+    header = fp.read(zipfile.sizeFileHeader)
+    if len(header) != zipfile.sizeFileHeader or header[:4] != zipfile.stringFileHeader:
+        raise zipfile.BadZipFile("成员 %s 的本地文件头损坏" % info.filename)
+    name_len, extra_len = struct.unpack("<HH", header[26:30])
+    fp.seek(info.header_offset + zipfile.sizeFileHeader + name_len + extra_len)
+
+    out = copy.copy(info)
+    out.flag_bits &= ~0x08  # CRC 与大小直接写进本地文件头，不再跟数据描述符
+    out.header_offset = zout.fp.tell()
+    zout.fp.write(out.FileHeader())
+    remaining = info.compress_size
+    while remaining:
+        chunk = fp.read(min(remaining, 1 << 20))
+        if not chunk:
+            raise zipfile.BadZipFile("成员 %s 的数据被截断" % info.filename)
+        zout.fp.write(chunk)
+        remaining -= len(chunk)
+
+    zout.filelist.append(out)
+    zout.NameToInfo[out.filename] = out
+    zout.start_dir = zout.fp.tell()
+    zout._didModify = True
+
+
+def _write_member(zout, info, data, compress_type: int, level):
+    """
+    data 可以是 bytes，也可以是流式处理得到的临时文件（按块拷贝，不整体读进内存；此时 info 须为 ZipInfo，
+    zipfile 内部状态不可用时按默认压缩级别写）
+    """
+    if not hasattr(data, "read"):
+        zout.writestr(info, data, compress_type=compress_type, compresslevel=level)
+        return
+    info.compress_type = compress_type
+    if _zip_private_state(zout, info):
+        info._compresslevel = level
+    size = data.seek(0, os.SEEK_END)
+    data.seek(0)
+    with zout.open(info, "w", force_zip64=size > zipfile.ZIP64_LIMIT) as dst:
+        shutil.copyfileobj(data, dst, 1 << 20)
+
+
+def _write_zip(zin, output_path: str, changed: dict, compress_level: int = DEFAULT_COMPRESS_LEVEL):
+    """
+    先写临时文件再替换，允许输出路径与输入相同（覆盖模式）
+    只有 changed 里的部件重新压缩，其余成员原样拷贝；返回 (原样拷贝数, 重新压缩数)
+    """
+    compress_type = zipfile.ZIP_STORED if compress_level == 0 else zipfile.ZIP_DEFLATED
+    level = compress_level or None
+    changed = dict(changed)
+    copied = 0
+    out_dir = os.path.dirname(output_path)
+    fd, tmp = tempfile.mkstemp(suffix=".docx", dir=out_dir)
+    os.close(fd)
+    try:
+        with zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED) as zout:
+            for info in zin.infolist():
+                data = changed.pop(info.filename, None)
+                if data is None:
+                    _copy_member_raw(zin, zout, info)
+                    copied += 1
+                else:
+                    _write_member(zout, copy.copy(info), data, compress_type, level)
+            for name, data in changed.items():
+                _write_member(zout, name, data, compress_type, level)
+        os.replace(tmp, output_path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    return copied, len(zin.infolist()) - copied + len(changed)
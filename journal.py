@@ -0,0 +1,171 @@
+# journal.py
+"""
+批处理日志（journal）：每完成一个文件就追加一行 JSON 并落盘（flush + fsync），
+程序崩溃 / 断电 / 被中途停止后，下次可以跳过已经成功的文件接着处理。
+
+一行一条记录：
+    {"type": "start", ...}                        一次运行开始（续跑会再追加一条）
+    {"type": "file", "input": ..., "ok": ...}     一个文件的结果
+    {"type": "end", "ok": 12, "failed": 1, ...}   正常结束时的汇总
+最后一行写到一半（崩溃时）读的时候忽略
+"""
+import os
+import json
+import time
+import hashlib
+from typing import Callable, Iterable, Iterator, Optional
+
+# 决定“是不是同一批任务”的 JobConfig 字段（影响输出位置或内容）
+JOB_FIELDS = (
+    "naming_mode", "suffix", "custom_name", "output_dir", "use_same_dir", "output_ext",
+    "keep_blank_lines", "tab_to_space", "compress_spaces", "process_headers_footers",
+    "backend", "compress_level", "find_replace",
+)
+
+# 默认目录里最多保留的日志个数（按修改时间淘汰最旧的）
+KEEP_JOURNALS = 50
+
+
+def default_journal_dir() -> str:
+    base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "WordCleaner", "journal")
+
+
+def _signature(path: str):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def job_id(files: Iterable[str], cfg) -> str:
+    """同样的文件列表 + 同样的输出相关选项 = 同一批任务"""
+    h = hashlib.sha256()
+    h.update(json.dumps({k: getattr(cfg, k, None) for k in JOB_FIELDS}, sort_keys=True).encode("utf-8"))
+    for f in files:
+        h.update(os.path.abspath(f).encode("utf-8", "surrogatepass") + b"\0")
+    return h.hexdigest()[:24]
+
+
+class BatchJournal:
+    """
+    - load()：读已有日志，得到上次成功的文件（输入路径 -> 记录）与是否正常结束
+    - is_done()：上次已成功、输入文件没变（大小 + 修改时间）、输出还在 → 可跳过
+    - begin(resume)：续跑时追加，否则清空重写
+    - record() / finish()：逐文件追加结果、写结束汇总
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.done = {}
+        self.completed = False
+        self.skipped = 0
+        self._f = None
+
+    @classmethod
+    def for_job(cls, files, cfg, root: str = "") -> "BatchJournal":
+        """按任务内容定位到默认目录下的日志文件（界面用：同一批文件再点开始时能认出来）"""
+        root = root or default_journal_dir()
+        os.makedirs(root, exist_ok=True)
+        _prune(root)
+        return cls(os.path.join(root, job_id(files, cfg) + ".jsonl"))
+
+    def load(self) -> "BatchJournal":
+        self.done = {}
+        self.completed = False
+        try:
+            f = open(self.path, "r", encoding="utf-8")
+        except FileNotFoundError:
+            return self
+        with f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue  # 崩溃时写了一半的行
+                typ = rec.get("type")
+                if typ == "start":
+                    self.completed = False
+                elif typ == "end":
+                    self.completed = True
+                elif typ == "file":
+                    if rec.get("ok"):
+                        self.done[rec["input"]] = rec
+                    else:
+                        self.done.pop(rec["input"], None)
+        return self
+
+    @property
+    def exists(self) -> bool:
+        return os.path.isfile(self.path)
+
+    def is_done(self, in_path: str, out_path: str) -> bool:
+        rec = self.done.get(os.path.abspath(in_path))
+        if rec is None or rec.get("output") != os.path.abspath(out_path):
+            return False
+        return rec.get("input_sig") == _signature(in_path) and os.path.isfile(out_path)
+
+    def pending(self, files: Iterable[str], output_path: Callable[[str], str],
+                on_skip: Optional[Callable[[str, str], None]] = None) -> Iterator[str]:
+        """过滤掉已完成的文件（惰性）；每跳过一个计数并回调 on_skip(in_path, out_path)"""
+        for f in files:
+            if f is not None and self.done:
+                out = output_path(f)
+                if self.is_done(f, out):
+                    self.skipped += 1
+                    if on_skip:
+                        on_skip(f, out)
+                    continue
+            yield f
+
+    def begin(self, resume: bool, **info):
+        d = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(d, exist_ok=True)
+        if not resume:
+            self.done = {}
+        self._f = open(self.path, "a" if resume else "w", encoding="utf-8")
+        self._write({"type": "start", "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "resume": resume, **info})
+
+    def record(self, res):
+        """res：batch.FileResult"""
+        if self._f is None:
+            return
+        self._write({
+            "type": "file",
+            "input": os.path.abspath(res.input_path),
+            "output": os.path.abspath(res.output_path),
+            "ok": res.ok,
+            "cached": res.cached,
+            "error": res.error,
+            "seconds": round(res.seconds, 4),
+            "input_sig": _signature(res.input_path) if res.ok else None,
+        })
+
+    def finish(self, **summary):
+        if self._f is None:
+            return
+        self._write({"type": "end", "time": time.strftime("%Y-%m-%dT%H:%M:%S"), **summary})
+        self.close()
+
+    def close(self):
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+    def _write(self, rec: dict):
+        self._f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        self._f.flush()
+        os.fsync(self._f.fileno())
+
+
+def _prune(root: str):
+    try:
+        entries = sorted((e.stat().st_mtime, e.path) for e in os.scandir(root) if e.name.endswith(".jsonl"))
+    except OSError:
+        return
+    for _, path in entries[:-KEEP_JOURNALS]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,148 @@
+# result_cache.py
+"""
+内容寻址的结果缓存：同一份输入（按字节哈希）+ 同样的清理选项，直接复用上次的输出，
+不再走一遍 Word / XML 处理。按总大小做 LRU 淘汰（以文件 mtime 作为最近使用时间）
+"""
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+
+# 处理逻辑有变化时递增，使旧缓存全部失效
+CACHE_VERSION = 1
+
+# 影响输出内容的 JobConfig 字段
+KEY_FIELDS = (
+    "keep_blank_lines", "tab_to_space", "compress_spaces",
+    "process_headers_footers", "output_ext", "backend", "compress_level", "find_replace",
+)
+
+
+def default_cache_dir() -> str:
+    base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "WordCleaner", "cache")
+
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            b = f.read(chunk_size)
+            if not b:
+                break
+            h.update(b)
+    return h.hexdigest()
+
+
+class ResultCache:
+    """
+    - key：sha256(输入文件字节) + 相关选项 → 再哈希
+    - fetch：命中则复制（link=True 时尽量硬链接）到输出路径，并刷新 mtime
+    - store：处理完成后把输出存一份；超过 max_bytes 时删掉最久未用的条目
+    多个进程共用同一目录是安全的：写入走临时文件 + os.replace，读到一半被淘汰按未命中处理
+    """
+
+    def __init__(self, root: str = "", *, max_bytes: int = 2 << 30, link: bool = False):
+        self.root = root or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.link = link
+        self._total = None
+        os.makedirs(self.root, exist_ok=True)
+
+    @staticmethod
+    def make_key(in_path: str, cfg) -> str:
+        opts = {k: getattr(cfg, k) for k in KEY_FIELDS}
+        opts["v"] = CACHE_VERSION
+        h = hashlib.sha256(file_digest(in_path).encode("ascii"))
+        h.update(json.dumps(opts, sort_keys=True).encode("utf-8"))
+        return h.hexdigest()
+
+    def _entry_path(self, key: str, ext: str) -> str:
+        return os.path.join(self.root, key[:2], key + ext)
+
+    def fetch(self, key: str, out_path: str) -> bool:
+        src = self._entry_path(key, os.path.splitext(out_path)[1].lower())
+        try:
+            os.utime(src)  # LRU：刷新最近使用时间
+        except FileNotFoundError:
+            return False
+
+        # 先落到同目录临时文件再替换：缓存条目中途被淘汰也不会损坏已有输出（覆盖模式下即原文件）
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(out_path)))
+        os.close(fd)
+        os.remove(tmp)
+        try:
+            linked = False
+            if self.link:
+                try:
+                    os.link(src, tmp)
+                    linked = True
+                except FileNotFoundError:
+                    raise
+                except OSError:
+                    pass  # 跨盘 / 文件系统不支持硬链接：退回复制
+            if not linked:
+                shutil.copyfile(src, tmp)
+            os.replace(tmp, out_path)
+            return True
+        except FileNotFoundError:
+            return False
+        finally:
+            if os.path.lexists(tmp):
+                os.remove(tmp)
+
+    def store(self, key: str, out_path: str):
+        if not os.path.isfile(out_path):
+            return
+        dst = self._entry_path(key, os.path.splitext(out_path)[1].lower())
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(dst))
+        os.close(fd)
+        try:
+            shutil.copyfile(out_path, tmp)
+            size = os.path.getsize(tmp)
+            os.replace(tmp, dst)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+
+        if self._total is None:
+            self._total = self._scan_total()
+        else:
+            self._total += size
+        if self._total > self.max_bytes:
+            self.evict()
+
+    def _entries(self):
+        out = []
+        for sub in os.scandir(self.root):
+            if not sub.is_dir():
+                continue
+            try:
+                for e in os.scandir(sub.path):
+                    st = e.stat()
+                    out.append((st.st_mtime, st.st_size, e.path))
+            except FileNotFoundError:
+                continue  # 其他进程刚好淘汰掉
+        return out
+
+    def _scan_total(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self):
+        """按最近使用时间从旧到新删除，直到总大小不超过 max_bytes"""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._total = total
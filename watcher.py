@@ -0,0 +1,258 @@
+# watcher.py
+"""
+热文件夹监视（不依赖 PyQt）：持续监视一个或多个输入目录，新放进来的 .doc/.docx 写完之后
+送进现有的批处理流水线（ParallelExecutor，在途文件数 <= workers），输出路径规则同 build_output_path。
+
+- 装了 watchdog 时用系统文件通知（inotify / ReadDirectoryChangesW / FSEvents），并定期全量扫描兜底；
+  没装或启动失败时退回定时轮询
+- 去抖：文件大小与修改时间连续 settle 秒不变、能打开读取（.docx 还要是完整的 zip）才算写完
+- 处理过的文件记下 (大小, 修改时间)，之后被修改才会再处理；输出文件落在监视目录里也不会被当成新输入
+"""
+import os
+import time
+import queue
+import zipfile
+import threading
+from typing import Iterator, Optional, Sequence
+
+from batch import DEFAULT_EXCLUDE, FileResult, JobConfig, ParallelExecutor, is_word_file, match_any, scan_word_files
+
+
+def _signature(path: str):
+    """(大小, 修改时间)；文件不存在时返回 None"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+def _looks_complete(path: str) -> bool:
+    """能以只读打开（Windows 上写入方独占时会失败）；.docx 还要能读到 zip 尾部目录"""
+    try:
+        with open(path, "rb") as f:
+            if path.lower().endswith(".docx"):
+                return zipfile.is_zipfile(f)
+            return True
+    except OSError:
+        return False
+
+
+class HotFolder:
+    """
+    用法：
+        hot = HotFolder(cfg, [r"D:\\inbox"], settle=2.0)
+        for res in hot.run():      # 一直运行，直到其他线程调用 hot.stop()
+            ...
+    """
+
+    RESCAN_INTERVAL = 30.0   # 事件模式下的兜底全量扫描间隔（秒），防止漏掉事件
+    TICK = 0.2               # 没有就绪文件时的等待粒度（秒）
+
+    def __init__(
+        self,
+        cfg: JobConfig,
+        folders: Sequence[str],
+        *,
+        recursive: bool = True,
+        include: Sequence[str] = (),
+        exclude: Sequence[str] = DEFAULT_EXCLUDE,
+        settle: float = 2.0,
+        poll_interval: float = 1.0,
+        process_existing: bool = False,
+        mode: str = "auto"
+    ):
+        """
+        settle：文件多久不变才算写完（秒）
+        poll_interval：轮询模式下的扫描间隔（秒）
+        process_existing：启动时目录里已有的文件也处理（默认只处理之后新来的）
+        mode："auto"（有 watchdog 用事件，否则轮询）| "events" | "poll"
+        """
+        if mode not in ("auto", "events", "poll"):
+            raise ValueError(f"未知监视模式：{mode}（可选 'auto' / 'events' / 'poll'）")
+        self.cfg = cfg
+        self.folders = [os.path.abspath(f) for f in folders]
+        self.recursive = recursive
+        self.include = tuple(include)
+        self.exclude = tuple(exclude)
+        self.settle = settle
+        self.poll_interval = poll_interval
+        self.process_existing = process_existing
+        self.requested_mode = mode
+        self.mode = ""            # 实际使用的模式："events" / "poll"
+
+        self.executor = ParallelExecutor(cfg)
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._events = queue.SimpleQueue()   # watchdog 线程送来的路径
+        self._pending = {}        # 等待写完：路径 -> (签名, 最近一次变化的时间)
+        self._done = {}           # 已处理 / 已知：路径 -> 签名
+        self._busy = set()        # 在途任务的输入与输出路径
+
+    def stop(self):
+        """可从其他线程调用：不再接新文件，等在途文件完成后 run() 结束"""
+        self._stop.set()
+        self._wake.set()
+        self.executor.cancel()
+
+    # ---------- 发现文件 ----------
+    def _accept(self, path: str) -> bool:
+        name = os.path.basename(path)
+        if not is_word_file(name) or match_any(name, self.exclude):
+            return False
+        if self.include and not match_any(name, self.include):
+            return False
+        parent = os.path.dirname(path)
+        for folder in self.folders:
+            rel = os.path.relpath(parent, folder)
+            if rel == os.pardir or rel.startswith(os.pardir + os.sep):
+                continue
+            if rel == os.curdir:
+                return True
+            return self.recursive and not any(match_any(part, self.exclude) for part in rel.split(os.sep))
+        return False
+
+    def _touch(self, path: str, now: float):
+        if path in self._busy:
+            return
+        sig = _signature(path)
+        if sig is None:
+            self._pending.pop(path, None)
+            return
+        if self._done.get(path) == sig:
+            return
+        old = self._pending.get(path)
+        if old is None or old[0] != sig:
+            self._pending[path] = (sig, now)
+
+    def _scan(self, now: float):
+        for path in scan_word_files(self.folders, self.recursive, self.include, self.exclude,
+                                    should_stop=self._stop.is_set):
+            self._touch(path, now)
+
+    def _drain_events(self, now: float):
+        while True:
+            try:
+                path = self._events.get_nowait()
+            except queue.Empty:
+                return
+            if os.path.isdir(path):
+                # 整个文件夹搬进来时只有一条目录事件：补扫一遍
+                if self.recursive:
+                    for p in scan_word_files([path], True, self.include, self.exclude, should_stop=self._stop.is_set):
+                        self._touch(p, now)
+            elif self._accept(path):
+                self._touch(path, now)
+
+    def _pop_ready(self, now: float) -> list:
+        ready = []
+        for path, (sig, since) in list(self._pending.items()):
+            if now - since < self.settle:
+                continue
+            cur = _signature(path)
+            if cur is None:
+                del self._pending[path]
+            elif cur != sig:
+                self._pending[path] = (cur, now)
+            elif _looks_complete(path) or now - since >= self.settle * 10:
+                # 一直不完整（如损坏的 .docx）也只等到 10 倍 settle，交给处理流程报错
+                del self._pending[path]
+                ready.append(path)
+        return ready
+
+    def _ready_files(self) -> Iterator[Optional[str]]:
+        now = time.monotonic()
+        if self.process_existing:
+            self._scan(now - self.settle)
+        else:
+            for path in scan_word_files(self.folders, self.recursive, self.include, self.exclude):
+                self._done[path] = _signature(path)
+        interval = self.poll_interval if self.mode == "poll" else self.RESCAN_INTERVAL
+        next_scan = now + interval
+
+        while not self._stop.is_set():
+            now = time.monotonic()
+            if now >= next_scan:
+                self._scan(now)
+                next_scan = now + interval
+            self._drain_events(now)
+            ready = self._pop_ready(now)
+            if ready:
+                yield from ready
+                continue
+            self._wake.wait(self.TICK)
+            self._wake.clear()
+            yield None
+
+    # ---------- 事件源 ----------
+    def _start_observer(self):
+        if self.requested_mode == "poll":
+            return None
+        try:
+            from watchdog.observers import Observer
+            from watchdog.events import FileSystemEventHandler
+        except ImportError:
+            if self.requested_mode == "events":
+                raise RuntimeError("未安装 watchdog，无法使用事件模式：pip install watchdog") from None
+            return None
+
+        events, wake = self._events, self._wake
+
+        class _Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                for p in (event.src_path, getattr(event, "dest_path", "")):
+                    if p:
+                        events.put(os.fsdecode(p))
+                wake.set()
+
+        observer = Observer()
+        try:
+            for folder in self.folders:
+                observer.schedule(_Handler(), folder, recursive=self.recursive)
+            observer.start()
+        except OSError:
+            # 如 inotify 监视数用尽：退回轮询
+            if self.requested_mode == "events":
+                raise
+            return None
+        return observer
+
+    # ---------- 运行 ----------
+    def _on_dispatch(self, index: int, in_path: str, out_path: str):
+        self._busy.add(in_path)
+        self._busy.add(out_path)
+
+    def _on_result(self, res: FileResult):
+        for path in (res.input_path, res.output_path):
+            self._busy.discard(path)
+            # 覆盖模式下输入即输出、后缀模式下输出可能就在监视目录里：记下处理后的签名，不再当新文件
+            self._done[path] = _signature(path)
+            self._pending.pop(path, None)
+
+    def run(self, on_dispatch=None) -> Iterator[FileResult]:
+        """
+        一直运行到 stop()，按完成顺序产出 FileResult
+        on_dispatch(index, in_path, out_path)：派发时回调（在调用线程中执行）
+        """
+        for folder in self.folders:
+            if not os.path.isdir(folder):
+                raise NotADirectoryError(f"监视目录不存在：{folder}")
+
+        observer = self._start_observer()
+        self.mode = "poll" if observer is None else "events"
+
+        def dispatched(index, in_path, out_path):
+            self._on_dispatch(index, in_path, out_path)
+            if on_dispatch:
+                on_dispatch(index, in_path, out_path)
+
+        results = self.executor.run(self._ready_files(), on_dispatch=dispatched)
+        try:
+            for res in results:
+                self._on_result(res)
+                yield res
+        finally:
+            results.close()
+            if observer is not None:
+                observer.stop()
+                observer.join()
@@ -3,7 +3,11 @@
 import os
 import re
 import html
-import win32com.client as win32
+import time
+import logging
+import importlib.util
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
 
 # 假列表前缀： 1. / 2) / （3） / 1、 以及 - • * 等
 NUM_PREFIX = re.compile(r"^\s*(?:\d+\s*[.)、]|[\(\（]\s*\d+\s*[\)\）])\s+")
@@ -11,13 +15,22 @@ BUL_PREFIX = re.compile(r"^\s*[-–—•●·*]\s+")
 
 # 多种空白（含全角空格/nbsp）
 RE_MULTI_SPACE = re.compile(r"[ \u00A0\u2002\u2003\u2009\u3000]{2,}")
+# 全角空格/nbsp 换掉之后若没有 en/em/thin space，只剩纯空格：字面量模式可让 regex 快速跳过无关文本
+RE_MULTI_ASCII_SPACE = re.compile(r" {2,}")
 
 
-def normalize_text(s: str, tab_to_space: bool = True, compress_spaces: bool = True) -> str:
-    """清理：HTML实体、Tab->空格、全角空格归一、连续空格压缩、去首尾空白"""
-    if s is None:
-        return ""
-    s = html.unescape(s)
+def _compress_spaces(s: str) -> str:
+    if "\u2002" in s or "\u2003" in s or "\u2009" in s:
+        return RE_MULTI_SPACE.sub(" ", s)
+    if "  " in s:
+        return RE_MULTI_ASCII_SPACE.sub(" ", s)
+    return s
+
+
+def _normalize_spaces(s: str, tab_to_space: bool, compress_spaces: bool) -> str:
+    """HTML实体、Tab->空格、全角空格归一、连续空格压缩（不 strip）；没有 & / 多空格时直接跳过对应步骤"""
+    if "&" in s:
+        s = html.unescape(s)
 
     if tab_to_space:
         s = s.replace("\t", " ")
@@ -26,9 +39,24 @@ def normalize_text(s: str, tab_to_space: bool = True, compress_spaces: bool = Tr
     s = s.replace("\u3000", " ").replace("\u00A0", " ")
 
     if compress_spaces:
-        s = RE_MULTI_SPACE.sub(" ", s)
+        s = _compress_spaces(s)
+    return s
 
-    return s.strip()
+
+def normalize_text(s: str, tab_to_space: bool = True, compress_spaces: bool = True) -> str:
+    """清理：HTML实体、Tab->空格、全角空格归一、连续空格压缩、去首尾空白"""
+    if s is None:
+        return ""
+    return _normalize_spaces(s, tab_to_space, compress_spaces).strip()
+
+
+def normalize_many(texts, tab_to_space: bool = True, compress_spaces: bool = True) -> list:
+    """
+    批量版 normalize_text（整篇文档的段落一次传入）；逐段做，因为干净段落能整段跳过替换/正则，
+    比拼成一个大字符串处理更快（一段脏就会拖着全文走一遍）
+    """
+    norm = _normalize_spaces
+    return ["" if t is None else norm(t, tab_to_space, compress_spaces).strip() for t in texts]
 
 
 def detect_fake_list(text: str):
@@ -44,6 +72,57 @@ def detect_fake_list(text: str):
     return None, text
 
 
+@dataclass
+class ListRun:
+    """一段连续的同类假列表：段序号 [start, end)（从 0 开始），texts 为去掉前缀后的各段文本"""
+    start: int
+    end: int
+    list_type: str  # "number" | "bullet"
+    texts: list = field(default_factory=list)
+
+
+class ListRunPlanner:
+    """
+    plan_list_runs 的逐段版本：feed 一段 normalize 之后的文本，返回 (list_type, 最终文本, 是否开始新列表)。
+    只依赖前一段的状态，适合边读边写的流式处理
+    """
+
+    def __init__(self):
+        self.list_type = None
+
+    def feed(self, content: str):
+        list_type, stripped = detect_fake_list(content) if content else (None, content)
+        new_run = list_type is not None and list_type != self.list_type
+        self.list_type = list_type
+        return list_type, (content if list_type is None else stripped), new_run
+
+
+def plan_list_runs(contents) -> list:
+    """
+    列表规划（纯 Python，与后端无关）：输入 normalize 之后的各段文本，返回 [ListRun]。
+    相邻同类假列表段落接成一个列表；空段落、普通段落或类型变化都会断开
+    """
+    runs = []
+    planner = ListRunPlanner()
+    for i, content in enumerate(contents):
+        list_type, text, new_run = planner.feed(content)
+        if list_type is None:
+            continue
+        if new_run:
+            runs.append(ListRun(i, i, list_type))
+        runs[-1].end = i + 1
+        runs[-1].texts.append(text)
+    return runs
+
+
+def planned_texts(contents, runs) -> list:
+    """按规划得到各段最终文本：列表段落去掉前缀，其余保持 normalize 结果"""
+    out = list(contents)
+    for run in runs:
+        out[run.start:run.end] = run.texts
+    return out
+
+
 def iter_paragraphs_safe(range_obj):
     """
     COM 集合遍历更稳：用 Count + Item(i)
@@ -55,26 +134,83 @@ def iter_paragraphs_safe(range_obj):
         yield paras.Item(i)
 
 
-def compress_blank_lines_in_range(range_obj, keep_max_blank_lines: int):
-    """把一个 Range 里的连续空行压到 keep_max_blank_lines（倒序删更安全）"""
-    if keep_max_blank_lines < 0:
-        return
-
-    paras = list(iter_paragraphs_safe(range_obj))
-    blank_run = 0
+class BlankRunTracker:
+    """
+    主循环里顺手记录连续空段落（段序号从 1 开始、依次 mark），
+    只保存需要删除的区间，内存与段落数无关
+    """
 
-    for p in reversed(paras):
-        txt = p.Range.Text or ""
-        # Word 段落末尾通常带 "\r"
-        content = txt[:-1].strip() if txt.endswith("\r") else txt.strip()
-        is_blank = (content == "")
+    def __init__(self, keep_max_blank_lines: int):
+        self.keep = keep_max_blank_lines
+        self.surplus = []        # [(首段序号, 末段序号)]，待删除
+        self._run_start = None
+        self._last = 0
 
+    def mark(self, index: int, is_blank: bool):
         if is_blank:
-            blank_run += 1
-            if blank_run > keep_max_blank_lines:
-                p.Range.Delete()
+            if self._run_start is None:
+                self._run_start = index
         else:
-            blank_run = 0
+            self._close()
+        self._last = index
+
+    def _close(self):
+        if self._run_start is not None:
+            # 保留每段空行里靠后的 keep 个（与原先倒序删除的结果一致）
+            last_doomed = self._last - self.keep
+            if self.keep >= 0 and last_doomed >= self._run_start:
+                self.surplus.append((self._run_start, last_doomed))
+            self._run_start = None
+
+    def finish(self):
+        self._close()
+        return self.surplus
+
+
+# 删除一段连续段落 = Item + .Range + .Start（首段）+ Item + .Range + .End（末段）+ .Duplicate + SetRange + Delete
+DELETE_RUN_CALLS = 9
+
+
+def delete_paragraph_runs(range_obj, runs) -> int:
+    """倒序删除若干段连续段落，每段只用一次 Range.Delete；返回 COM 调用次数（Paragraphs 一次 + 每段 DELETE_RUN_CALLS）"""
+    if not runs:
+        return 0
+    paras = range_obj.Paragraphs
+    calls = 1
+    for first, last in reversed(runs):
+        start = paras.Item(first).Range.Start
+        end = paras.Item(last).Range.End
+        r = range_obj.Duplicate
+        r.SetRange(start, end)
+        r.Delete()
+        calls += DELETE_RUN_CALLS
+    return calls
+
+
+def compress_blank_lines_in_range(range_obj, keep_max_blank_lines: int) -> int:
+    """
+    把一个 Range 里的连续空行压到 keep_max_blank_lines：
+    按序号扫一遍找出空行区间，再倒序整段删除。返回删除的段落数
+    （process_range 已在主循环里完成这一步，这里供单独调用）
+    """
+    if keep_max_blank_lines < 0:
+        return 0
+
+    tracker = BlankRunTracker(keep_max_blank_lines)
+    snap = snapshot_paragraph_texts(range_obj)
+    if snap is not None:
+        for i, txt in enumerate(snap[0], start=1):
+            tracker.mark(i, txt.strip() == "")
+    else:
+        for i, p in enumerate(iter_paragraphs_safe(range_obj), start=1):
+            txt = p.Range.Text or ""
+            # Word 段落末尾通常带 "\r"
+            content = txt[:-1].strip() if txt.endswith("\r") else txt.strip()
+            tracker.mark(i, content == "")
+
+    runs = tracker.finish()
+    delete_paragraph_runs(range_obj, runs)
+    return sum(b - a + 1 for a, b in runs)
 
 
 def apply_list_format(p, list_type: str, prev_list_template=None):
@@ -97,136 +233,743 @@ def apply_list_format(p, list_type: str, prev_list_template=None):
     return lf.ListTemplate
 
 
-def process_range(
-    range_obj,
-    *,
-    keep_max_blank_lines: int = 1,
-    tab_to_space: bool = True,
-    compress_spaces: bool = True
-):
-    """清理一个 Range：空格/tab + 假列表转真列表 + 压缩空行"""
-    prev_type = None
-    prev_template = None
-
-    for p in iter_paragraphs_safe(range_obj):
-        pr = p.Range
-        raw = pr.Text or ""
-        if not raw:
+def apply_list_run(first, last, list_type: str) -> int:
+    """
+    一段连续的同类假列表一次转成真列表：首段到末段合成一个 Range，ApplyNumberDefault / ApplyBulletDefault 一次，
+    Word 把其中各段编进同一个列表（与逐段 apply_list_format 接续的结果相同）。返回 COM 调用次数
+    """
+    if last is first:
+        rng = first.Range
+        calls = 1
+    else:
+        rng = first.Range.Duplicate
+        rng.End = last.Range.End
+        calls = 5
+    lf = rng.ListFormat
+    if list_type == "number":
+        lf.ApplyNumberDefault()
+    else:
+        lf.ApplyBulletDefault()
+    return calls + 2
+
+
+# Word 查找替换：wdFindStop（只在 Range 内找）/ wdReplaceAll
+WD_FIND_STOP = 0
+WD_REPLACE_ALL = 2
+# 每次替换 = .Duplicate + .Find + ClearFormatting + .Replacement + ClearFormatting + Execute
+FIND_REPLACE_CALLS = 6
+
+
+def space_replacements(tab_to_space: bool = True, compress_spaces: bool = True) -> list:
+    """
+    与 _normalize_spaces 同序的 Word 查找替换：[(查找内容, 替换为, 是否通配符, 等价的 Python 正则)]
+    Tab → 空格；全角空格 / nbsp → 空格；连续的空格类字符（含 en/em/thin space）→ 一个空格
+    """
+    subs = []
+    if tab_to_space:
+        subs.append(("^t", " ", False, re.compile("\t")))
+    subs.append(("[\u3000\u00A0]", " ", True, re.compile("[\u3000\u00A0]")))
+    if compress_spaces:
+        subs.append(("[ \u2002\u2003\u2009]{2,}", " ", True, re.compile("[ \u2002\u2003\u2009]{2,}")))
+    return subs
+
+
+def bulk_replace_spaces(range_obj, text: str = None, *, tab_to_space: bool = True,
+                        compress_spaces: bool = True) -> int:
+    """
+    用 Word 自己的查找替换（ReplaceAll）在整个 Range 内先做一遍空白清理，每种替换一次 COM 往返、与段落数无关；
+    之后逐段比较时大多数段落已经干净，不必再读写。HTML 实体与首尾空白仍由 normalize_text 处理，最终文本不变。
+    text：Range 当前文本（已读过快照时传入，否则这里读一次）；按它在 Python 里先演算一遍，找不到的替换不发给 Word。
+    返回 COM 调用次数（0 表示什么都没替换）
+    """
+    calls = 0
+    if text is None:
+        text = range_obj.Text or ""
+        calls += 1
+    for find_text, replace_with, wildcards, regex in space_replacements(tab_to_space, compress_spaces):
+        text, n = regex.subn(replace_with, text)
+        if not n:
             continue
+        find = range_obj.Duplicate.Find
+        find.ClearFormatting()
+        find.Replacement.ClearFormatting()
+        find.Execute(FindText=find_text, MatchCase=False, MatchWholeWord=False, MatchWildcards=wildcards,
+                     MatchSoundsLike=False, MatchAllWordForms=False, Forward=True, Wrap=WD_FIND_STOP,
+                     Format=False, ReplaceWith=replace_with, Replace=WD_REPLACE_ALL)
+        calls += FIND_REPLACE_CALLS
+    return calls
+
+
+# COM 往返次数估算（用于统计）：
+# 逐段读 = Paragraphs.Item + .Range + .Text；写回 = .Duplicate + End 读/写 + .Text；
+# apply_list_format = .Range + .ListFormat + Apply* + .ListTemplate（逐段转列表的旧做法，每项一次）
+PARA_READ_CALLS = 3
+PARA_WRITE_CALLS = 4
+LIST_FORMAT_CALLS = 4
+
+
+class PhaseTimer:
+    """
+    按阶段统计一个文件的处理耗时（独占时间：嵌套阶段的耗时不重复算进外层），
+    以及各阶段的段落数、COM 调用数等计数：
+
+        timer = PhaseTimer()
+        with timer.phase("body"):
+            stats = process_range(doc.Content, timer=timer)   # 内部的 "blank_lines" 单独计时
+            timer.add(paragraphs=stats["paragraphs"])         # 计入当前阶段
+    """
 
+    def __init__(self):
+        self.seconds = {}
+        self.counts = {}
+        self._stack = []
+        self._t = 0.0
+
+    def _charge(self, now: float):
+        name = self._stack[-1]
+        self.seconds[name] = self.seconds.get(name, 0.0) + now - self._t
+        self._t = now
+
+    @contextmanager
+    def phase(self, name: str):
+        now = time.perf_counter()
+        if self._stack:
+            self._charge(now)
+        self.seconds.setdefault(name, 0.0)
+        self._stack.append(name)
+        self._t = now
+        try:
+            yield self
+        finally:
+            self._charge(time.perf_counter())
+            self._stack.pop()
+
+    def add(self, **values):
+        """计数累加到当前阶段（不在任何阶段内时忽略）"""
+        if not self._stack:
+            return
+        counts = self.counts.setdefault(self._stack[-1], {})
+        for k, v in values.items():
+            counts[k] = counts.get(k, 0) + v
+
+    def to_dict(self) -> dict:
+        """{阶段: {"seconds": 秒, 其他计数...}}，按首次进入的顺序"""
+        return {name: {"seconds": round(sec, 4), **self.counts.get(name, {})} for name, sec in self.seconds.items()}
+
+
+def timer_phase(timer, name: str):
+    """timer 为 None 时什么都不做，省得调用方到处判断"""
+    return timer.phase(name) if timer is not None else nullcontext()
+
+
+def new_range_stats() -> dict:
+    return {"paragraphs": 0, "written": 0, "blank_removed": 0, "com_calls": 0, "com_calls_saved": 0}
+
+
+def new_change_counts() -> dict:
+    """预检（只分析不保存）的计数：段落数、空白会变的段落数、要转换的假列表个数/项数、要删的空行数"""
+    return {"paragraphs": 0, "whitespace_changed": 0, "list_runs": 0, "list_items": 0, "blank_removed": 0}
+
+
+def count_changes(counts: dict, raws, contents, runs, blank_removed: int) -> dict:
+    """按一个 story 的原文 / normalize 结果 / 列表规划累计 new_change_counts"""
+    counts["paragraphs"] += len(raws)
+    counts["whitespace_changed"] += sum(1 for raw, content in zip(raws, contents) if raw != content)
+    counts["list_runs"] += len(runs)
+    counts["list_items"] += sum(run.end - run.start for run in runs)
+    counts["blank_removed"] += blank_removed
+    return counts
+
+
+def merge_stats(total: dict, part: dict) -> dict:
+    for k, v in part.items():
+        total[k] = total.get(k, 0) + v
+    return total
+
+
+def snapshot_paragraph_texts(range_obj):
+    """
+    一次 COM 调用读出整个 Range 的文本，按段落符 \r 切成各段内容（不含段落符），
+    返回 (各段内容, 末段是否带段落符)。含表格（单元格结束符 \x07）或段数与 Paragraphs.Count 对不上时返回 None，由调用方退回逐段模式
+    """
+    text = range_obj.Text or ""
+    if "\x07" in text:
+        return None
+    parts = text.split("\r")
+    if parts[-1] == "":
+        parts.pop()
+    if len(parts) != range_obj.Paragraphs.Count:
+        return None
+    return parts, text.endswith("\r")
+
+
+def _write_paragraph_text(pr, text: str, has_para_mark: bool):
+    """写回：只替换内容，不动段落符"""
+    r2 = pr.Duplicate
+    if has_para_mark:
+        r2.End = r2.End - 1
+    r2.Text = text
+
+
+def _apply_list_runs(paras, runs, items, cell_ends=()) -> int:
+    """
+    按规划把假列表转成真列表：每个 run 合成一个 Range 一次转换（apply_list_run），
+    COM 调用数与列表项数无关。
+    items：已取过的 {段序号(从 1 开始): Paragraph}，其余按需 Paragraphs.Item。
+    cell_ends：表格单元格最后一段的序号；run 在这里断开，合并的 Range 不跨单元格。返回 COM 调用次数
+    """
+    calls = 0
+
+    def item(i):
+        nonlocal calls
+        p = items.get(i)
+        if p is None:
+            p = items[i] = paras.Item(i)
+            calls += 1
+        return p
+
+    for run in runs:
+        start = run.start + 1
+        for i in range(start, run.end + 1):
+            if i == run.end or i in cell_ends:
+                # 先取段落再累加：item() 里计入的 Paragraphs.Item 调用不能被 calls += 覆盖
+                first, last = item(start), item(i)
+                calls += apply_list_run(first, last, run.list_type)
+                start = i + 1
+    return calls
+
+
+def _process_range_per_paragraph(range_obj, stats: dict, blanks: BlankRunTracker, *,
+                                 tab_to_space: bool, compress_spaces: bool):
+    """
+    逐段模式（表格等快照对不上的 Range 走这里）：第一遍按序号只读各段文本，
+    第二遍倒序只对内容有变化的段落重新取 Paragraphs(i) 写回；除文本列表外不保留任何 COM 对象
+    """
+    # Paragraphs + Count（读） + Paragraphs（写回 / 转列表）
+    stats["com_calls"] += 3
+    raws = [p.Range.Text or "" for p in iter_paragraphs_safe(range_obj)]
+    n = len(raws)
+    stats["paragraphs"] += n
+    stats["com_calls"] += n * PARA_READ_CALLS
+
+    contents = normalize_many([r[:-1] if r.endswith("\r") else r for r in raws],
+                              tab_to_space=tab_to_space, compress_spaces=compress_spaces)
+    runs = plan_list_runs(contents)
+    new_texts = planned_texts(contents, runs)
+
+    for i, (raw, content) in enumerate(zip(raws, contents), start=1):
+        blanks.mark(i, raw == "" or content == "")
+
+    # 倒序写回：后面段落的长度变化不影响前面段落的序号与位置
+    paras = range_obj.Paragraphs
+    for i in range(n, 0, -1):
+        raw = raws[i - 1]
         has_para_mark = raw.endswith("\r")
-        content = raw[:-1] if has_para_mark else raw
-        content = normalize_text(content, tab_to_space=tab_to_space, compress_spaces=compress_spaces)
-
-        if content == "":
-            # 空段落：清空内容（保留段落符）
-            r2 = pr.Duplicate
-            if has_para_mark:
-                r2.End = r2.End - 1
-            r2.Text = ""
-            prev_type = None
-            prev_template = None
+        if not raw or new_texts[i - 1] == (raw[:-1] if has_para_mark else raw):
             continue
+        _write_paragraph_text(paras.Item(i).Range, new_texts[i - 1], has_para_mark)
+        stats["written"] += 1
+        stats["com_calls"] += 2 + PARA_WRITE_CALLS
 
-        list_type, stripped = detect_fake_list(content)
+    # 应用真列表（单元格结束符 \x07 所在的段落是单元格最后一段）
+    cell_ends = {i for i, raw in enumerate(raws, start=1) if "\x07" in raw}
+    stats["com_calls"] += _apply_list_runs(paras, runs, {}, cell_ends)
 
-        # 写回：只替换内容，不动段落符
-        r2 = pr.Duplicate
-        if has_para_mark:
-            r2.End = r2.End - 1
-        r2.Text = stripped if list_type else content
 
-        # 应用真列表
-        if list_type in ("number", "bullet"):
-            if list_type != prev_type:
-                prev_template = apply_list_format(p, list_type, None)
-            else:
-                prev_template = apply_list_format(p, list_type, prev_template)
-            prev_type = list_type
-        else:
-            prev_type = None
-            prev_template = None
+def _process_range_snapshot(range_obj, texts, ends_with_mark: bool, stats: dict, blanks: BlankRunTracker, *,
+                            tab_to_space: bool, compress_spaces: bool):
+    """
+    快照模式：整段文本已一次读出，在 Python 里算好结果（含列表规划），
+    只对内容真正变化（或要转真列表）的段落发起 COM 调用
+    """
+    paras = range_obj.Paragraphs
+    n = len(texts)
+    # Text + Paragraphs + Count（快照）+ Paragraphs（本函数）
+    calls = 4
+
+    contents = normalize_many(texts, tab_to_space=tab_to_space, compress_spaces=compress_spaces)
+    runs = plan_list_runs(contents)
+    new_texts = planned_texts(contents, runs)
+
+    items = {}
+    for i, (raw, content, new_text) in enumerate(zip(texts, contents, new_texts), start=1):
+        blanks.mark(i, content == "")
+        if new_text == raw:
+            # 没变化：一次 COM 调用都不需要
+            continue
+        p = items[i] = paras.Item(i)
+        has_para_mark = i < n or ends_with_mark
+        _write_paragraph_text(p.Range, new_text, has_para_mark)
+        stats["written"] += 1
+        calls += 2 + PARA_WRITE_CALLS
 
-    compress_blank_lines_in_range(range_obj, keep_max_blank_lines)
+    list_calls = _apply_list_runs(paras, runs, items)
+    list_items = sum(run.end - run.start for run in runs)
 
+    # 旧做法（逐段模式）对同样的段落：每段读 + 写，列表逐项转换
+    legacy_calls = 2 + n * (PARA_READ_CALLS + PARA_WRITE_CALLS) + list_items * LIST_FORMAT_CALLS
+    stats["paragraphs"] += n
+    stats["com_calls"] += calls + list_calls
+    stats["com_calls_saved"] += legacy_calls - (calls + list_calls)
 
-def process_document(
+
+def process_range(
+    range_obj,
+    *,
+    keep_max_blank_lines: int = 1,
+    tab_to_space: bool = True,
+    compress_spaces: bool = True,
+    snapshot: bool = True,
+    find_replace: bool = False,
+    timer: PhaseTimer = None
+) -> dict:
+    """
+    清理一个 Range：空格/tab + 假列表转真列表 + 压缩空行
+    - snapshot=True：一次读出整个 Range 文本，只写回有变化的段落（读不成快照时自动退回逐段模式）
+    - find_replace=True：先用 Word 查找替换（bulk_replace_spaces）整体清理空白，逐段只剩假列表、首尾空白与空行要处理
+    - 空行压缩在同一遍里完成：记录连续空行区间，最后每个区间一次 Range 删除
+    返回统计：段落数、写回段落数、删除空行数、COM 调用数、相对逐段模式省下的 COM 调用数
+    timer：传入时段落数/COM 调用数计入调用方当前所在阶段，空行删除单独记在 "blank_lines" 阶段
+    """
+    stats = new_range_stats()
+    blanks = BlankRunTracker(keep_max_blank_lines)
+    opts = dict(tab_to_space=tab_to_space, compress_spaces=compress_spaces)
+
+    snap = snapshot_paragraph_texts(range_obj) if snapshot else None
+
+    replace_calls = 0
+    if find_replace:
+        with timer_phase(timer, "find_replace"):
+            replace_calls = bulk_replace_spaces(range_obj, "\r".join(snap[0]) if snap else None, **opts)
+            if snap is not None and replace_calls:
+                # 文本变了：重读快照（Text + Paragraphs.Count）
+                snap = snapshot_paragraph_texts(range_obj)
+                replace_calls += 3
+            if timer is not None:
+                timer.add(com_calls=replace_calls)
+
+    if snap is not None:
+        _process_range_snapshot(range_obj, snap[0], snap[1], stats, blanks, **opts)
+    else:
+        _process_range_per_paragraph(range_obj, stats, blanks, **opts)
+    if timer is not None:
+        timer.add(paragraphs=stats["paragraphs"], com_calls=stats["com_calls"])
+    stats["com_calls"] += replace_calls
+    stats["com_calls_saved"] -= replace_calls
+
+    # 空行压缩：主循环已标出空行区间，这里每段连续空行只删一次（倒序，不影响前面的序号）
+    if keep_max_blank_lines >= 0:
+        with timer_phase(timer, "blank_lines"):
+            runs = blanks.finish()
+            removed = sum(b - a + 1 for a, b in runs)
+            calls = delete_paragraph_runs(range_obj, runs)
+            if timer is not None:
+                timer.add(removed=removed, com_calls=calls)
+        # 原做法：再遍历一遍所有段落读文本，并逐个删除多余空段落
+        legacy_calls = 2 + stats["paragraphs"] * PARA_READ_CALLS + removed * 2
+        stats["blank_removed"] += removed
+        stats["com_calls"] += calls
+        stats["com_calls_saved"] += legacy_calls - calls
+    return stats
+
+
+def analyze_range(range_obj, counts: dict, *, keep_max_blank_lines: int = 1, tab_to_space: bool = True,
+                  compress_spaces: bool = True) -> dict:
+    """
+    预检：按 process_range 的规则算出一个 Range 会有哪些改动，只读不写。
+    能快照时一次 COM 调用读完，否则逐段读；计数累计到 counts（new_change_counts）
+    """
+    snap = snapshot_paragraph_texts(range_obj)
+    if snap is not None:
+        raws = snap[0]
+    else:
+        # 与 process_range 逐段模式同一规则：只去掉段落符 \r，单元格结束符 \x07 保留（空单元格不算空行）
+        raws = []
+        for p in iter_paragraphs_safe(range_obj):
+            text = p.Range.Text or ""
+            raws.append(text[:-1] if text.endswith("\r") else text)
+    contents = normalize_many(raws, tab_to_space=tab_to_space, compress_spaces=compress_spaces)
+    blanks = BlankRunTracker(keep_max_blank_lines)
+    for i, content in enumerate(contents, start=1):
+        blanks.mark(i, content == "")
+    removed = sum(b - a + 1 for a, b in blanks.finish())
+    return count_changes(counts, raws, contents, plan_list_runs(contents), removed)
+
+
+# wdHeaderFooterPrimary / wdHeaderFooterFirstPage / wdHeaderFooterEvenPages
+HEADER_FOOTER_KINDS = (1, 2, 3)
+
+
+def iter_header_footer_ranges(doc, counts: dict):
+    """
+    产出文档里每个不同的页眉/页脚 story 的 Range（各节的 Headers / Footers × 主、首页、偶数页）：
+    - 没启用的（Exists=False：未设“首页不同”/“奇偶页不同”）跳过
+    - “链接到前一节”的与前一节是同一个 story：前一节已处理过就跳过，不再每节重复处理一遍
+    counts 累计 stories（处理的个数）、linked_skipped（因链接省掉的重复处理次数）、com_calls（遍历本身的 COM 调用数）
+    """
+    sections = doc.Sections
+    n = sections.Count
+    counts["com_calls"] = counts.get("com_calls", 0) + 2
+    done = set()  # 上一节已处理过的 (Headers/Footers, 类型)，本节链接到前一节时可直接跳过
+    for si in range(1, n + 1):
+        sec = sections(si)
+        counts["com_calls"] += 1
+        for attr in ("Headers", "Footers"):
+            for kind in HEADER_FOOTER_KINDS:
+                key = (attr, kind)
+                try:
+                    hf = getattr(sec, attr)(kind)
+                    counts["com_calls"] += 3
+                    if not hf.Exists:
+                        # 本节不显示这一类：链接链上的内容不一定处理过，后面的节不能据此跳过
+                        done.discard(key)
+                        continue
+                    if si > 1:
+                        counts["com_calls"] += 1
+                        if hf.LinkToPrevious and key in done:
+                            counts["linked_skipped"] = counts.get("linked_skipped", 0) + 1
+                            continue
+                    rng = hf.Range
+                    counts["com_calls"] += 1
+                except Exception:
+                    done.discard(key)
+                    continue
+                counts["stories"] = counts.get("stories", 0) + 1
+                done.add(key)
+                yield rng
+
+
+def process_open_document(
+    word,
     input_path: str,
     output_path: str,
     *,
     keep_max_blank_lines: int = 1,
     tab_to_space: bool = True,
     compress_spaces: bool = True,
-    process_headers_footers: bool = True
+    process_headers_footers: bool = True,
+    find_replace: bool = False,
+    timer: PhaseTimer = None
 ):
     """
-    处理单个文件（.doc/.docx 都可由 Word 打开）并导出到 output_path
+    用已启动的 Word 实例打开、处理、另存并关闭一个文档（不退出 Word），返回 process_range 统计之和
+    find_replace：各 story 先用 Word 查找替换整体清理空白（见 process_range）
+    timer：分阶段计时 open / body / headers_footers / find_replace / blank_lines / save / close
+    页眉/页脚：每个不同的 story 只处理一次（见 iter_header_footer_ranges），统计里另有
+    hf_stories（处理的页眉/页脚个数）与 hf_linked_skipped（链接到前一节而省掉的重复处理次数）
     """
     input_path = os.path.abspath(input_path)
     output_path = os.path.abspath(output_path)
 
-    word = None
     doc = None
+    stats = new_range_stats()
+    opts = dict(
+        keep_max_blank_lines=keep_max_blank_lines,
+        tab_to_space=tab_to_space,
+        compress_spaces=compress_spaces,
+        find_replace=find_replace,
+        timer=timer
+    )
 
     try:
-        word = win32.Dispatch("Word.Application")
-        word.Visible = False
-        word.DisplayAlerts = 0
-
-        doc = word.Documents.Open(input_path)
+        with timer_phase(timer, "open"):
+            doc = word.Documents.Open(input_path)
 
         # 正文
-        process_range(
-            doc.Content,
-            keep_max_blank_lines=keep_max_blank_lines,
-            tab_to_space=tab_to_space,
-            compress_spaces=compress_spaces
-        )
+        with timer_phase(timer, "body"):
+            merge_stats(stats, process_range(doc.Content, **opts))
 
         # 页眉/页脚（可选）
         if process_headers_footers:
-            for si in range(1, doc.Sections.Count + 1):
-                sec = doc.Sections(si)
-                # 1 = Primary header/footer
-                try:
-                    process_range(
-                        sec.Headers(1).Range,
-                        keep_max_blank_lines=keep_max_blank_lines,
-                        tab_to_space=tab_to_space,
-                        compress_spaces=compress_spaces
-                    )
-                except Exception:
-                    pass
-
-                try:
-                    process_range(
-                        sec.Footers(1).Range,
-                        keep_max_blank_lines=keep_max_blank_lines,
-                        tab_to_space=tab_to_space,
-                        compress_spaces=compress_spaces
-                    )
-                except Exception:
-                    pass
+            with timer_phase(timer, "headers_footers"):
+                counts = {"stories": 0, "linked_skipped": 0, "com_calls": 0}
+                for rng in iter_header_footer_ranges(doc, counts):
+                    try:
+                        merge_stats(stats, process_range(rng, **opts))
+                    except Exception:
+                        pass
+                stats["com_calls"] += counts["com_calls"]
+                stats["hf_stories"] = counts["stories"]
+                stats["hf_linked_skipped"] = counts["linked_skipped"]
+                if timer is not None:
+                    timer.add(com_calls=counts["com_calls"], stories=counts["stories"],
+                              linked_skipped=counts["linked_skipped"])
 
         # 保存（按输出后缀）
-        ext = os.path.splitext(output_path)[1].lower()
-        if ext == ".docx":
-            doc.SaveAs(output_path, FileFormat=12)  # wdFormatXMLDocument
-        elif ext == ".doc":
-            doc.SaveAs(output_path, FileFormat=0)   # wdFormatDocument
-        else:
-            doc.SaveAs(output_path + ".docx", FileFormat=12)
+        with timer_phase(timer, "save"):
+            ext = os.path.splitext(output_path)[1].lower()
+            if ext == ".docx":
+                doc.SaveAs(output_path, FileFormat=12)  # wdFormatXMLDocument
+            elif ext == ".doc":
+                doc.SaveAs(output_path, FileFormat=0)   # wdFormatDocument
+            else:
+                doc.SaveAs(output_path + ".docx", FileFormat=12)
+
+        return stats
 
     finally:
-        # 确保关闭 doc / 退出 Word（不留后台进程）
+        # 只关文档，Word 实例由调用方（WordSession）管理
+        with timer_phase(timer, "close"):
+            try:
+                if doc is not None:
+                    doc.Close(SaveChanges=False)
+            except Exception:
+                pass
+
+
+def analyze_open_document(
+    word,
+    input_path: str,
+    *,
+    keep_max_blank_lines: int = 1,
+    tab_to_space: bool = True,
+    compress_spaces: bool = True,
+    process_headers_footers: bool = True,
+    timer: PhaseTimer = None
+) -> dict:
+    """
+    预检：以只读方式打开文档，统计 process_open_document 会做的改动（见 analyze_range），不保存。
+    返回 new_change_counts 计数，另加 changed（是否会有改动）
+    timer：分阶段计时 open / body / headers_footers / close
+    """
+    opts = dict(keep_max_blank_lines=keep_max_blank_lines, tab_to_space=tab_to_space,
+                compress_spaces=compress_spaces)
+    counts = new_change_counts()
+    doc = None
+    try:
+        with timer_phase(timer, "open"):
+            doc = word.Documents.Open(os.path.abspath(input_path), ReadOnly=True, AddToRecentFiles=False)
+
+        with timer_phase(timer, "body"):
+            analyze_range(doc.Content, counts, **opts)
+
+        if process_headers_footers:
+            with timer_phase(timer, "headers_footers"):
+                for rng in iter_header_footer_ranges(doc, {}):
+                    try:
+                        analyze_range(rng, counts, **opts)
+                    except Exception:
+                        pass
+    finally:
+        with timer_phase(timer, "close"):
+            try:
+                if doc is not None:
+                    doc.Close(SaveChanges=False)
+            except Exception:
+                pass
+
+    counts["changed"] = any(counts[k] for k in ("whitespace_changed", "list_runs", "blank_removed"))
+    return counts
+
+
+COM_UNAVAILABLE = "未安装 pywin32（win32com / pythoncom），无法使用 Word COM 后端；.docx 可改用 OOXML 后端（--backend ooxml）"
+
+
+def com_available() -> bool:
+    """能否使用 Word COM 后端（只查 pywin32 是否可导入，不启动 Word）"""
+    return all(importlib.util.find_spec(m) is not None for m in ("pythoncom", "win32com"))
+
+
+def _dispatch_word(prog_id: str):
+    # 用到 COM 时才导入 win32com：文本清理部分在任何平台都能秒级导入
+    try:
+        import win32com.client as win32
+    except ImportError:  # 非 Windows：只能用 OOXML 后端
+        raise RuntimeError(COM_UNAVAILABLE) from None
+    # DispatchEx：总是新开一个 WINWORD.EXE，不挂到用户正在用的 Word 上（卡死时强制结束的只会是自己的进程）
+    return win32.DispatchEx(prog_id)
+
+
+def _winword_pids() -> set:
+    """当前所有 WINWORD.EXE 的 PID（取不到时为空集合）"""
+    pids = set()
+    try:
+        import win32api
+        import win32con
+        import win32process
+        for pid in win32process.EnumProcesses():
+            try:
+                handle = win32api.OpenProcess(win32con.PROCESS_QUERY_INFORMATION | win32con.PROCESS_VM_READ,
+                                              False, pid)
+            except Exception:  # 系统进程 / 其他用户的进程打不开
+                continue
+            try:
+                if os.path.basename(win32process.GetModuleFileNameEx(handle, 0)).lower() == "winword.exe":
+                    pids.add(pid)
+            except Exception:
+                pass
+            finally:
+                win32api.CloseHandle(handle)
+    except Exception:
+        pass
+    return pids
+
+
+def _word_pid(word, before: set = frozenset()) -> int:
+    """
+    Word 实例所在进程的 PID（取不到时为 0 并记一条警告）：卡死时据此强制结束 WINWORD.EXE。
+    Application 没有 Hwnd 属性：先给它设一个唯一标题，按标题找主窗口（类名 OpusApp）再取窗口所属进程；
+    找不到窗口时退而比较启动前后的 WINWORD.EXE 进程（before），恰好多出一个才采用
+    """
+    try:
+        import win32gui
+        import win32process
+        caption = f"WordCleaner-{os.getpid()}-{id(word):x}"
+        old = word.Caption
+        word.Caption = caption
         try:
-            if doc is not None:
-                doc.Close(SaveChanges=False)
-        except Exception:
-            pass
+            hwnd = win32gui.FindWindow("OpusApp", caption)
+        finally:
+            word.Caption = old
+        if hwnd:
+            return win32process.GetWindowThreadProcessId(hwnd)[1]
+    except Exception:
+        pass
+    new = _winword_pids() - set(before)
+    if len(new) == 1:
+        return new.pop()
+    logging.getLogger(__name__).warning(
+        "取不到 Word 进程的 PID（新增 WINWORD.EXE %d 个），处理超时时无法强制结束该 Word 进程", len(new))
+    return 0
+
+
+class WordSession:
+    """
+    复用同一个 Word 进程批量处理文档，避免每个文件都冷启动一次 Word：
 
+        with WordSession() as session:
+            for f in files:
+                session.process(f, out, keep_max_blank_lines=1)
+
+    - 每处理 recycle_after 个文档自动重启 Word（防止长时间运行内存膨胀），<=0 表示不重启
+    - 某个文档处理失败时丢弃当前 Word 实例，下一个文档重新启动
+    - dispatch 可注入假的 COM 工厂，便于在非 Windows 环境测试
+    - on_backend(pid)：每次启动 Word 后回调其进程 PID，退出后回调 0（供上层在卡死时强制结束）
+    """
+
+    def __init__(self, *, recycle_after: int = 200, dispatch=None, on_backend=None):
+        self.recycle_after = recycle_after
+        self._dispatch = dispatch or _dispatch_word
+        self._on_backend = on_backend
+        self.word = None
+        self.docs_in_instance = 0
+        self.starts = 0
+        self.docs_processed = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _ensure_word(self):
+        if self.word is None:
+            # 只有真的启动了 WINWORD.EXE 才需要上报 PID；启动前先记下已有的 Word 进程，供 _word_pid 兜底比较
+            report = self._on_backend is not None and self._dispatch is _dispatch_word
+            before = _winword_pids() if report else ()
+            word = self._dispatch("Word.Application")
+            word.Visible = False
+            word.DisplayAlerts = 0
+            self.word = word
+            self.docs_in_instance = 0
+            self.starts += 1
+            if report:
+                self._on_backend(_word_pid(word, before))
+        return self.word
+
+    def recycle(self):
+        """退出当前 Word 实例（下次处理时重新启动）"""
+        word, self.word = self.word, None
+        self.docs_in_instance = 0
         try:
             if word is not None:
                 word.Quit()
         except Exception:
-            pass
\ No newline at end of file
+            pass
+        if word is not None and self._on_backend is not None:
+            self._on_backend(0)
+
+    def close(self):
+        self.recycle()
+
+    def process(self, input_path: str, output_path: str, **options) -> dict:
+        """参数与返回值同 process_open_document；传入 timer 时另记 word_start / word_quit（启动、回收 Word）"""
+        return self._run(process_open_document, input_path, output_path, **options)
+
+    def analyze(self, input_path: str, **options) -> dict:
+        """预检，参数与返回值同 analyze_open_document（只读打开，不保存）"""
+        return self._run(analyze_open_document, input_path, **options)
+
+    def _run(self, func, *args, **options) -> dict:
+        timer = options.get("timer")
+        with timer_phase(timer, "word_start"):
+            word = self._ensure_word()
+        try:
+            stats = func(word, *args, **options)
+        except Exception:
+            self.recycle()
+            raise
+
+        self.docs_processed += 1
+        self.docs_in_instance += 1
+        if self.recycle_after > 0 and self.docs_in_instance >= self.recycle_after:
+            with timer_phase(timer, "word_quit"):
+                self.recycle()
+        return stats
+
+
+def route_backend(input_path: str, output_path: str, backend: str = "auto") -> str:
+    """
+    backend="auto" 时按文件选最省的后端：.docx 输入且不要求输出 .doc → "ooxml"（纯 Python，不启动 Word）；
+    旧版 .doc 输入或要求输出 .doc → "com"（没装 pywin32 时抛 RuntimeError，不会路由到用不了的 COM）。其他取值原样返回
+    """
+    if backend != "auto":
+        return backend
+    if input_path.lower().endswith(".docx") and os.path.splitext(output_path)[1].lower() != ".doc":
+        return "ooxml"
+    if not com_available():
+        raise RuntimeError(f"{os.path.basename(input_path)} 需要 Word 处理（.doc 输入或输出）：{COM_UNAVAILABLE}")
+    return "com"
+
+
+def process_document(
+    input_path: str,
+    output_path: str,
+    *,
+    keep_max_blank_lines: int = 1,
+    tab_to_space: bool = True,
+    compress_spaces: bool = True,
+    process_headers_footers: bool = True,
+    backend: str = "com",
+    compress_level: int = 6,
+    find_replace: bool = False,
+    timer: PhaseTimer = None
+):
+    """
+    处理单个文件并导出到 output_path
+    - backend="com"：Word COM（.doc/.docx 都可由 Word 打开，仅 Windows）
+    - backend="ooxml"：纯 Python 改写 .docx 的 XML，无需 Word；compress_level 为改写部件的压缩级别（0~9）
+    - backend="auto"：按文件选择，.docx → .docx 用 ooxml，其余用 com（见 route_backend）
+    find_replace：仅 COM 后端，先用 Word 查找替换整体清理空白（结果相同，读写的段落更少）
+    返回统计：COM 后端为 process_range 统计（含省下的 COM 调用数），OOXML 后端为 process_docx 统计，
+    两者都有 paragraphs / blank_removed / hf_stories。批量处理请用 WordSession，避免每个文件都启动/退出一次 Word
+    timer：PhaseTimer，按阶段记录耗时与段落数/COM 调用数
+    """
+    options = dict(
+        keep_max_blank_lines=keep_max_blank_lines,
+        tab_to_space=tab_to_space,
+        compress_spaces=compress_spaces,
+        process_headers_footers=process_headers_footers,
+        timer=timer
+    )
+
+    backend = route_backend(input_path, output_path, backend)
+    if backend == "ooxml":
+        from docx_engine import process_docx
+        return process_docx(input_path, output_path, compress_level=compress_level, **options)
+    if backend != "com":
+        raise ValueError(f"未知后端：{backend}（可选 'auto' / 'com' / 'ooxml'）")
+
+    # 单文件：用完即退出 Word（不留后台进程）
+    with WordSession(recycle_after=0) as session:
+        return session.process(input_path, output_path, find_replace=find_replace, **options)